@@ -30,6 +30,80 @@ from src.classes.movie import Movie
 # Clé api de theMovieDB
 app.config['API_KEY'] = 'xx'
 
+# Taille (en octets) à partir de laquelle le journal d'une vidéothèque est compacté en arrière-plan
+app.config['JOURNAL_COMPACTION_THRESHOLD'] = 512 * 1024
+
+from src.classes.journal import Journal
+Journal.compaction_threshold = app.config['JOURNAL_COMPACTION_THRESHOLD']
+
+# Moteur de stockage des utilisateurs et des vidéothèques : 'json' (fichiers du dossier storage) ou 'sqlite'
+# Pour migrer les fichiers JSON existants vers SQLite : flask --app app migrate-storage
+app.config['STORAGE_BACKEND'] = 'json'
+app.config['SQLITE_DATABASE_PATH'] = 'storage/videotheque.db'
+
+# Taille maximale (en octets de mémoire estimés, index compris) du cache des vidéothèques chargées,
+# 0 pour le désactiver
+app.config['LIBRARY_CACHE_MAX_BYTES'] = 64 * 1024 * 1024
+
+# Durée (en secondes) pendant laquelle le navigateur garde une image de couverture sans la revalider
+app.config['COVER_CACHE_MAX_AGE'] = 7 * 24 * 3600
+
+# Taille maximale (en octets de base64) du cache des images encodées pour l'ancien format covers=base64
+app.config['COVER_BASE64_CACHE_MAX_BYTES'] = 32 * 1024 * 1024
+
+# Taille maximale (en octets) d'une image de couverture envoyée en flux à /api/covers/upload
+app.config['COVER_UPLOAD_MAX_BYTES'] = 10 * 1024 * 1024
+
+from src.classes.cover_store import CoverStore
+CoverStore.max_bytes = app.config['COVER_UPLOAD_MAX_BYTES']
+
+# Nombre de threads qui calculent les déclinaisons WebP des images (nécessite Pillow)
+app.config['COVER_RENDITION_WORKERS'] = 2
+
+from src.classes.cover_renditions import CoverRenditions
+CoverRenditions.workers = app.config['COVER_RENDITION_WORKERS']
+
+# Connexions vers l'API TheMovieDB : nombre de connexions gardées ouvertes et délais (en secondes)
+app.config['TMDB_POOL_SIZE'] = 10
+app.config['TMDB_CONNECT_TIMEOUT'] = 3.05
+app.config['TMDB_READ_TIMEOUT'] = 10
+
+from src.classes.themoviedb import TheMovieDB
+TheMovieDB.pool_size = app.config['TMDB_POOL_SIZE']
+TheMovieDB.connect_timeout = app.config['TMDB_CONNECT_TIMEOUT']
+TheMovieDB.read_timeout = app.config['TMDB_READ_TIMEOUT']
+
+# Nombre maximal de pages de résultats TheMovieDB (20 films par page) demandées en même temps pour une recherche
+app.config['TMDB_MAX_PAGES'] = 5
+TheMovieDB.max_pages = app.config['TMDB_MAX_PAGES']
+
+# Taille maximale (en octets de JSON) du cache des réponses TheMovieDB, 0 pour le désactiver, et durée
+# (en secondes) pendant laquelle une réponse expirée est encore renvoyée pendant son rafraîchissement
+app.config['TMDB_CACHE_MAX_BYTES'] = 16 * 1024 * 1024
+app.config['TMDB_CACHE_STALE_SECONDS'] = 3600
+
+# Durée maximale (en secondes) d'attente d'une requête TheMovieDB identique déjà en cours ; au-delà,
+# la requête appelle l'API elle-même (supérieure à TMDB_CONNECT_TIMEOUT + TMDB_READ_TIMEOUT)
+app.config['TMDB_CACHE_WAIT_SECONDS'] = 15
+
+# Cache persistant des réponses TheMovieDB, partagé par les processus de la machine ('' pour le désactiver) :
+# taille maximale (en octets compressés) et intervalle (en secondes) entre deux nettoyages
+app.config['TMDB_STORE_PATH'] = 'storage/tmdb_cache.db'
+app.config['TMDB_STORE_MAX_BYTES'] = 64 * 1024 * 1024
+app.config['TMDB_STORE_SWEEP_SECONDS'] = 300
+
+from src.classes.tmdb_cache import configure_tmdb_cache
+configure_tmdb_cache(app.config).warm()                 # Les réponses enregistrées avant le redémarrage sont préchargées
+
+from src.classes.cover_cache import configure_cover_cache
+configure_cover_cache(app.config)
+
+from src.classes.repository import configure_repository
+configure_repository(app.config)
+
+# Importation des commandes de maintenance (flask --app app <commande>)
+from commands import *
+
 if __name__ == '__main__':
     # En VM
     # app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,108 @@
+import argparse                                     # Pour les options de la ligne de commande
+import json                                         # Pour l'écriture de users.json et l'ancienne connexion
+import os                                           # Pour les chemins des fichiers
+import random                                       # Pour le choix des utilisateurs qui se connectent
+import sys                                          # Pour l'accès aux modules du back-end
+import tempfile                                     # Pour un dossier de stockage jetable
+import time                                         # Pour la mesure des durées
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.json_repository import JsonRepository  # Dépôt basé sur les fichiers JSON
+
+"""
+|
+|   Mesure de la durée d'une connexion avec un grand nombre d'utilisateurs : ancien parcours de
+|   users.json contre index des e-mails (storage/users.index.json).
+|
+|   Usage : python benchmarks/email_login.py [--users 1000000]
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def legacy_login(users_file_path: str, email: str, password: str) -> bool:
+    """
+        Authentifie un utilisateur comme le faisait User.authenticate_user : lecture et parcours de users.json.
+
+    Args:
+        users_file_path (str): Le chemin de users.json.
+        email (str): L'adresse e-mail.
+        password (str): Le mot de passe.
+
+    Returns:
+        bool: True si les identifiants sont corrects.
+    """
+    with open(users_file_path, 'r') as file:
+        users = json.load(file)
+    return any(user['email'] == email and user['password'] == password for user in users.values())
+
+def indexed_login(repository: JsonRepository, email: str, password: str) -> bool:
+    """
+        Authentifie un utilisateur comme User.authenticate_user : index des e-mails puis mot de passe.
+
+    Args:
+        repository (JsonRepository): Le dépôt.
+        email (str): L'adresse e-mail.
+        password (str): Le mot de passe.
+
+    Returns:
+        bool: True si les identifiants sont corrects.
+    """
+    found = repository.find_user_by_email(email)
+    return bool(found) and found[1]['password'] == password
+
+def elapsed_ms(function) -> float:
+    """
+        Retourne la durée (en millisecondes) d'un appel.
+
+    Args:
+        function (callable): La fonction à appeler.
+
+    Returns:
+        float: La durée en millisecondes.
+    """
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Durée d'une connexion selon le nombre d'utilisateurs.")
+    parser.add_argument('--users', type=int, default=1000000, help="Le nombre d'utilisateurs fictifs.")
+    parser.add_argument('--logins', type=int, default=10000, help="Le nombre de connexions mesurées avec l'index.")
+    options = parser.parse_args()
+
+    users = {
+        f"user-{i}": {"first_name": f"Prénom {i}", "email": f"user{i}@example.com", "password": f"secret{i}"}
+        for i in range(options.users)
+    }
+    chosen = [random.randrange(options.users) for _ in range(options.logins)]
+
+    with tempfile.TemporaryDirectory() as storage_dir:
+        users_file_path = os.path.join(storage_dir, 'users.json')
+        with open(users_file_path, 'w') as file:
+            json.dump(users, file)
+        del users
+
+        last = options.users - 1                    # Le pire cas de l'ancien parcours
+        legacy = min(elapsed_ms(lambda: legacy_login(users_file_path, f"user{last}@example.com", f"secret{last}")) for _ in range(3))
+
+        repository = JsonRepository(storage_dir)
+        rebuild = elapsed_ms(lambda: indexed_login(repository, "user0@example.com", "secret0"))
+        reload = elapsed_ms(lambda: indexed_login(JsonRepository(storage_dir), "user0@example.com", "secret0"))
+
+        start = time.perf_counter()
+        for i in chosen:
+            assert indexed_login(repository, f"user{i}@example.com", f"secret{i}")
+        indexed = (time.perf_counter() - start) * 1000 / options.logins
+        exists = elapsed_ms(lambda: [repository.email_exists(f"user{i}@example.com") for i in chosen]) / options.logins
+
+    print(f"Utilisateurs : {options.users}")
+    print(f"Connexion, ancien parcours de users.json : {legacy:10.3f} ms")
+    print(f"Premier accès, index reconstruit        : {rebuild:10.3f} ms")
+    print(f"Premier accès, index persisté rechargé  : {reload:10.3f} ms")
+    print(f"Connexion avec l'index                  : {indexed:10.3f} ms")
+    print(f"Inscription, vérification de l'e-mail   : {exists:10.3f} ms")
+
+if __name__ == '__main__':
+    main()
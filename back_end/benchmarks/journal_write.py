@@ -0,0 +1,118 @@
+import argparse                                     # Pour les options de la ligne de commande
+import json                                         # Pour l'ancienne écriture du fichier JSON complet
+import os                                           # Pour les chemins des fichiers
+import sys                                          # Pour l'accès aux modules du back-end
+import tempfile                                     # Pour un dossier de stockage jetable
+import time                                         # Pour la mesure des durées
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.journal import Journal             # Moteur de stockage journalisé
+from src.classes.json_repository import JsonRepository  # Dépôt basé sur les fichiers JSON
+
+"""
+|
+|   Mesure de la durée d'écriture d'un film selon la taille de la vidéothèque :
+|   ancienne réécriture complète de movies_{user_id}.json contre ajout au journal.
+|
+|   Usage : python benchmarks/journal_write.py [--sizes 100 10000 100000]
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def make_movie(movie_id: int) -> dict:
+    """
+        Retourne un film fictif de taille réaliste.
+
+    Args:
+        movie_id (int): L'identifiant du film.
+
+    Returns:
+        dict: Le film.
+    """
+    return {
+        "id": movie_id,
+        "movie_name": f"Film {movie_id}",
+        "year_of_creation": str(1950 + movie_id % 70),
+        "director": f"Réalisateur {movie_id % 500}",
+        "category": ["Action", "Drame", "Comedie", "Horreur"][movie_id % 4],
+        "synopsis": "Un synopsis de quelques phrases pour donner au film une taille proche de la réalité. " * 2,
+        "notation": str(movie_id % 6),
+        "cover_image_path": f"storage/covers/{movie_id:064x}.jpg",
+        "creation_date": "2024-01-01 12:00:00",
+        "last_modified_date": "2024-01-01 12:00:00"
+    }
+
+def legacy_write(path: str, movie: dict):
+    """
+        Ajoute un film comme le faisait Movie.save_movie : relecture et réécriture du fichier complet.
+
+    Args:
+        path (str): Le chemin de movies_{user_id}.json.
+        movie (dict): Le film à ajouter.
+    """
+    with open(path, 'r+') as file:
+        data = json.load(file)
+        data["movies"].append(movie)
+        data["nb_movies"] += 1
+        file.seek(0)
+        json.dump(data, file, indent=4)
+
+def timed(function, iterations: int) -> float:
+    """
+        Retourne la durée moyenne (en millisecondes) d'un appel.
+
+    Args:
+        function (callable): La fonction à appeler (reçoit le numéro de l'appel).
+        iterations (int): Le nombre d'appels.
+
+    Returns:
+        float: La durée moyenne en millisecondes.
+    """
+    start = time.perf_counter()
+    for i in range(iterations):
+        function(i)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+def run(size: int, iterations: int) -> tuple:
+    """
+        Mesure les deux écritures pour une vidéothèque de size films.
+
+    Args:
+        size (int): Le nombre de films de la vidéothèque.
+        iterations (int): Le nombre d'écritures mesurées avec le journal.
+
+    Returns:
+        tuple: (réécriture complète, ajout au journal, JsonRepository.add_movie), en millisecondes.
+    """
+    data = {"nb_movies": size, "next_id": size + 1, "movies": [make_movie(i) for i in range(1, size + 1)]}
+    with tempfile.TemporaryDirectory() as storage_dir:
+        legacy_path = os.path.join(storage_dir, 'movies_legacy.json')
+        with open(legacy_path, 'w') as file:
+            json.dump(data, file, indent=4)
+        legacy = timed(lambda i: legacy_write(legacy_path, make_movie(size + 1 + i)), max(3, iterations // 100))
+
+        repository = JsonRepository(storage_dir, cache_max_bytes=1 << 30)  # Assez grand pour garder la vidéothèque en cache
+        repository.create_library("bench", data)
+        journal = repository.journal("bench")
+        append = timed(lambda i: journal.append({"op": "edit", "id": 1, "fields": {"notation": str(i % 6)}}), iterations)
+
+        repository.load("bench")                    # Vidéothèque en cache, comme après la première requête
+        add = timed(lambda i: repository.add_movie("bench", make_movie(0)), iterations)
+    return legacy, append, add
+
+def main():
+    parser = argparse.ArgumentParser(description="Durée d'écriture d'un film selon la taille de la vidéothèque.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000], help="Les tailles de vidéothèque mesurées.")
+    parser.add_argument('--iterations', type=int, default=500, help="Le nombre d'écritures mesurées avec le journal.")
+    options = parser.parse_args()
+
+    Journal.compaction_threshold = 1 << 40          # Pas de compaction pendant la mesure : seul l'ajout est mesuré
+    print(f"{'films':>8} {'réécriture (ms)':>16} {'journal (ms)':>13} {'add_movie (ms)':>15}")
+    for size in options.sizes:
+        legacy, append, add = run(size, options.iterations)
+        print(f"{size:>8} {legacy:>16.3f} {append:>13.3f} {add:>15.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import argparse                                     # Pour les options de la ligne de commande
+import os                                           # Pour les chemins des fichiers
+import random                                       # Pour des titres fictifs
+import string                                       # Pour les lettres des mots fictifs
+import sys                                          # Pour l'accès aux modules du back-end
+import time                                         # Pour la mesure des durées
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.title_index import TitleIndex      # Index de trigrammes des titres
+
+"""
+|
+|   Mesure de la recherche de titres approchants (« Vouliez-vous dire… ») dans une grande vidéothèque :
+|   comparaison de chaque titre contre index de trigrammes (TitleIndex).
+|
+|   Usage : python benchmarks/title_search.py [--titles 1000000]
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def make_titles(count: int, seed: int = 0) -> list:
+    """
+        Retourne des titres fictifs de un à quatre mots, tirés d'un vocabulaire de 20 000 mots.
+
+    Args:
+        count (int): Le nombre de titres.
+        seed (int): La graine du tirage.
+
+    Returns:
+        list: Les titres.
+    """
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(20000)]
+    return [" ".join(rng.choices(words, k=rng.randint(1, 4))).capitalize() for _ in range(count)]
+
+def transpose(title: str) -> str:
+    """
+        Retourne le titre avec deux lettres voisines inversées au milieu (faute de frappe).
+
+    Args:
+        title (str): Le titre.
+
+    Returns:
+        str: Le titre mal orthographié.
+    """
+    middle = len(title) // 2
+    return title[:middle - 1] + title[middle] + title[middle - 1] + title[middle + 1:]
+
+def scan(titles: list, title: str, limit: int = 3) -> list:
+    """
+        Recherche les titres approchants en comparant le titre à chaque titre (sans index).
+
+    Args:
+        titles (list): Les titres normalisés.
+        title (str): Le titre recherché.
+        limit (int): Le nombre maximal de titres.
+
+    Returns:
+        list: Les couples (position, similarité), du plus proche au moins proche.
+    """
+    searched = TitleIndex.normalize(title)
+    trigrams = TitleIndex.trigrams(searched)
+    results = []
+    for position, normalized in enumerate(titles):
+        other = TitleIndex.trigrams(normalized)
+        common = len(trigrams & other)
+        similarity = common / (len(trigrams) + len(other) - common)
+        if similarity < TitleIndex.threshold and TitleIndex.one_typo(searched, normalized):
+            similarity = 1 - 1 / max(len(searched), len(normalized))
+        if similarity >= TitleIndex.threshold:
+            results.append((position, similarity))
+    return sorted(results, key=lambda item: -item[1])[:limit]
+
+def elapsed_ms(function) -> float:
+    """
+        Retourne la durée (en millisecondes) d'un appel.
+
+    Args:
+        function (callable): La fonction à appeler.
+
+    Returns:
+        float: La durée en millisecondes.
+    """
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Durée d'une recherche de titre approchant selon le nombre de titres.")
+    parser.add_argument('--titles', type=int, default=1000000, help="Le nombre de titres fictifs.")
+    parser.add_argument('--queries', type=int, default=200, help="Le nombre de recherches mesurées avec l'index.")
+    options = parser.parse_args()
+
+    titles = make_titles(options.titles)
+    rng = random.Random(1)
+    chosen = [rng.randrange(options.titles) for _ in range(options.queries)]
+    queries = [transpose(titles[i]) for i in chosen]
+
+    start = time.perf_counter()
+    index = TitleIndex({"id": movie_id, "movie_name": title} for movie_id, title in enumerate(titles))
+    build = (time.perf_counter() - start) * 1000
+
+    normalized = [index.titles[movie_id] for movie_id in range(options.titles)]
+    legacy = elapsed_ms(lambda: scan(normalized, queries[0]))
+
+    found = 0                                       # Titre d'origine proposé (les titres fictifs peuvent se répéter)
+    start = time.perf_counter()
+    for i, query in zip(chosen, queries):
+        found += any(index.titles[movie_id] == normalized[i] for movie_id, _ in index.similar(query, 3))
+    indexed = (time.perf_counter() - start) * 1000 / options.queries
+    missing = elapsed_ms(lambda: index.similar("zzqqxx wwyy", 3))
+
+    print(f"Titres : {options.titles}")
+    print(f"Construction de l'index              : {build:10.3f} ms")
+    print(f"Comparaison de chaque titre          : {legacy:10.3f} ms")
+    print(f"Index, deux lettres inversées        : {indexed:10.3f} ms")
+    print(f"Index, aucun titre approchant        : {missing:10.3f} ms")
+    print(f"Titre d'origine proposé              : {found}/{options.queries}")
+
+if __name__ == '__main__':
+    main()
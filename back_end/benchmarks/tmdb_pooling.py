@@ -0,0 +1,115 @@
+import argparse                                     # Pour les options de la ligne de commande
+import json                                         # Pour les réponses du faux serveur
+import os                                           # Pour les chemins des fichiers
+import sys                                          # Pour l'accès aux modules du back-end
+import threading                                    # Pour le faux serveur et les requêtes simultanées
+import time                                         # Pour la mesure des durées
+from concurrent.futures import ThreadPoolExecutor   # Pour les requêtes simultanées
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests                                     # Pour l'ancienne requête sans session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.classes.themoviedb import TheMovieDB       # Client de l'API TheMovieDB
+
+"""
+|
+|   Mesure du gain de la session HTTP partagée de TheMovieDB (connexions gardées ouvertes) contre un
+|   faux serveur local : connexions ouvertes et durée d'une requête, avec et sans réutilisation.
+|   --setup-ms simule le coût d'une nouvelle connexion vers l'API réelle (DNS, TCP, négociation TLS).
+|
+|   Usage : python benchmarks/tmdb_pooling.py [--requests 500] [--threads 8] [--setup-ms 0]
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class StubApi(BaseHTTPRequestHandler):
+    """
+    Faux serveur de l'API : une réponse JSON de la taille d'une page de résultats, connexions keep-alive.
+    Chaque instance traite une connexion : leur nombre est celui des connexions ouvertes.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True                  # En-têtes et corps écrits séparément : pas d'attente de l'accusé de réception
+    body = json.dumps({"page": 1, "results": [{"id": i, "title": f"Film {i}"} for i in range(20)]}).encode()
+    setup_delay = 0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with StubApi.lock:
+            StubApi.connections += 1
+        time.sleep(StubApi.setup_delay)
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+def measure(function, count: int, threads: int = 1) -> tuple:
+    """
+        Appelle count fois une fonction et retourne la durée moyenne d'un appel et les connexions ouvertes.
+
+    Args:
+        function (callable): La fonction à appeler (reçoit le numéro de l'appel).
+        count (int): Le nombre d'appels.
+        threads (int): Le nombre de threads qui se partagent les appels.
+
+    Returns:
+        tuple: (durée moyenne en millisecondes, nombre de connexions ouvertes).
+    """
+    StubApi.connections = 0
+    start = time.perf_counter()
+    if threads == 1:
+        for i in range(count):
+            function(i)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(function, range(count)))
+    return (time.perf_counter() - start) * 1000 / count, StubApi.connections
+
+def main():
+    parser = argparse.ArgumentParser(description="Gain de la session HTTP partagée de TheMovieDB.")
+    parser.add_argument('--requests', type=int, default=500, help="Le nombre de requêtes par mesure.")
+    parser.add_argument('--threads', type=int, default=8, help="Le nombre de threads de la mesure simultanée.")
+    parser.add_argument('--setup-ms', type=float, default=0, help="La durée simulée de l'ouverture d'une connexion.")
+    options = parser.parse_args()
+
+    StubApi.setup_delay = options.setup_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApi)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = TheMovieDB("bench")
+    client.base_url = f"http://127.0.0.1:{server.server_port}/3"
+    params = {"api_key": "bench", "language": "fr-FR", "query": "matrix"}
+    timeout = (TheMovieDB.connect_timeout, TheMovieDB.read_timeout)
+
+    def legacy(i):
+        response = requests.get(client.base_url + "/search/movie", params=params, timeout=timeout)  # Ancien appel : une connexion par requête
+        response.raise_for_status()
+        return response.json()
+
+    results = [
+        ("requests.get à chaque appel", measure(legacy, options.requests)),
+        ("session partagée", measure(lambda i: client.fetch("/search/movie", params), options.requests)),
+        (f"requests.get, {options.threads} threads", measure(legacy, options.requests, options.threads)),
+        (f"session partagée, {options.threads} threads", measure(lambda i: client.fetch("/search/movie", params), options.requests, options.threads)),
+    ]
+    server.shutdown()
+
+    print(f"Requêtes par mesure : {options.requests}, ouverture d'une connexion : +{options.setup_ms} ms")
+    print(f"{'':32} {'ms/requête':>11} {'connexions':>11}")
+    for label, (elapsed, connections) in results:
+        print(f"{label:32} {elapsed:>11.3f} {connections:>11}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+from app import app                                             # Importation du fichier de configuration Flask
+import click                                                    # Pour les options des commandes
+import os                                                       # Pour les opérations sur le système de fichiers
+from collections import Counter                                 # Pour le comptage des références des images
+from src.classes.cover_store import CoverStore                  # Stockage des images adressé par contenu
+from src.classes.cover_renditions import CoverRenditions        # Déclinaisons WebP des images
+from src.classes.json_repository import JsonRepository          # Dépôt basé sur les fichiers JSON
+from src.classes.sqlite_repository import SqliteRepository      # Dépôt basé sur SQLite
+from src.classes.repository import get_repository               # Dépôt configuré
+
+"""
+|
+|   This file contains the maintenance commands of the back-end (flask --app app <command>).
+|
+|   Author: Mahmoud ILLOURMANE
+|
+"""
+
+def count_cover_references(repository) -> Counter:
+    """
+        Compte, pour chaque image adressée par contenu, le nombre de films qui l'utilisent.
+
+    Args:
+        repository (Repository): Le dépôt à parcourir.
+
+    Returns:
+        Counter: Le nombre de références par chemin d'image.
+    """
+    
+    counts = Counter()
+    for user_id, _ in repository.iter_users():
+        try:
+            library = repository.load_library(user_id)
+        except FileNotFoundError:
+            continue
+        counts.update(movie["cover_image_path"] for movie in library["movies"] if CoverStore.is_managed(movie["cover_image_path"]))
+    return counts
+
+@app.cli.command('migrate-storage')
+@click.option('--storage-dir', default='storage', help="Le dossier qui contient users.json et les fichiers movies_{user_id}.json.")
+@click.option('--database', default=None, help="Le fichier SQLite de destination (SQLITE_DATABASE_PATH par défaut).")
+def migrate_storage(storage_dir, database):
+    """
+        Copie les utilisateurs et les vidéothèques des fichiers JSON vers la base SQLite.
+
+        La commande peut être relancée sans risque : les utilisateurs et les vidéothèques déjà présents
+        dans la base sont remplacés par le contenu des fichiers JSON.
+    """
+    
+    source = JsonRepository(storage_dir)
+    destination = SqliteRepository(database or app.config['SQLITE_DATABASE_PATH'])
+
+    nb_users = nb_movies = 0
+    for user_id, user_data in source.iter_users():
+        destination.upsert_user(user_id, user_data)
+        nb_users += 1
+
+        try:
+            library = source.load_library(user_id)
+        except FileNotFoundError:
+            click.echo(f"Aucune vidéothèque pour l'utilisateur {user_id}")
+            continue
+
+        destination.create_library(user_id, library)
+        nb_movies += len(library["movies"])
+
+    destination.set_cover_references(count_cover_references(destination))
+
+    click.echo(f"{nb_users} utilisateur(s) et {nb_movies} film(s) migrés vers {destination.database_path}")
+
+@app.cli.command('migrate-covers')
+def migrate_covers():
+    """
+        Range les anciennes images de couverture ({nom}_{user_id}.{format}) dans le stockage adressé par contenu.
+
+        Chaque image est copiée sous son empreinte SHA-256 (les images identiques ne sont gardées qu'une fois),
+        les films sont mis à jour, les anciens fichiers supprimés et les références recomptées.
+        À lancer serveur arrêté ; la commande peut être relancée sans risque.
+    """
+    
+    repository = get_repository()
+    migrated_files = set()
+    nb_movies = 0
+
+    for user_id, _ in list(repository.iter_users()):
+        try:
+            movies = list(repository.load_library(user_id)["movies"])
+        except FileNotFoundError:
+            continue
+
+        for movie in movies:
+            image_path = (movie["cover_image_path"] or "").replace("\\", "/")
+            if not image_path.startswith("storage/covers/") or CoverStore.is_managed(image_path) \
+                    or os.path.basename(image_path) == 'NOCOVERMOVIE.webp' or not os.path.isfile(image_path):
+                continue
+
+            with open(image_path, 'rb') as file:
+                image_data = file.read()
+            image_format = os.path.splitext(image_path)[1].lstrip('.').lower() or 'webp'
+
+            new_path = CoverStore.write(image_data, image_format)
+            repository.update_movie(user_id, movie["id"], {"cover_image_path": new_path})
+            migrated_files.add(image_path)
+            nb_movies += 1
+
+    for image_path in migrated_files:
+        os.remove(image_path)
+
+    repository.set_cover_references(count_cover_references(repository))
+    click.echo(f"{nb_movies} film(s) et {len(migrated_files)} image(s) rangés dans {CoverStore.root}")
+
+@app.cli.command('cleanup-covers')
+@click.option('--dry-run', is_flag=True, help="Affiche les images orphelines sans les supprimer.")
+def cleanup_covers(dry_run):
+    """
+        Supprime les images de couverture qu'aucun film n'utilise plus.
+
+        Les vidéothèques servent de manifeste des images de chaque utilisateur : la suppression d'un compte
+        ne parcourt plus le dossier des images. Cette commande, à lancer une fois après la mise à jour
+        (puis occasionnellement, serveur arrêté), parcourt le dossier et supprime les images laissées par
+        les anciennes versions : images d'utilisateurs supprimés ou de films disparus.
+    """
+    
+    repository = get_repository()
+    referenced = set()
+    for user_id, _ in repository.iter_users():
+        try:
+            library = repository.load_library(user_id)
+        except FileNotFoundError:
+            continue
+        referenced.update((movie["cover_image_path"] or "").replace("\\", "/") for movie in library["movies"])
+    referenced_digests = {CoverStore.digest(image_path) for image_path in referenced if CoverStore.is_managed(image_path)}
+
+    nb_files = 0
+    for directory, _, filenames in os.walk(CoverStore.root):
+        for filename in filenames:
+            image_path = os.path.join(directory, filename).replace("\\", "/")
+            rendition = CoverStore.rendition_pattern.match(filename)
+            if filename == 'NOCOVERMOVIE.webp' or image_path in referenced or (rendition and rendition.group(1) in referenced_digests):
+                continue
+            click.echo(image_path)
+            if not dry_run:
+                os.remove(image_path)
+            nb_files += 1
+
+    if not dry_run:
+        repository.set_cover_references(count_cover_references(repository))
+    click.echo(f"{nb_files} image(s) orpheline(s) {'trouvée(s)' if dry_run else 'supprimée(s)'} dans {CoverStore.root}")
+
+@app.cli.command('cover-renditions')
+def cover_renditions():
+    """
+        Calcule les déclinaisons WebP (grid, detail, original) des images adressées par contenu qui n'en ont pas.
+
+        Les nouvelles images sont traitées à l'enregistrement ; cette commande traite les images existantes
+        (par exemple après migrate-covers). Elle nécessite Pillow et peut être relancée sans risque.
+    """
+    
+    if not CoverRenditions.available():
+        click.echo("Pillow n'est pas installé : aucune déclinaison ne peut être calculée.")
+        return
+
+    nb_renditions = nb_errors = 0
+    for image_path in count_cover_references(get_repository()):
+        try:
+            nb_renditions += CoverRenditions.generate(image_path)
+        except OSError as e:
+            click.echo(f"{image_path} : {e}")
+            nb_errors += 1
+
+    click.echo(f"{nb_renditions} déclinaison(s) calculée(s), {nb_errors} image(s) illisible(s)")
+
+@app.cli.command('cover-placeholders')
+def cover_placeholders():
+    """
+        Calcule l'aperçu (cover_placeholder) des films dont l'image adressée par contenu n'en a pas encore.
+
+        Chaque image n'est lue qu'une fois, même si plusieurs films l'utilisent, et les films d'un utilisateur
+        sont mis à jour en une seule écriture. Nécessite Pillow ; la commande peut être relancée sans risque.
+    """
+    
+    if not CoverRenditions.available():
+        click.echo("Pillow n'est pas installé : aucun aperçu ne peut être calculé.")
+        return
+
+    repository = get_repository()
+    placeholders = {}
+    nb_movies = nb_errors = 0
+
+    for user_id, _ in list(repository.iter_users()):
+        try:
+            movies = list(repository.load_library(user_id)["movies"])
+        except FileNotFoundError:
+            continue
+
+        operations = []
+        for movie in movies:
+            image_path = (movie["cover_image_path"] or "").replace("\\", "/")
+            if movie.get("cover_placeholder") or not CoverStore.is_managed(image_path):
+                continue
+            if image_path not in placeholders:
+                try:
+                    placeholders[image_path] = CoverRenditions.placeholder(image_path)
+                except OSError as e:
+                    click.echo(f"{image_path} : {e}")
+                    placeholders[image_path] = None
+                    nb_errors += 1
+            if placeholders[image_path] is not None:
+                operations.append({"op": "edit", "id": movie["id"], "fields": {"cover_placeholder": placeholders[image_path]}})
+
+        if operations:
+            repository.apply_batch(user_id, operations)
+            nb_movies += len(operations)
+
+    click.echo(f"{nb_movies} film(s) mis à jour, {nb_errors} image(s) illisible(s)")
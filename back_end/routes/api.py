@@ -1,9 +1,15 @@
 from app import app                             # Importation du fichier de configuration Flask
-from flask import jsonify, request
-import json, base64
+from flask import jsonify, request, send_file
+import hashlib, json, os
 from src.classes.movie import Movie             # Importation de la classe Movie
 from src.classes.themoviedb import TheMovieDB   # Importation de la classe TheMovieDB
 from src.classes.user import User               # Importation de la classe User
+from src.classes.repository import get_repository  # Importation du dépôt de données configuré
+from src.classes.movie_query import MovieQuery      # Importation des paramètres de tri, de filtre et de pagination
+from src.classes.cover_cache import get_cover_cache # Importation du cache des images encodées en base64
+from src.classes.cover_store import CoverStore, CoverUploadError    # Importation du stockage des images adressé par contenu
+from src.classes.cover_renditions import CoverRenditions            # Importation des déclinaisons WebP et des aperçus des images
+from src.classes.tmdb_cache import get_tmdb_cache                   # Importation du cache des réponses TheMovieDB
 
 """
 |
@@ -20,6 +26,65 @@ from src.classes.user import User               # Importation de la classe User
 |   ===============
 """
 
+#
+#   Requêtes conditionnelles
+#
+
+def library_etag(user_id: str) -> str:
+    """
+        Calcule l'ETag (fort) d'une réponse construite à partir de la vidéothèque d'un utilisateur.
+
+        L'ETag dépend de l'utilisateur, de la version de la vidéothèque (incrémentée à chaque modification,
+        y compris à l'enregistrement de l'aperçu d'une image, qui suit le calcul de ses déclinaisons), de la
+        route et de sa chaîne de requête. Avec le dépôt JSON, lire la version ne coûte que la signature des
+        fichiers de la vidéothèque en cache.
+
+        La version est lue avant les films : si une écriture a lieu entre les deux, la réponse porte l'ETag
+        de l'ancienne version et sera simplement renvoyée en entier à la requête suivante.
+
+    Args:
+        user_id (str): L'identifiant de l'utilisateur.
+
+    Returns:
+        str: L'ETag, sans guillemets.
+
+    Raises:
+        FileNotFoundError: Si la vidéothèque n'existe pas.
+    """
+    version = get_repository().library_version(user_id)
+    key = json.dumps([user_id, version, request.path, sorted(request.args.items(multi=True))])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+def with_etag(response, etag: str):
+    """
+        Ajoute l'ETag à une réponse. Le navigateur la garde en cache mais la revalide à chaque utilisation
+        (If-None-Match).
+
+    Args:
+        response (Response): La réponse.
+        etag (str): L'ETag, sans guillemets.
+
+    Returns:
+        Response: La réponse.
+    """
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def not_modified(etag: str):
+    """
+        Retourne une réponse 304 (sans corps) si le client possède déjà la réponse d'ETag etag (If-None-Match).
+
+    Args:
+        etag (str): L'ETag de la réponse, sans guillemets.
+
+    Returns:
+        Response: La réponse 304, ou None si la réponse doit être construite.
+    """
+    if request.if_none_match.contains(etag):
+        return with_etag(app.response_class(status=304), etag)
+    return None
+
 #
 #   Authentification
 #
@@ -170,6 +235,31 @@ def deleteUser():
                 "error": error_message
             }), 500
 
+#
+#   Supervision
+#
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """
+        Retourne les compteurs internes du serveur (caches du dépôt de données, des images et des réponses TheMovieDB).
+
+        Réponses HTTP possibles :
+        - 200 OK : Renvoie les compteurs, par exemple {"library_cache": {"hits": int, "misses": int, "evictions": int, ...},
+                   "cover_cache": {...}, "tmdb_cache": {"hits": int, "stale_hits": int, "misses": int, ...}}.
+
+        :return: Une réponse JSON avec le statut HTTP approprié.
+    """
+    
+    return jsonify({
+        "status": "200",
+        "data": {
+            **get_repository().metrics(),
+            "cover_cache": get_cover_cache().stats(),
+            "tmdb_cache": get_tmdb_cache().stats()
+        }
+    }), 200
+
 #
 #   Web Application
 #
@@ -179,13 +269,26 @@ def get_movies_index():
     """
         Récupère tous les films d'un utilisateur avec les images.
 
-        Cette route renvoie la liste complète des films d'un utilisateur depuis un fichier JSON.
-        Les images de couverture des films sont encodées en base64 et incluses dans la réponse.
+        Cette route renvoie la liste des films d'un utilisateur depuis un fichier JSON.
+        Chaque film contient l'URL de son image de couverture, servie par /api/covers et mise en cache
+        par le navigateur : cover_url désigne la vignette WebP de la grille et cover_detail_url l'image de
+        la page du film (l'image d'origine tant que les déclinaisons ne sont pas calculées). cover_placeholder
+        est un aperçu de quelques centaines d'octets (data URI) affiché en attendant la vignette. Avec le paramètre covers=base64, les images sont encodées
+        en base64 et incluses dans la réponse (cover_image_base64), comme le faisaient les anciennes versions.
+
+        Paramètres de la chaîne de requête (tous facultatifs, voir MovieQuery) :
+        - limit, cursor : la taille de la page et le curseur renvoyé par la page précédente (next_cursor).
+        - sort (id, name, year, rating, created, modified) et order (asc, desc).
+        - category, year_min, year_max, min_rating : les filtres.
+        Sans limit, tous les films sont renvoyés.
+
+        La réponse porte un ETag (voir library_etag) : si l'en-tête If-None-Match le contient, la réponse
+        est 304 sans corps et la vidéothèque n'est pas parcourue.
 
         Returns:
-            JSON: Une réponse JSON contenant la liste des films de l'utilisateur avec les images encodées en base64.
+            JSON: Une réponse JSON contenant la liste des films de l'utilisateur avec l'URL de leur image.
                 - "status": "200" en cas de succès.
-                - "data": Un dictionnaire contenant la liste des films et leurs détails.
+                - "data": Un dictionnaire contenant la liste des films et leurs détails, et le curseur de la page suivante (next_cursor).
 
         Raises:
             FileNotFoundError: Si le fichier de films ou une image de film n'a pas été trouvé.
@@ -193,6 +296,8 @@ def get_movies_index():
 
         HTTP Status Codes:
             - 200 OK: Si la liste des films est récupérée avec succès.
+            - 304 Not Modified: Si la liste n'a pas changé depuis la réponse d'ETag If-None-Match.
+            - 400 Bad Request: Si un paramètre de tri, de filtre ou de pagination est invalide.
             - 404 Not Found: Si le fichier de films ou une image de film n'a pas été trouvé.
     """
     
@@ -200,20 +305,36 @@ def get_movies_index():
         user_data = request.get_json()
         user_id = user_data.get('user_id')                                              # Je récupère uniquement les films de l'utilisateur connecté
 
-        with open(f'storage/movies_{user_id}.json', 'r') as file:
-            movies = json.load(file)
+        etag = library_etag(user_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        query = MovieQuery.from_args(request.args)
+        library = get_repository().list_movies(user_id, query)
+
+        # Copie des films : la vidéothèque chargée peut être partagée avec le cache du dépôt
+        movies = {
+            "nb_movies": library["nb_movies"],
+            "movies": [dict(movie) for movie in library["movies"]],
+            "next_cursor": library["next_cursor"]
+        }
+
+        inline_covers = request.args.get("covers") == "base64"
 
         for movie in movies["movies"]:
-            image_path = movie["cover_image_path"]
-            if image_path:
-                # Vérifie si le chemin commence par 'storage\\'
-                if image_path.startswith("storage\\"):
-                    image_path = image_path.replace("\\", "/")
-
-                    # Procède à la conversion en base64
-                    with open(image_path, "rb") as image_file:
-                        encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
-                        movie["cover_image_base64"] = encoded_string
+            # Le chemin de l'image sur le serveur n'est renvoyé qu'au format historique (covers=base64)
+            image_path = movie["cover_image_path"] if inline_covers else movie.pop("cover_image_path")
+            movie["cover_url"] = Movie.cover_url(image_path, user_id, "grid")
+            if not movie.get("cover_placeholder"):
+                CoverRenditions.submit(image_path, (user_id, movie["id"]))                  # Aperçu des films enregistrés avant son calcul
+            movie["cover_detail_url"] = Movie.cover_url(image_path, user_id, "detail")
+            
+            if inline_covers and image_path:
+                # Vérifie si le chemin commence par 'storage\\' (ou 'storage/')
+                if image_path.replace("\\", "/").startswith("storage/"):
+                    # Conversion en base64, depuis le cache si l'image n'a pas changé
+                    movie["cover_image_base64"] = get_cover_cache().encode(image_path)
                 else:
                     # Stocke simplement le chemin de l'image
                     movie["cover_image_base64"] = image_path
@@ -223,7 +344,12 @@ def get_movies_index():
             "data": movies,
         }
 
-        return jsonify(response), 200
+        return with_etag(jsonify(response), etag), 200
+    except ValueError as e:
+        return jsonify({
+            "status": "400",
+            "error": str(e)
+        }), 400
     except FileNotFoundError:
         response = {
             "status": "404",
@@ -231,6 +357,77 @@ def get_movies_index():
         }
         return jsonify(response), 404
     
+@app.route('/api/covers/<user_id>/<image_name>', methods=['GET'])
+def get_cover(user_id, image_name):
+    """
+        Renvoie l'image de couverture d'un film.
+
+        Le fichier est transmis par send_file : les en-têtes ETag, Last-Modified et Cache-Control sont
+        renseignés, les requêtes conditionnelles (If-None-Match, If-Modified-Since) reçoivent une réponse
+        304 et les requêtes partielles (Range) une réponse 206. Le serveur WSGI peut transmettre le fichier
+        sans copie (sendfile) lorsqu'il le permet.
+
+        HTTP Status Codes:
+            - 200 OK / 206 Partial Content: L'image (ou la partie demandée).
+            - 304 Not Modified: L'image en cache chez le client est à jour.
+            - 404 Not Found: L'image n'existe pas ou n'appartient pas à l'utilisateur.
+    """
+    
+    image_path = Movie.cover_file(user_id, image_name)
+    if image_path is None:
+        return jsonify({
+            "status": "404",
+            "error": "Image introuvable."
+        }), 404
+
+    if CoverStore.is_managed(image_path) or CoverStore.rendition_pattern.match(image_name):
+        # Image adressée par contenu (ou déclinaison) : l'empreinte sert d'ETag et le contenu d'une URL ne change jamais
+        response = send_file(os.path.abspath(image_path), conditional=True, etag=CoverStore.digest(image_path), max_age=365 * 24 * 3600)
+        response.cache_control.immutable = True
+    else:
+        response = send_file(os.path.abspath(image_path), conditional=True, max_age=app.config['COVER_CACHE_MAX_AGE'])
+    response.cache_control.public = False
+    response.cache_control.private = True                                          # Les images sont propres à chaque utilisateur
+    return response
+
+@app.route('/api/covers/upload', methods=['POST'])
+def upload_cover():
+    """
+        Reçoit une image de couverture envoyée en flux (corps de la requête = contenu de l'image).
+
+        Le corps est copié sur le disque par morceaux, sans être chargé en mémoire ni encodé en base64.
+        Le format est reconnu à partir des premiers octets de l'image et non du type annoncé par le client.
+        Le nom renvoyé est ensuite transmis à /api/add-movie dans le champ cover_image.
+
+        Returns:
+            JSON: {"status": "200", "cover_image": "empreinte.format"}.
+
+        HTTP Status Codes:
+            - 200 OK: Si l'image a été enregistrée.
+            - 413 Payload Too Large: Si l'image dépasse COVER_UPLOAD_MAX_BYTES.
+            - 415 Unsupported Media Type: Si le format de l'image n'est pas reconnu.
+    """
+    
+    max_bytes = CoverStore.max_bytes
+    if request.content_length is not None and request.content_length > max_bytes:          # Refus avant toute lecture
+        return jsonify({
+            "status": "413",
+            "error": f"L'image dépasse la taille maximale de {max_bytes} octets."
+        }), 413
+
+    try:
+        image_path = CoverStore.write_stream(request.stream)
+    except CoverUploadError as e:
+        return jsonify({
+            "status": str(e.status),
+            "error": str(e)
+        }), e.status
+
+    return jsonify({
+        "status": "200",
+        "cover_image": os.path.basename(image_path)
+    }), 200
+
 @app.route('/api/get-movies/gestions', methods=['GET'])
 def get_movies_gestions():
     """
@@ -241,11 +438,15 @@ def get_movies_gestions():
         être affichées dans un tableau de gestion où l'utilisateur pourra effectuer des opérations
         telles que la suppression de films.
 
+        Accepte les mêmes paramètres de tri, de filtre et de pagination que /api/get-movies/index,
+        et répond 304 de la même façon si l'ETag de la réponse est dans l'en-tête If-None-Match.
+
         Returns:
             JSON: Une réponse JSON contenant la liste des films de l'utilisateur sans les images de couverture.
                 - "status": "ok" en cas de succès.
                 - "nb_movies": Le nombre total de films de l'utilisateur.
                 - "movies": Une liste des films de l'utilisateur sans les images.
+                - "next_cursor": Le curseur de la page suivante, ou null.
 
         Raises:
             FileNotFoundError: Si le fichier de films n'a pas été trouvé.
@@ -253,32 +454,223 @@ def get_movies_gestions():
 
         HTTP Status Codes:
             - 200 OK: Si la liste des films est récupérée avec succès.
+            - 304 Not Modified: Si la liste n'a pas changé depuis la réponse d'ETag If-None-Match.
+            - 400 Bad Request: Si un paramètre de tri, de filtre ou de pagination est invalide.
             - 404 Not Found: Si le fichier de films n'a pas été trouvé.
     """
     
     try:
         user_data = request.get_json()
         user_id = user_data.get('user_id')
+
+        etag = library_etag(user_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
         
-        # Ouvrerture du fichier JSON où se trouvent les données de la vidéothèque
-        with open(f'storage/movies_{user_id}.json', 'r') as file:
-            data = json.load(file)
+        # Page de la vidéothèque, triée et filtrée selon la chaîne de requête
+        data = get_repository().list_movies(user_id, MovieQuery.from_args(request.args))
         
         # Récupérer le nombre de films et la liste des films
         nb_movies = data["nb_movies"]
-        movies = data["movies"]
         
-        # Supprimer les chemins des images pour alléger la réponse
-        for movie in movies:
-            movie.pop('cover_image_path', None)
+        # Copier les films sans les chemins ni les aperçus des images pour alléger la réponse
+        # (la vidéothèque chargée peut être partagée avec le cache du dépôt)
+        movies = [
+            {key: value for key, value in movie.items() if key not in ('cover_image_path', 'cover_placeholder')}
+            for movie in data["movies"]
+        ]
         
         # Créer une réponse JSON avec le nombre de films et la liste des films
         response = {
             "status": "200",
             "nb_movies": nb_movies,
-            "movies": movies
+            "movies": movies,
+            "next_cursor": data["next_cursor"]
         }
-        return jsonify(response), 200
+        return with_etag(jsonify(response), etag), 200
+    except ValueError as e:
+        return jsonify({
+            "status": "400",
+            "error": str(e)
+        }), 400
+    except FileNotFoundError:
+        return jsonify({
+            "status": "404",
+            "error": "Le fichier de films n'a pas été trouvé"
+        }), 404
+
+@app.route('/api/movies/search', methods=['GET'])
+def search_movies():
+    """
+        Recherche des films dans la vidéothèque d'un utilisateur par mots-clés.
+
+        La recherche porte sur le titre, le réalisateur, la catégorie et le synopsis, sans tenir compte des
+        accents ni des majuscules (« amelie » trouve « Amélie »). Les films renvoyés contiennent tous les mots
+        recherchés et sont classés par pertinence (BM25) ; le titre compte davantage que le synopsis.
+        Sans résultat, la réponse propose les titres de la vidéothèque les plus proches de la recherche
+        (suggestions, « Vouliez-vous dire… »), retrouvés malgré les fautes de frappe (voir TitleIndex).
+
+        Paramètres de la chaîne de requête :
+        - q : la recherche.
+        - limit : le nombre maximal de résultats (20 par défaut, au plus MovieQuery.max_limit).
+        - category : la catégorie recherchée (facultatif).
+
+        Returns:
+            JSON: Une réponse JSON contenant les films trouvés, avec l'URL de leur image comme /api/get-movies/index.
+                - "status": "200" en cas de succès.
+                - "data": Un dictionnaire contenant le nombre de résultats et la liste des films, chacun avec son score
+                  de pertinence (comparable seulement entre les résultats d'une même recherche), et les suggestions
+                  de titres (liste vide s'il y a des résultats).
+
+        HTTP Status Codes:
+            - 200 OK: Si la recherche a abouti (éventuellement sans résultat).
+            - 400 Bad Request: Si limit est invalide.
+            - 404 Not Found: Si la vidéothèque de l'utilisateur n'a pas été trouvée.
+    """
+
+    try:
+        user_data = request.get_json()
+        user_id = user_data.get('user_id')
+
+        text = request.args.get("q", "")
+        limit = int(request.args.get("limit") or 20)
+        if not 1 <= limit <= MovieQuery.max_limit:
+            raise ValueError(f"Le nombre de résultats doit être compris entre 1 et {MovieQuery.max_limit}.")
+
+        results = get_repository().search_movies(user_id, text, limit, request.args.get("category") or None)
+
+        movies = []
+        for movie, score in results:
+            # Copie du film : la vidéothèque chargée peut être partagée avec le cache du dépôt
+            movie = dict(movie)
+            image_path = movie.pop("cover_image_path")
+            movie["cover_url"] = Movie.cover_url(image_path, user_id, "grid")
+            movie["cover_detail_url"] = Movie.cover_url(image_path, user_id, "detail")
+            movie["score"] = score
+            movies.append(movie)
+
+        suggestions = []
+        if not movies and text.strip():
+            suggestions = [movie["movie_name"] for movie, _ in get_repository().similar_titles(user_id, text, 3)]
+
+        return jsonify({
+            "status": "200",
+            "data": {
+                "nb_movies": len(movies),
+                "movies": movies,
+                "suggestions": suggestions
+            }
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "status": "400",
+            "error": str(e)
+        }), 400
+    except FileNotFoundError:
+        return jsonify({
+            "status": "404",
+            "error": "Le fichier de films n'a pas été trouvé"
+        }), 404
+
+@app.route('/api/movies/stats', methods=['GET'])
+def get_movies_stats():
+    """
+        Récupère les statistiques de la vidéothèque d'un utilisateur, sans renvoyer ses films.
+
+        Les statistiques sont tenues à jour à chaque ajout, modification ou suppression d'un film
+        (voir LibraryStats) : la vidéothèque n'est pas parcourue pour les calculer. La réponse porte un ETag
+        (voir library_etag) et vaut 304 si l'en-tête If-None-Match le contient.
+
+        Returns:
+            JSON: Une réponse JSON contenant les statistiques de la vidéothèque.
+                - "status": "200" en cas de succès.
+                - "data": Le nombre total de films (nb_movies), le nombre de films par catégorie (categories)
+                  et par année (years), l'histogramme des notes de 0 à 5 (ratings) et la note moyenne
+                  (average_rating, null si aucun film n'est noté).
+
+        HTTP Status Codes:
+            - 200 OK: Si les statistiques sont récupérées avec succès.
+            - 304 Not Modified: Si les statistiques n'ont pas changé depuis la réponse d'ETag If-None-Match.
+            - 404 Not Found: Si la vidéothèque de l'utilisateur n'a pas été trouvée.
+    """
+
+    try:
+        user_data = request.get_json()
+        user_id = user_data.get('user_id')
+
+        etag = library_etag(user_id)
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+
+        return with_etag(jsonify({
+            "status": "200",
+            "data": get_repository().movie_stats(user_id)
+        }), etag), 200
+    except FileNotFoundError:
+        return jsonify({
+            "status": "404",
+            "error": "Le fichier de films n'a pas été trouvé"
+        }), 404
+
+@app.route('/api/movies/changes', methods=['GET'])
+def get_movies_changes():
+    """
+        Récupère les modifications de la vidéothèque d'un utilisateur depuis une version connue du client.
+
+        Chaque ajout, modification ou suppression d'un film incrémente la version de la vidéothèque ; un film
+        porte la version de sa dernière modification et une suppression laisse une pierre tombale. Le client
+        garde une copie locale de la vidéothèque et de sa version, et n'applique que les différences.
+        Si la version du client est trop ancienne (pierres tombales oubliées), inconnue ou nulle, toute la
+        vidéothèque est renvoyée (reset) : le client remplace alors sa copie.
+
+        Paramètres de la chaîne de requête :
+        - since : la dernière version connue du client (0 par défaut).
+
+        Returns:
+            JSON: Une réponse JSON contenant les modifications.
+                - "status": "200" en cas de succès.
+                - "data": La version actuelle (version), reset, les films ajoutés ou modifiés (movies, avec
+                  l'URL de leur image comme /api/get-movies/index) et les identifiants des films supprimés (deleted).
+
+        HTTP Status Codes:
+            - 200 OK: Si les modifications sont récupérées avec succès.
+            - 400 Bad Request: Si since n'est pas un entier positif.
+            - 404 Not Found: Si la vidéothèque de l'utilisateur n'a pas été trouvée.
+    """
+
+    try:
+        user_data = request.get_json()
+        user_id = user_data.get('user_id')
+
+        since = request.args.get("since") or "0"
+        since = int(since) if since.isdigit() else -1
+        if since < 0:
+            raise ValueError("La version doit être un entier positif.")
+
+        changes = get_repository().movie_changes(user_id, since)
+
+        movies = []
+        for movie in changes["movies"]:
+            # Copie du film : la vidéothèque chargée peut être partagée avec le cache du dépôt
+            movie = dict(movie)
+            image_path = movie.pop("cover_image_path")
+            movie["cover_url"] = Movie.cover_url(image_path, user_id, "grid")
+            if not movie.get("cover_placeholder"):
+                CoverRenditions.submit(image_path, (user_id, movie["id"]))
+            movie["cover_detail_url"] = Movie.cover_url(image_path, user_id, "detail")
+            movies.append(movie)
+
+        return jsonify({
+            "status": "200",
+            "data": {**changes, "movies": movies}
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            "status": "400",
+            "error": str(e)
+        }), 400
     except FileNotFoundError:
         return jsonify({
             "status": "404",
@@ -360,12 +752,20 @@ def delete_movie():
 @app.route('/api/edit-movie', methods=['PATCH'])
 def edit_movie():
     """
-        Modifie une information sur un film dans la vidéothèque de l'utilisateur.
+        Modifie une ou plusieurs informations d'un film dans la vidéothèque de l'utilisateur.
 
-        Cette route permet à l'utilisateur de modifier une information spécifique d'un film en fournissant
+        Cette route permet à l'utilisateur de modifier les informations d'un film en fournissant
         les données de modification au format JSON. Les modifications peuvent inclure le titre, l'année,
         le réalisateur, la catégorie, la notation, la synopsis, ou d'autres informations liées au film.
 
+        Requête JSON attendue :
+        {
+            "user_id": str,
+            "movieId": int,
+            "inputName": str, "inputContent": str      (un seul champ)
+            ou "fields": {nom: valeur}                  (plusieurs champs, une seule écriture)
+        }
+
         Returns:
             JSON: Une réponse JSON indiquant le statut de la modification de l'information du film.
                 - "status": "ok" en cas de succès.
@@ -380,20 +780,9 @@ def edit_movie():
         """
     try:
         data = request.json
-        
-        # Gestion des notations
         user_id = data.get("user_id")
-        input_name = data.get("inputName")
-        input_content = data.get("inputContent")
         
-        if input_name == "notation":
-            # Si la note est inférieure à 1, affecter automatiquement la valeur 1
-            if int(input_content) < 1:
-                data["inputContent"] = str(1)
-            # Si la note est supérieure à 5, affecter automatiquement la valeur 5
-            elif int(input_content) >= 5:
-                data["inputContent"] = str(5)
-                
+        # La notation est ramenée entre 1 et 5 par Movie.clean_fields
         response = Movie.edit_movie(data, user_id)
         return response
     except Exception as e:
@@ -403,12 +792,75 @@ def edit_movie():
             "error": str(e)
         }), 500
 
+@app.route('/api/movies/batch', methods=['POST'])
+def movies_batch():
+    """
+        Applique une liste d'ajouts, de modifications et de suppressions de films en une seule écriture.
+
+        Requête JSON attendue :
+        {
+            "user_id": str,
+            "operations": [
+                {"op": "add", "movie": {...}},                      (mêmes données que /api/add-movie)
+                {"op": "edit", "movieId": int, "fields": {...}},
+                {"op": "delete", "movieId": int}
+            ]
+        }
+
+        Returns:
+            JSON: {"status": "200", "results": list} avec, pour chaque opération et dans le même ordre,
+                  {"status": "200", "id": int} ou {"status": "400" | "404", "error": str}.
+
+        HTTP Status Codes:
+            - 200 OK: Si le lot a été traité (voir le statut de chaque opération).
+            - 400 Bad Request: Si la liste des opérations est absente.
+            - 404 Not Found: Si la vidéothèque de l'utilisateur n'a pas été trouvée.
+            - 500 Internal Server Error: Si une exception non gérée se produit pendant le traitement.
+    """
+    
+    try:
+        data = request.json
+        user_id = data.get("user_id")
+        operations = data.get("operations")
+        
+        if not isinstance(operations, list):
+            return jsonify({
+                "status": "400",
+                "error": "La liste des opérations est manquante."
+            }), 400
+
+        return Movie.apply_batch(operations, user_id)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": "Erreur interne du serveur lors du traitement du lot de films.",
+            "error": str(e)
+        }), 500
+
 #
 #
 #   API themoviedb
 #
 #
 
+def tmdb_pages() -> tuple:
+    """
+        Lit le nombre de pages de résultats (pages) et le nombre maximal de films (maxResults) demandés
+        dans la chaîne de requête d'une route TheMovieDB.
+
+    Returns:
+        tuple: (pages, max_results), 1 page et max_results None par défaut.
+
+    Raises:
+        ValueError: Si pages ou maxResults n'est pas un entier positif.
+    """
+    pages = request.args.get("pages") or "1"
+    max_results = request.args.get("maxResults") or None
+    for value in (pages, max_results):
+        if value is not None and (not value.isdigit() or int(value) < 1):
+            raise ValueError("pages et maxResults doivent être des entiers positifs.")
+    return int(pages), int(max_results) if max_results is not None else None
+
 @app.route('/api/themoviedb/get', methods=['GET'])
 def api_themoviedb_get():
     """
@@ -418,6 +870,9 @@ def api_themoviedb_get():
     une opération (1: Recherche par nom, 2: Recherche par catégorie(s), 3: Recherche par année de sortie).
     Les données de l'opération sont passées en tant que paramètres dans la chaîne de requête.
 
+    Les paramètres facultatifs pages et maxResults demandent plusieurs pages de résultats (20 films par page,
+    TMDB_MAX_PAGES pages au plus), récupérées en même temps puis réunies sans doublons.
+
     Returns:
         JSON: Une réponse JSON contenant les films retournés ou un message d'erreur le cas échéant.
 
@@ -426,7 +881,8 @@ def api_themoviedb_get():
 
     HTTP Status Codes:
         - 200 OK: Si les films sont récupérés avec succès depuis l'API.
-        - 400 Bad Request: Si une opération incorrecte ou un format de catégorie de genre invalide est spécifié.
+        - 400 Bad Request: Si une opération incorrecte, un format de catégorie de genre invalide ou un nombre
+          de pages invalide est spécifié.
         - 500 Internal Server Error: Si une exception non gérée se produit pendant le traitement.
     """
     
@@ -434,20 +890,24 @@ def api_themoviedb_get():
         # Récupération des données de la chaîne de requête
         operationId = request.args.get("operationId")
         inputContent = request.args.get("inputContent")
+        try:
+            pages, max_results = tmdb_pages()
+        except ValueError as e:
+            return jsonify({"status": "400", "message": str(e)}), 400
         
         api_key = app.config['API_KEY']
         tmdb = TheMovieDB(api_key)
         
         if int(operationId) == 1:
-            response = tmdb.search_movie_by_name(inputContent)
+            response = tmdb.search_movie_by_name(inputContent, pages, max_results)
         elif int(operationId) == 2:
             try:
                 genre_names = json.loads(inputContent)
-                response = tmdb.get_movies_by_category(genre_names)
+                response = tmdb.get_movies_by_category(genre_names, pages, max_results)
             except json.JSONDecodeError:
                 return jsonify({"status": "400", "message": "Format de catégorie de genre invalide"}), 400
         elif int(operationId) == 3:
-            response = tmdb.get_movies_by_year(inputContent)
+            response = tmdb.get_movies_by_year(inputContent, pages, max_results)
         else:
             response = {
                 "status": "404",
@@ -502,17 +962,21 @@ def api_themoviedb_get_fast_search():
     try:
         # Récupère l'identifiant de l'opération que l'utilisateur souhaite faire
         operationId = int(request.args.get("operationId"))
+        try:
+            pages, max_results = tmdb_pages()
+        except ValueError as e:
+            return jsonify({"status": "400", "message": str(e)}), 400
         
         # Initialise une instance de la classe TheMovieDB avec la clé API
         api_key = app.config['API_KEY']
         tmdb = TheMovieDB(api_key)
         
         if operationId == 1:
-            response = tmdb.get_movies_by_popularity()
+            response = tmdb.get_movies_by_popularity(pages, max_results)
         elif operationId == 2:
-            response = tmdb.get_movies_now_playing()
+            response = tmdb.get_movies_now_playing(pages, max_results)
         else:
-            response = tmdb.get_movies_horror()
+            response = tmdb.get_movies_horror(pages, max_results)
             
         return response
     except Exception as e:
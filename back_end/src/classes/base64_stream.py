@@ -0,0 +1,76 @@
+import binascii     # Pour le décodage base64 par morceaux.
+
+"""
+|
+|   Décodage base64 par morceaux des images de couverture envoyées dans le JSON.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class Base64Stream:
+    """
+    Flux en lecture qui décode une chaîne base64 par morceaux.
+
+    La chaîne n'est jamais copiée ni décodée en entier : chaque lecture ne convertit qu'un morceau de la
+    chaîne (une tranche de memoryview pour les octets), ce qui permet de l'écrire sur le disque avec
+    CoverStore.write_stream en gardant une mémoire de travail de taille fixe. Les blancs (retours à la ligne
+    des encodeurs MIME) sont ignorés ; les caractères restants sont décodés par groupes de 4.
+
+    Attributes:
+        data (str | memoryview): La chaîne base64.
+        position (int): La position du prochain caractère à lire.
+        carry (bytes): Les caractères lus qui ne forment pas encore un groupe de 4.
+
+    Class Attributes:
+        ignored (bytes): Les caractères ignorés par le décodage.
+
+    Methods:
+        read(size): Retourne les prochains octets décodés.
+    """
+
+    ignored = b' \t\r\n'
+
+    def __init__(self, data, start: int = 0):
+        """
+            Initialise le flux.
+
+        Args:
+            data (str | bytes): La chaîne base64 (str du JSON ou octets du corps de la requête).
+            start (int): La position du premier caractère base64 (après l'en-tête « data:image/…;base64, »).
+        """
+        self.data = data if isinstance(data, str) else memoryview(data)
+        self.position = start
+        self.carry = b''
+
+    def read(self, size: int = -1) -> bytes:
+        """
+            Retourne les prochains octets décodés (au plus size octets, à 3 octets près).
+
+        Args:
+            size (int): Le nombre d'octets souhaités, -1 pour tout le reste de la chaîne.
+
+        Returns:
+            bytes: Les octets décodés, b'' à la fin de la chaîne.
+
+        Raises:
+            binascii.Error: Si la chaîne n'est pas du base64 valide.
+        """
+        if size is None or size < 0:
+            size = len(self.data)
+        encoded_size = max(4, size // 3 * 4)
+
+        while self.position < len(self.data):
+            chunk = self.data[self.position:self.position + encoded_size]
+            self.position += len(chunk)
+            chunk = chunk.encode('ascii') if isinstance(chunk, str) else chunk.tobytes()
+            chunk = self.carry + chunk.translate(None, self.ignored)
+
+            usable = len(chunk) - len(chunk) % 4
+            self.carry = chunk[usable:]
+            if usable:
+                return binascii.a2b_base64(chunk[:usable])
+
+        # Fin de la chaîne : les derniers caractères doivent former un groupe complet (padding « = »)
+        chunk, self.carry = self.carry, b''
+        return binascii.a2b_base64(chunk) if chunk else b''
@@ -0,0 +1,132 @@
+import base64                                       # Pour l'encodage des images de couverture.
+import os                                           # Pour les opérations sur le système de fichiers.
+from src.classes.library_cache import LibraryCache  # Cache LRU borné validé par signature
+
+"""
+|
+|   Cache LRU en mémoire des images de couverture encodées en base64.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class CoverCache(LibraryCache):
+    """
+    Cache LRU borné des images de couverture encodées en base64, partagé par toutes les requêtes du processus.
+
+    Les entrées sont indexées par chemin d'image et validées par la signature (mtime_ns, taille) du fichier :
+    une image réécrite est encodée à nouveau. La taille d'une entrée est la longueur de la chaîne base64,
+    le total est borné par max_bytes.
+
+    Methods:
+        encode(image_path): Retourne l'image encodée en base64, depuis le cache si le fichier n'a pas changé.
+        warm(image_path, image_data): Ajoute au cache une image qui vient d'être enregistrée.
+        evict(image_path): Retire une image du cache.
+    """
+
+    @staticmethod
+    def normalize(image_path: str) -> str:
+        """
+            Retourne la clé du cache d'une image (les chemins enregistrés sous Windows utilisent '\\').
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            str: Le chemin normalisé.
+        """
+        return image_path.replace("\\", "/")
+
+    @staticmethod
+    def file_signature(image_path: str) -> tuple:
+        """
+            Retourne la signature (mtime_ns, taille) d'une image.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            tuple: La signature.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+        """
+        stat = os.stat(image_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def encode(self, image_path: str) -> str:
+        """
+            Retourne l'image encodée en base64, depuis le cache si le fichier n'a pas changé.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            str: L'image encodée en base64.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+        """
+        path = self.normalize(image_path)
+        signature = self.file_signature(path)
+        encoded_string = self.get(path, signature)
+        if encoded_string is None:
+            with open(path, "rb") as image_file:
+                encoded_string = base64.b64encode(image_file.read()).decode("utf-8")
+            self.put(path, signature, encoded_string, len(encoded_string))
+        return encoded_string
+
+    def warm(self, image_path: str, image_data: bytes):
+        """
+            Ajoute au cache une image qui vient d'être enregistrée, sans la relire.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+            image_data (bytes): Le contenu de l'image.
+        """
+        path = self.normalize(image_path)
+        encoded_string = base64.b64encode(image_data).decode("utf-8")
+        self.put(path, self.file_signature(path), encoded_string, len(encoded_string))
+
+    def evict(self, image_path: str):
+        """
+            Retire une image du cache (image supprimée).
+
+        Args:
+            image_path (str): Le chemin de l'image.
+        """
+        self.invalidate(self.normalize(image_path))
+
+"""
+|
+|   Cache partagé
+|
+"""
+
+_cover_cache = None
+
+def configure_cover_cache(config) -> CoverCache:
+    """
+        Configure le cache global des images à partir de la configuration Flask.
+
+    Args:
+        config (dict): La configuration de l'application (COVER_BASE64_CACHE_MAX_BYTES).
+
+    Returns:
+        CoverCache: Le cache configuré.
+    """
+    global _cover_cache
+    _cover_cache = CoverCache(config.get('COVER_BASE64_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    return _cover_cache
+
+def get_cover_cache() -> CoverCache:
+    """
+        Retourne le cache global des images (32 Mo si aucun cache n'a été configuré).
+
+    Returns:
+        CoverCache: Le cache des images.
+    """
+    global _cover_cache
+    if _cover_cache is None:
+        _cover_cache = CoverCache(32 * 1024 * 1024)
+    return _cover_cache
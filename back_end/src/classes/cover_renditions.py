@@ -0,0 +1,247 @@
+import base64                                       # Pour l'encodage des aperçus en data URI.
+import io                                           # Pour l'encodage des aperçus en mémoire.
+import os                                           # Pour les opérations sur le système de fichiers.
+import threading                                    # Pour la liste des images en cours de traitement.
+from concurrent.futures import ThreadPoolExecutor   # Pour le traitement des images hors du thread de la requête.
+from src.classes.cover_store import CoverStore      # Stockage des images adressé par contenu
+from src.classes.repository import get_repository   # Dépôt dans lequel les aperçus sont enregistrés
+
+try:
+    from PIL import Image                           # Pillow est optionnel : sans lui, les images sont servies telles quelles
+except ImportError:
+    Image = None
+
+"""
+|
+|   Déclinaisons WebP des images de couverture (vignette de la grille, page de détail, taille d'origine).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class CoverRenditions:
+    """
+    Produit les déclinaisons WebP d'une image de couverture gérée par CoverStore : grid (largeur 342 px,
+    grille de la vidéothèque), detail (780 px, page d'un film) et original (taille d'origine).
+
+    Les déclinaisons sont calculées par un groupe borné de threads, hors du thread de la requête. Tant
+    qu'une déclinaison n'existe pas, Movie.cover_url renvoie l'URL de l'image d'origine. Une image
+    identique n'étant stockée qu'une fois, ses déclinaisons ne sont calculées qu'une fois.
+
+    Le même traitement calcule l'aperçu de l'image (placeholder) : une image WebP d'une vingtaine de pixels
+    encodée en data URI, enregistrée dans le champ cover_placeholder des films qui utilisent l'image et
+    affichée par la grille en attendant la vignette. Les films d'un même utilisateur sont mis à jour en
+    une seule écriture.
+
+    Sans Pillow, aucune déclinaison ni aucun aperçu n'est produit et les images sont servies telles qu'envoyées.
+
+    Class Attributes:
+        widths (dict): La largeur maximale de chaque déclinaison (None pour la taille d'origine).
+        quality (int): La qualité de l'encodage WebP.
+        placeholder_width (int): La largeur de l'aperçu.
+        placeholder_quality (int): La qualité de l'encodage WebP de l'aperçu.
+        workers (int): Le nombre de threads du groupe (COVER_RENDITION_WORKERS).
+        executor (ThreadPoolExecutor): Le groupe de threads, créé à la première image.
+        pending (dict): Les images en attente ou en cours de traitement, et les films (user_id, id) dont
+                        l'aperçu est à enregistrer.
+        lock (threading.Lock): Le verrou de pending et de executor.
+
+    Methods:
+        available(): Indique si Pillow est installé.
+        is_complete(image_path): Indique si toutes les déclinaisons d'une image existent.
+        submit(image_path, owner): Planifie le calcul des déclinaisons et de l'aperçu d'une image.
+        generate(image_path): Calcule les déclinaisons manquantes d'une image.
+        placeholder(image_path): Retourne l'aperçu d'une image (data URI).
+        save_placeholders(image_path, owners, placeholder): Enregistre l'aperçu d'une image dans des films.
+    """
+
+    widths = {"grid": 342, "detail": 780, "original": None}
+    quality = 80
+    placeholder_width = 20
+    placeholder_quality = 40
+    workers = 2
+    executor = None
+    pending = {}
+    lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """
+            Indique si les déclinaisons peuvent être calculées (Pillow est installé).
+
+        Returns:
+            bool: True si Pillow est installé.
+        """
+        return Image is not None
+
+    @classmethod
+    def is_complete(cls, image_path: str) -> bool:
+        """
+            Indique si toutes les déclinaisons d'une image existent.
+
+        Args:
+            image_path (str): Le chemin de l'image gérée.
+
+        Returns:
+            bool: True si l'image n'a plus de déclinaison à calculer.
+        """
+        return all(os.path.exists(CoverStore.rendition_path(image_path, size)) for size in cls.widths)
+
+    @classmethod
+    def submit(cls, image_path: str, owner: tuple = None) -> bool:
+        """
+            Planifie le calcul des déclinaisons d'une image sur le groupe de threads, et l'enregistrement
+            de son aperçu dans le film owner. Sans effet si Pillow n'est pas installé, si l'image n'est pas
+            gérée par CoverStore ou s'il n'y a rien à calculer ; si l'image est déjà planifiée, le film est
+            ajouté à ceux du traitement en attente.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+            owner (tuple): Le film (user_id, id) qui utilise l'image, None pour les seules déclinaisons.
+
+        Returns:
+            bool: True si un traitement a été planifié.
+        """
+        if not cls.available() or not CoverStore.is_managed(image_path):
+            return False
+        image_path = image_path.replace("\\", "/")
+
+        with cls.lock:
+            if image_path in cls.pending:
+                if owner is not None:
+                    cls.pending[image_path].add(owner)
+                return False
+            if owner is None and cls.is_complete(image_path):
+                return False
+            cls.pending[image_path] = {owner} if owner is not None else set()
+            if cls.executor is None:
+                cls.executor = ThreadPoolExecutor(max_workers=cls.workers, thread_name_prefix="cover-renditions")
+
+        cls.executor.submit(cls._generate_and_release, image_path)
+        return True
+
+    @classmethod
+    def _generate_and_release(cls, image_path: str):
+        """
+            Calcule les déclinaisons d'une image (tâche du groupe de threads), la retire de pending
+            puis enregistre son aperçu dans les films en attente.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+        """
+        owners = set()
+        try:
+            cls.generate(image_path)
+        except Exception as e:
+            print(f"Erreur lors du calcul des déclinaisons de l'image {image_path} : {e}")
+        finally:
+            with cls.lock:
+                owners = cls.pending.pop(image_path, set())
+
+        if owners:
+            try:
+                cls.save_placeholders(image_path, owners, cls.placeholder(image_path))
+            except Exception as e:
+                print(f"Erreur lors de l'enregistrement de l'aperçu de l'image {image_path} : {e}")
+
+    @classmethod
+    def generate(cls, image_path: str) -> int:
+        """
+            Calcule les déclinaisons manquantes d'une image. Une image plus petite qu'une déclinaison
+            n'est pas agrandie. Chaque déclinaison est écrite dans un fichier temporaire puis renommée.
+
+        Args:
+            image_path (str): Le chemin de l'image gérée.
+
+        Returns:
+            int: Le nombre de déclinaisons écrites.
+
+        Raises:
+            OSError: Si l'image ne peut pas être lue (fichier supprimé, format non reconnu par Pillow).
+        """
+        missing = [size for size in cls.widths if not os.path.exists(CoverStore.rendition_path(image_path, size))]
+        if not missing or not cls.available():
+            return 0
+
+        with Image.open(image_path) as source:
+            source.load()
+            image = source.convert("RGBA" if "A" in source.getbands() or "transparency" in source.info else "RGB")
+
+        for size in missing:
+            width = cls.widths[size]
+            rendition = image
+            if width is not None and image.width > width:
+                rendition = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+
+            rendition_path = CoverStore.rendition_path(image_path, size)
+            temporary_path = f"{rendition_path}.{threading.get_ident()}.tmp"
+            rendition.save(temporary_path, "WEBP", quality=cls.quality, method=4)
+            os.replace(temporary_path, rendition_path)
+        return len(missing)
+
+    @classmethod
+    def placeholder(cls, image_path: str) -> str:
+        """
+            Retourne l'aperçu d'une image : une image WebP de placeholder_width pixels de large encodée
+            en data URI (quelques centaines d'octets). La vignette de la grille est lue si elle existe,
+            plutôt que l'image d'origine.
+
+        Args:
+            image_path (str): Le chemin de l'image gérée.
+
+        Returns:
+            str: L'aperçu (data:image/webp;base64,…), ou None si Pillow n'est pas installé.
+
+        Raises:
+            OSError: Si l'image ne peut pas être lue.
+        """
+        if not cls.available():
+            return None
+
+        grid_path = CoverStore.rendition_path(image_path, "grid")
+        with Image.open(grid_path if os.path.exists(grid_path) else image_path) as source:
+            source.draft("RGB", (cls.placeholder_width * 4, cls.placeholder_width * 4))    # Décodage réduit des JPEG
+            image = source.convert("RGB")
+        height = max(1, round(image.height * cls.placeholder_width / image.width))
+        image = image.resize((cls.placeholder_width, height), Image.BILINEAR)
+
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=cls.placeholder_quality)
+        return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    @staticmethod
+    def save_placeholders(image_path: str, owners, placeholder: str) -> int:
+        """
+            Enregistre l'aperçu d'une image dans les films qui l'utilisent encore, en une écriture par utilisateur.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+            owners (iterable): Les films (user_id, id) concernés.
+            placeholder (str): L'aperçu de l'image.
+
+        Returns:
+            int: Le nombre de films mis à jour.
+        """
+        if placeholder is None:
+            return 0
+
+        movies_by_user = {}
+        for user_id, movie_id in owners:
+            movies_by_user.setdefault(user_id, []).append(movie_id)
+
+        repository = get_repository()
+        nb_movies = 0
+        for user_id, movie_ids in movies_by_user.items():
+            operations = []
+            for movie_id in movie_ids:
+                movie = repository.get_movie(user_id, movie_id)
+                if movie is not None and (movie["cover_image_path"] or "").replace("\\", "/") == image_path.replace("\\", "/") \
+                        and movie.get("cover_placeholder") != placeholder:
+                    operations.append({"op": "edit", "id": movie_id, "fields": {"cover_placeholder": placeholder}})
+            if operations:
+                try:
+                    repository.apply_batch(user_id, operations)
+                except FileNotFoundError:
+                    continue
+                nb_movies += len(operations)
+        return nb_movies
@@ -0,0 +1,318 @@
+import hashlib                                      # Pour l'empreinte SHA-256 des images.
+import os                                           # Pour les opérations sur le système de fichiers.
+import re                                           # Pour la reconnaissance des noms de fichiers.
+import threading                                    # Pour le verrou des références.
+import uuid                                         # Pour le nom des fichiers temporaires d'envoi.
+from src.classes.cover_cache import get_cover_cache # Cache des images encodées en base64
+from src.classes.repository import get_repository   # Dépôt qui conserve le nombre de références
+
+"""
+|
+|   Stockage des images de couverture adressé par contenu (empreinte SHA-256).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class CoverUploadError(ValueError):
+    """
+    Erreur lors de la réception d'une image envoyée en flux (image trop grande ou format non reconnu).
+
+    Attributes:
+        status (int): Le code HTTP à renvoyer au client (413 ou 415).
+    """
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+class CoverStore:
+    """
+    Stocke les images de couverture sous leur empreinte SHA-256 : storage/covers/ab/cd/abcd….{format}.
+
+    Des images identiques ne sont écrites qu'une fois, quel que soit le nombre de films (et d'utilisateurs)
+    qui les utilisent. Le dépôt de données compte les films qui référencent chaque image : une image n'est
+    supprimée que lorsque son dernier film est supprimé. Le contenu d'un fichier ne change jamais, son nom
+    sert donc de validateur de cache (ETag).
+
+    Les anciennes images ({nom}_{user_id}.{format}), l'image par défaut et les images TheMovieDB ne sont
+    pas gérées par ce stockage.
+
+    Class Attributes:
+        root (str): Le dossier des images.
+        name_pattern (re.Pattern): Le format du nom d'une image gérée (empreinte.format).
+        lock (threading.Lock): Le verrou qui rend atomiques « écrire puis référencer » et « libérer puis supprimer ».
+        chunk_size (int): La taille des morceaux lus lors de la réception d'une image en flux.
+        max_bytes (int): La taille maximale d'une image reçue en flux (COVER_UPLOAD_MAX_BYTES).
+        signatures (tuple): Les premiers octets (nombres magiques) des formats d'image acceptés.
+        rendition_sizes (tuple): Les tailles des déclinaisons WebP d'une image (voir CoverRenditions).
+        rendition_pattern (re.Pattern): Le format du nom d'une déclinaison (empreinte.taille.webp).
+
+    Methods:
+        is_managed(image_path): Indique si une image est gérée par ce stockage.
+        path_from_name(image_name): Retourne le chemin d'une image à partir de son nom.
+        digest(image_path): Retourne l'empreinte d'une image gérée.
+        rendition_path(image_path, size): Retourne le chemin d'une déclinaison WebP d'une image gérée.
+        rendition_from_name(rendition_name): Retourne le chemin d'une déclinaison à partir de son nom.
+        write(image_data, image_format): Écrit une image sous son empreinte, sans ajouter de référence.
+        store(image_data, image_format): Enregistre une image et ajoute une référence.
+        sniff(header): Reconnaît le format d'une image à partir de ses premiers octets.
+        write_stream(stream, max_bytes, default_format, acquire): Écrit une image reçue en flux sous son empreinte.
+        acquire(image_path): Ajoute une référence à une image déjà écrite.
+        release(image_path): Retire une référence et supprime l'image (et ses déclinaisons) si elle n'est plus utilisée.
+    """
+
+    root = os.path.join('storage', 'covers')
+    name_pattern = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+    lock = threading.Lock()
+    chunk_size = 64 * 1024
+    max_bytes = 10 * 1024 * 1024
+    rendition_sizes = ('grid', 'detail', 'original')
+    rendition_pattern = re.compile(r'^([0-9a-f]{64})\.(grid|detail|original)\.webp$')
+    signatures = (
+        (b'\xff\xd8\xff', 'jpg'),
+        (b'\x89PNG\r\n\x1a\n', 'png'),
+        (b'GIF87a', 'gif'),
+        (b'GIF89a', 'gif')
+    )
+
+    @classmethod
+    def is_managed(cls, image_path: str) -> bool:
+        """
+            Indique si une image est gérée par ce stockage (nom = empreinte, rangée dans son sous-dossier).
+
+        Args:
+            image_path (str): Le chemin de l'image enregistré dans le film.
+
+        Returns:
+            bool: True si l'image est adressée par son contenu.
+        """
+        if not image_path:
+            return False
+        image_name = os.path.basename(image_path.replace("\\", "/"))
+        return bool(cls.name_pattern.match(image_name)) and \
+            image_path.replace("\\", "/") == cls.path_from_name(image_name).replace("\\", "/")
+
+    @classmethod
+    def path_from_name(cls, image_name: str) -> str:
+        """
+            Retourne le chemin d'une image gérée à partir de son nom.
+
+        Args:
+            image_name (str): Le nom de l'image (empreinte.format).
+
+        Returns:
+            str: Le chemin de l'image, ou None si le nom n'est pas celui d'une image gérée.
+        """
+        if not cls.name_pattern.match(image_name):
+            return None
+        return os.path.join(cls.root, image_name[:2], image_name[2:4], image_name)
+
+    @staticmethod
+    def digest(image_path: str) -> str:
+        """
+            Retourne l'empreinte SHA-256 d'une image gérée (tirée de son nom).
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            str: L'empreinte hexadécimale.
+        """
+        return os.path.splitext(os.path.basename(image_path.replace("\\", "/")))[0]
+
+    @classmethod
+    def rendition_path(cls, image_path: str, size: str) -> str:
+        """
+            Retourne le chemin d'une déclinaison WebP d'une image gérée, rangée à côté de l'image.
+
+        Args:
+            image_path (str): Le chemin de l'image gérée.
+            size (str): La taille de la déclinaison (grid, detail ou original).
+
+        Returns:
+            str: Le chemin de la déclinaison (empreinte.taille.webp).
+        """
+        return os.path.join(os.path.dirname(image_path.replace("\\", "/")), f"{cls.digest(image_path)}.{size}.webp")
+
+    @classmethod
+    def rendition_from_name(cls, rendition_name: str) -> str:
+        """
+            Retourne le chemin d'une déclinaison à partir de son nom.
+
+        Args:
+            rendition_name (str): Le nom de la déclinaison (empreinte.taille.webp).
+
+        Returns:
+            str: Le chemin de la déclinaison, ou None si le nom n'est pas celui d'une déclinaison.
+        """
+        match = cls.rendition_pattern.match(rendition_name)
+        if not match:
+            return None
+        digest = match.group(1)
+        return os.path.join(cls.root, digest[:2], digest[2:4], rendition_name)
+
+    @classmethod
+    def write(cls, image_data: bytes, image_format: str) -> str:
+        """
+            Écrit une image sous son empreinte si elle n'existe pas déjà, sans ajouter de référence
+            (utilisé par store() et par les migrations, qui recomptent ensuite les références).
+
+        Args:
+            image_data (bytes): Le contenu de l'image.
+            image_format (str): Le format de l'image (jpg, png, webp…).
+
+        Returns:
+            str: Le chemin de l'image.
+        """
+        image_name = f"{hashlib.sha256(image_data).hexdigest()}.{image_format.lower()}"
+        image_path = cls.path_from_name(image_name)
+        if not os.path.exists(image_path):
+            os.makedirs(os.path.dirname(image_path), exist_ok=True)
+            temporary_path = f"{image_path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, 'wb') as file:
+                file.write(image_data)
+            os.replace(temporary_path, image_path)
+        return image_path
+
+    @classmethod
+    def store(cls, image_data: bytes, image_format: str) -> str:
+        """
+            Enregistre une image sous son empreinte et ajoute une référence.
+            Le fichier n'est écrit que s'il n'existe pas déjà.
+
+        Args:
+            image_data (bytes): Le contenu de l'image.
+            image_format (str): Le format de l'image (jpg, png, webp…).
+
+        Returns:
+            str: Le chemin de l'image.
+        """
+        with cls.lock:
+            image_path = cls.write(image_data, image_format)
+            get_repository().acquire_cover(image_path)
+
+            # L'image encodée est mise en cache : le prochain chargement de la vidéothèque ne la relira pas
+            get_cover_cache().warm(image_path, image_data)
+        return image_path
+
+    @classmethod
+    def sniff(cls, header: bytes) -> str:
+        """
+            Reconnaît le format d'une image à partir de ses premiers octets, sans se fier au type annoncé par le client.
+
+        Args:
+            header (bytes): Les premiers octets de l'image (au moins 12).
+
+        Returns:
+            str: Le format de l'image (jpg, png, gif, webp), ou None s'il n'est pas reconnu.
+        """
+        if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+            return 'webp'
+        for signature, image_format in cls.signatures:
+            if header.startswith(signature):
+                return image_format
+        return None
+
+    @classmethod
+    def write_stream(cls, stream, max_bytes: int = None, default_format: str = None, acquire: bool = False) -> str:
+        """
+            Écrit une image reçue en flux sous son empreinte.
+
+            Le flux est copié par morceaux de chunk_size octets dans un fichier temporaire pendant que l'empreinte
+            est calculée : l'image n'est jamais entièrement en mémoire. Le fichier est ensuite renommé sous son
+            empreinte (ou supprimé si une image identique existe déjà).
+
+        Args:
+            stream: Le flux de l'image (objet possédant une méthode read).
+            max_bytes (int): La taille maximale de l'image (CoverStore.max_bytes par défaut).
+            default_format (str): Le format retenu si les premiers octets ne sont pas reconnus, None pour refuser l'image.
+            acquire (bool): True pour ajouter une référence à l'image (comme store()).
+
+        Returns:
+            str: Le chemin de l'image.
+
+        Raises:
+            CoverUploadError: Si l'image dépasse max_bytes (413) ou si son format n'est pas reconnu (415).
+        """
+        max_bytes = cls.max_bytes if max_bytes is None else max_bytes
+        os.makedirs(cls.root, exist_ok=True)
+        temporary_path = os.path.join(cls.root, f"upload.{uuid.uuid4().hex}.tmp")
+        sha256 = hashlib.sha256()
+        size = 0
+        image_format = None
+
+        try:
+            with open(temporary_path, 'wb') as file:
+                while True:
+                    chunk = stream.read(cls.chunk_size)
+                    if not chunk:
+                        break
+                    if image_format is None:
+                        # Le premier morceau d'un flux réseau peut être plus court que l'en-tête recherché
+                        while len(chunk) < 12:
+                            more = stream.read(cls.chunk_size)
+                            if not more:
+                                break
+                            chunk += more
+                        image_format = cls.sniff(chunk) or default_format
+                        if image_format is None:
+                            raise CoverUploadError("Le format de l'image n'est pas reconnu (jpg, png, gif ou webp).", 415)
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise CoverUploadError(f"L'image dépasse la taille maximale de {max_bytes} octets.", 413)
+                    sha256.update(chunk)
+                    file.write(chunk)
+
+            if image_format is None:
+                raise CoverUploadError("L'image est vide.", 415)
+
+            image_path = cls.path_from_name(f"{sha256.hexdigest()}.{image_format}")
+            os.makedirs(os.path.dirname(image_path), exist_ok=True)
+            with cls.lock:
+                if not os.path.exists(image_path):
+                    os.replace(temporary_path, image_path)
+                if acquire:
+                    get_repository().acquire_cover(image_path)
+            return image_path
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    @classmethod
+    def acquire(cls, image_path: str) -> bool:
+        """
+            Ajoute une référence à une image déjà écrite (image envoyée en flux puis utilisée par un film).
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            bool: False si l'image n'existe plus (elle a été supprimée entre l'envoi et l'ajout du film).
+        """
+        with cls.lock:
+            if not os.path.exists(image_path):
+                return False
+            get_repository().acquire_cover(image_path)
+            return True
+
+    @classmethod
+    def release(cls, image_path: str) -> bool:
+        """
+            Retire une référence à une image et la supprime si plus aucun film ne l'utilise.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            bool: True si le fichier a été supprimé.
+        """
+        with cls.lock:
+            if get_repository().release_cover(image_path) > 0:
+                return False
+            for path in [image_path] + [cls.rendition_path(image_path, size) for size in cls.rendition_sizes]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        get_cover_cache().evict(image_path)
+        return True
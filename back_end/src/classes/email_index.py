@@ -0,0 +1,111 @@
+import json         # Pour la manipulation de fichiers JSON.
+import os           # Pour les opérations sur le système de fichiers.
+
+"""
+|
+|   Index e-mail -> identifiant d'utilisateur, persisté à côté de users.json.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class EmailIndex:
+    """
+    Index en mémoire des adresses e-mail des utilisateurs, persisté dans storage/users.index.json.
+
+    Le fichier persisté correspond à un instantané précis de users.json : il enregistre la signature
+    (mtime_ns, taille) de cet instantané. Au démarrage, l'index est rechargé tel quel si la signature
+    correspond, puis les opérations du journal des utilisateurs sont rejouées par-dessus. Sinon (fichier
+    absent ou users.json réécrit entre-temps), il est reconstruit à partir de users.json et persisté.
+
+    Attributes:
+        path (str): Le chemin du fichier de l'index.
+        emails (dict): Le dictionnaire e-mail -> identifiant d'utilisateur.
+        signature (tuple): La signature des fichiers des utilisateurs reflétée par l'index en mémoire.
+
+    Methods:
+        load(snapshot_signature): Recharge l'index persisté s'il correspond à l'instantané.
+        rebuild(users, snapshot_signature): Reconstruit l'index à partir des utilisateurs et le persiste.
+        save(snapshot_signature): Persiste l'index.
+        apply_record(record): Applique une opération du journal des utilisateurs à l'index.
+        get(email): Retourne l'identifiant de l'utilisateur qui utilise un e-mail.
+    """
+
+    def __init__(self, path: str):
+        """
+            Initialise un index vide (non synchronisé).
+
+        Args:
+            path (str): Le chemin du fichier de l'index.
+        """
+        self.path = path
+        self.emails = {}
+        self.signature = None
+
+    def load(self, snapshot_signature: tuple) -> bool:
+        """
+            Recharge l'index persisté s'il a été construit pour l'instantané indiqué.
+
+        Args:
+            snapshot_signature (tuple): La signature (mtime_ns, taille) de users.json.
+
+        Returns:
+            bool: True si l'index a été rechargé, False s'il est absent ou périmé.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                stored = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+        if stored.get("snapshot") != list(snapshot_signature or []):
+            return False
+        self.emails = stored["emails"]
+        return True
+
+    def rebuild(self, users: dict, snapshot_signature: tuple):
+        """
+            Reconstruit l'index à partir des utilisateurs de l'instantané et le persiste.
+
+        Args:
+            users (dict): Les utilisateurs de l'instantané users.json.
+            snapshot_signature (tuple): La signature (mtime_ns, taille) de users.json.
+        """
+        self.emails = {user_data['email']: user_id for user_id, user_data in users.items()}
+        self.save(snapshot_signature)
+
+    def save(self, snapshot_signature: tuple):
+        """
+            Persiste l'index de manière atomique (fichier temporaire puis remplacement).
+
+        Args:
+            snapshot_signature (tuple): La signature de l'instantané users.json correspondant à l'index.
+        """
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({"snapshot": list(snapshot_signature or []), "emails": self.emails}, file)
+        os.replace(temporary_path, self.path)
+
+    def apply_record(self, record: dict):
+        """
+            Applique une opération du journal des utilisateurs à l'index.
+
+        Args:
+            record (dict): L'opération ({"op": "add", "id", "user"} ou {"op": "delete", "id", "email"}).
+        """
+        if record.get("op") == "add":
+            self.emails[record["user"]["email"]] = record["id"]
+        elif record.get("op") == "delete" and self.emails.get(record.get("email")) == record["id"]:
+            del self.emails[record["email"]]
+
+    def get(self, email: str) -> str:
+        """
+            Retourne l'identifiant de l'utilisateur qui utilise un e-mail.
+
+        Args:
+            email (str): L'adresse e-mail.
+
+        Returns:
+            str: L'identifiant de l'utilisateur ou None.
+        """
+        return self.emails.get(email)
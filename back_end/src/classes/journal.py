@@ -0,0 +1,285 @@
+import json         # Pour la manipulation de fichiers JSON.
+import os           # Pour les opérations sur le système de fichiers.
+import threading    # Pour les verrous et la compaction en arrière-plan.
+
+"""
+|
+|   Moteur de stockage journalisé (append-only) pour les fichiers JSON du dossier storage.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class Journal:
+    """
+    Stocke un document JSON sous la forme d'un instantané et d'un journal d'opérations.
+
+    L'instantané est le fichier JSON historique (par exemple storage/movies_{user_id}.json), les fichiers
+    existants sont donc repris tels quels. Chaque écriture ajoute une ligne JSON au journal au lieu de
+    réécrire tout le fichier. La lecture recharge l'instantané puis rejoue le journal ligne par ligne.
+    Lorsque le journal dépasse compaction_threshold octets, un thread d'arrière-plan réécrit l'instantané
+    et vide le journal.
+
+    Attributes:
+        snapshot_path (str): Le chemin de l'instantané JSON.
+        journal_path (str): Le chemin du journal (une opération JSON par ligne).
+        compacting_path (str): Le chemin du journal en cours de compaction.
+        apply_record (callable): Fonction (data, record) qui applique une opération au document.
+        on_compact (callable): Fonction (data) appelée avec le nouvel instantané après une compaction.
+        decode (callable): Fonction qui convertit le JSON de l'instantané en document (identité par défaut).
+        encode (callable): Fonction qui convertit le document en JSON pour l'instantané (identité par défaut).
+
+    Class Attributes:
+        compaction_threshold (int): La taille du journal (en octets) qui déclenche une compaction.
+
+    Methods:
+        exists(): Indique si l'instantané existe.
+        signature(): Retourne les dates de modification et les tailles des fichiers du journal.
+        load(): Reconstruit le document à partir de l'instantané et du journal.
+        load_snapshot(): Charge l'instantané seul, sans rejouer le journal.
+        records(): Parcourt les opérations du journal qui ne sont pas encore dans l'instantané.
+        append(*records): Ajoute des opérations à la fin du journal.
+        write(data): Réécrit entièrement l'instantané et vide le journal.
+        delete(): Supprime l'instantané et le journal.
+        compact(): Réécrit l'instantané à partir du journal puis vide ce dernier.
+    """
+
+    compaction_threshold = 512 * 1024
+
+    _locks = {}                     # Un verrou par fichier journal
+    _locks_guard = threading.Lock()
+    _running = set()                # Les journaux en cours de compaction dans ce processus
+
+    def __init__(self, snapshot_path: str, apply_record, on_compact=None, decode=None, encode=None):
+        """
+            Initialise un journal associé à un instantané JSON.
+
+        Args:
+            snapshot_path (str): Le chemin de l'instantané JSON.
+            apply_record (callable): Fonction (data, record) qui applique une opération au document.
+            on_compact (callable): Fonction (data) appelée avec le nouvel instantané après une compaction.
+            decode (callable): Fonction qui convertit le JSON de l'instantané en document.
+            encode (callable): Fonction qui convertit le document en JSON pour l'instantané.
+        """
+        base_path, _ = os.path.splitext(snapshot_path)
+        self.snapshot_path = snapshot_path
+        self.journal_path = f"{base_path}.journal"
+        self.compacting_path = f"{base_path}.journal.compacting"
+        self.apply_record = apply_record
+        self.on_compact = on_compact
+        self.decode = decode or (lambda data: data)
+        self.encode = encode or (lambda data: data)
+
+        with Journal._locks_guard:
+            self.lock = Journal._locks.setdefault(self.journal_path, threading.RLock())
+
+    def exists(self) -> bool:
+        """
+            Indique si l'instantané existe.
+
+        Returns:
+            bool: True si l'instantané existe, False sinon.
+        """
+        return os.path.exists(self.snapshot_path)
+
+    def signature(self) -> tuple:
+        """
+            Retourne les dates de modification et les tailles de l'instantané et des journaux.
+            La signature change à chaque écriture, y compris depuis un autre processus.
+
+        Returns:
+            tuple: Un couple (mtime_ns, taille) par fichier, None pour un fichier absent.
+        """
+        signature = []
+        for path in (self.snapshot_path, self.compacting_path, self.journal_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load(self) -> dict:
+        """
+            Reconstruit le document à partir de l'instantané et du journal.
+
+        Returns:
+            dict: Le document reconstruit.
+
+        Raises:
+            FileNotFoundError: Si l'instantané n'existe pas.
+        """
+        with self.lock:
+            return self._read(self.compacting_path, self.journal_path)
+
+    def load_snapshot(self) -> dict:
+        """
+            Charge l'instantané seul, sans rejouer le journal.
+
+        Returns:
+            dict: Le contenu de l'instantané.
+
+        Raises:
+            FileNotFoundError: Si l'instantané n'existe pas.
+        """
+        with self.lock:
+            return self._read()
+
+    def records(self):
+        """
+            Parcourt les opérations du journal qui ne sont pas encore dans l'instantané.
+            Le verrou doit être tenu par l'appelant pendant le parcours.
+
+        Returns:
+            iterable: Les opérations, dans l'ordre où elles ont été ajoutées.
+        """
+        return self._replay(self.compacting_path, self.journal_path)
+
+    def append(self, *records: dict):
+        """
+            Ajoute des opérations à la fin du journal.
+            Si la dernière ligne du journal est tronquée (écriture interrompue), les opérations commencent
+            sur une nouvelle ligne : la ligne tronquée reste seule et est ignorée à la relecture.
+            Une compaction est lancée en arrière-plan si le journal devient trop volumineux.
+
+        Args:
+            *records (dict): Les opérations à ajouter.
+        """
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+        with self.lock:
+            with open(self.journal_path, 'ab+') as file:
+                if file.tell() > 0:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        lines = b"\n" + lines
+                file.write(lines)
+                file.flush()
+                size = file.tell()
+
+        if size >= Journal.compaction_threshold:
+            self.compact_in_background()
+
+    def write(self, data: dict):
+        """
+            Réécrit entièrement l'instantané et vide le journal.
+
+        Args:
+            data (dict): Le contenu JSON de l'instantané.
+        """
+        with self.lock:
+            self._write_snapshot(data)
+            for path in (self.compacting_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def delete(self):
+        """
+            Supprime l'instantané et le journal.
+        """
+        with self.lock:
+            for path in (self.snapshot_path, self.compacting_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def compact_in_background(self):
+        """
+            Lance la compaction dans un thread d'arrière-plan si elle n'est pas déjà en cours.
+        """
+        with Journal._locks_guard:
+            if self.journal_path in Journal._running:
+                return
+            Journal._running.add(self.journal_path)
+
+        threading.Thread(target=self._compact_and_release, daemon=True).start()
+
+    def compact(self):
+        """
+            Réécrit l'instantané à partir du journal puis vide ce dernier.
+
+            Le journal est d'abord renommé afin que les écritures suivantes continuent dans un nouveau journal
+            pendant la réécriture de l'instantané. Le verrou n'est tenu que pour le renommage et le remplacement
+            final, les requêtes ne sont donc pas bloquées pendant la sérialisation.
+        """
+        with self.lock:
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.journal_path):
+                    return
+                os.replace(self.journal_path, self.compacting_path)
+
+        data = self._read(self.compacting_path)
+        temporary_path = f"{self.compacting_path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(self.encode(data), file, indent=4)
+
+        with self.lock:
+            if not os.path.exists(self.compacting_path):    # L'instantané a pu être réécrit entre-temps par write()
+                os.remove(temporary_path)
+                return
+            os.replace(temporary_path, self.snapshot_path)
+            os.remove(self.compacting_path)
+
+        if self.on_compact:
+            self.on_compact(data)
+
+    def _compact_and_release(self):
+        """
+            Exécute la compaction puis libère le marqueur de compaction en cours.
+        """
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Erreur lors de la compaction du journal {self.journal_path} : {e}")
+        finally:
+            with Journal._locks_guard:
+                Journal._running.discard(self.journal_path)
+
+    def _read(self, *journal_paths: str) -> dict:
+        """
+            Charge l'instantané puis rejoue les journaux indiqués dans l'ordre.
+
+        Args:
+            *journal_paths (str): Les journaux à rejouer.
+
+        Returns:
+            dict: Le document reconstruit.
+        """
+        with open(self.snapshot_path, 'r', encoding='utf-8') as file:
+            data = self.decode(json.load(file))
+
+        for record in self._replay(*journal_paths):
+            self.apply_record(data, record)
+        return data
+
+    def _replay(self, *journal_paths: str):
+        """
+            Parcourt les opérations des journaux indiqués, dans l'ordre.
+            Une dernière ligne tronquée (écriture interrompue) est ignorée.
+
+        Args:
+            *journal_paths (str): Les journaux à parcourir.
+
+        Returns:
+            iterable: Les opérations.
+        """
+        for path in journal_paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    def _write_snapshot(self, data: dict):
+        """
+            Écrit l'instantané de manière atomique (fichier temporaire puis remplacement).
+
+        Args:
+            data (dict): Le document à écrire.
+        """
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=4)
+        os.replace(temporary_path, self.snapshot_path)
@@ -0,0 +1,497 @@
+import json                                         # Pour la manipulation de fichiers JSON.
+import os                                           # Pour les opérations sur le système de fichiers.
+from src.classes.email_index import EmailIndex     # Index des e-mails des utilisateurs
+from src.classes.journal import Journal             # Moteur de stockage journalisé
+from src.classes.library import Library             # Vidéothèque en mémoire indexée par identifiant
+from src.classes.library_cache import LibraryCache  # Cache LRU des vidéothèques chargées
+from src.classes.movie_query import MovieQuery      # Tri, filtres et pagination des films
+from src.classes.repository import Repository       # Interface commune des dépôts
+
+"""
+|
+|   Dépôt basé sur les fichiers JSON du dossier storage (users.json et movies_{user_id}.json).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class JsonRepository(Repository):
+    """
+    Dépôt qui stocke les utilisateurs dans users.json et chaque vidéothèque dans movies_{user_id}.json.
+    Ces fichiers sont des instantanés accompagnés d'un journal d'opérations (voir Journal). Les références
+    des images de couverture sont comptées dans covers.json, lui aussi journalisé.
+
+    Les recherches par e-mail passent par un index e-mail -> identifiant (storage/users.index.json), ce qui
+    évite de parcourir tous les utilisateurs à l'inscription et à la connexion.
+
+    Les vidéothèques chargées (Library, indexées par identifiant de film) sont conservées dans un cache LRU
+    validé par la signature des fichiers, et les écritures faites par ce dépôt mettent directement à jour
+    l'entrée en cache, avec ses listes triées, ses index de recherche et ses statistiques.
+
+    Attributes:
+        storage_dir (str): Le dossier de stockage.
+        users_file_path (str): Le chemin du fichier JSON des utilisateurs.
+        users_journal (Journal): Le journal des utilisateurs.
+        email_index (EmailIndex): L'index des e-mails des utilisateurs.
+        cache (LibraryCache): Le cache des vidéothèques chargées.
+        covers_journal (Journal): Le journal des références des images de couverture.
+
+    Methods:
+        journal(user_id): Retourne le journal de la vidéothèque d'un utilisateur.
+        load(user_id): Retourne la vidéothèque en mémoire (Library) d'un utilisateur.
+        apply_user_record(users, record): Applique une opération du journal des utilisateurs.
+        load_users(): Charge le fichier des utilisateurs.
+        sync_email_index(): Met l'index des e-mails en phase avec les fichiers des utilisateurs.
+    """
+
+    def __init__(self, storage_dir: str = 'storage', cache_max_bytes: int = 64 * 1024 * 1024):
+        """
+            Initialise le dépôt sur un dossier de stockage.
+
+        Args:
+            storage_dir (str): Le dossier de stockage.
+            cache_max_bytes (int): La taille maximale du cache des vidéothèques.
+        """
+        self.storage_dir = storage_dir
+        self.users_file_path = os.path.join(storage_dir, 'users.json')
+        self.users_journal = Journal(self.users_file_path, JsonRepository.apply_user_record, self.reindex_emails)
+        self.users_cache = None     # (signature, utilisateurs)
+        self.email_index = EmailIndex(os.path.join(storage_dir, 'users.index.json'))
+        self.cache = LibraryCache(cache_max_bytes)
+        self.covers_journal = Journal(os.path.join(storage_dir, 'covers.json'), JsonRepository.apply_cover_record)
+        self.covers_cache = None    # (signature, références)
+
+    def metrics(self) -> dict:
+        return {"library_cache": self.cache.stats()}
+
+    #
+    #   Utilisateurs
+    #
+
+    @staticmethod
+    def apply_user_record(users: dict, record: dict):
+        """
+            Applique une opération du journal des utilisateurs au dictionnaire des utilisateurs.
+
+            Opérations reconnues :
+            - {"op": "add", "id": str, "user": dict} : ajoute un utilisateur.
+            - {"op": "delete", "id": str, "email": str} : supprime un utilisateur.
+
+        Args:
+            users (dict): Les utilisateurs à modifier.
+            record (dict): L'opération à appliquer.
+        """
+
+        if record.get("op") == "add":
+            users[record["id"]] = record["user"]
+        elif record.get("op") == "delete":
+            users.pop(record["id"], None)
+
+    def load_users(self) -> dict:
+        """
+            Charge les utilisateurs (users.json et son journal) et retourne un dictionnaire d'utilisateurs.
+            Le résultat est conservé en mémoire tant que les fichiers ne changent pas.
+
+        Returns:
+            dict: Un dictionnaire contenant les données des utilisateurs.
+        """
+
+        journal = self.users_journal
+        with journal.lock:
+            if not journal.exists():
+                journal.write({})  # Initialise le fichier avec un objet JSON vide
+
+            signature = journal.signature()
+            if self.users_cache and self.users_cache[0] == signature:
+                return self.users_cache[1]
+
+            try:
+                users = journal.load()
+            except json.JSONDecodeError:
+                users = {}  # Retourne un objet vide si le fichier JSON est mal formaté
+            self.users_cache = (signature, users)
+            return users
+
+    def sync_email_index(self):
+        """
+            Met l'index des e-mails en phase avec les fichiers des utilisateurs.
+
+            L'index persisté est rechargé s'il correspond à l'instantané users.json, sinon il est reconstruit.
+            Les opérations du journal des utilisateurs sont ensuite rejouées. Rien n'est fait si les fichiers
+            n'ont pas changé depuis la dernière synchronisation.
+        """
+
+        journal = self.users_journal
+        with journal.lock:
+            if not journal.exists():
+                journal.write({})
+
+            signature = journal.signature()
+            if self.email_index.signature == signature:
+                return
+
+            if not self.email_index.load(signature[0]):
+                try:
+                    snapshot = journal.load_snapshot()
+                except json.JSONDecodeError:
+                    snapshot = {}
+                self.email_index.rebuild(snapshot, signature[0])
+
+            for record in journal.records():
+                self.email_index.apply_record(record)
+            self.email_index.signature = signature
+
+    def reindex_emails(self, users: dict):
+        """
+            Persiste l'index des e-mails pour le nouvel instantané users.json après une compaction.
+
+        Args:
+            users (dict): Les utilisateurs du nouvel instantané.
+        """
+
+        with self.users_journal.lock:
+            self.email_index.rebuild(users, self.users_journal.signature()[0])
+            self.email_index.signature = None   # Le journal a changé : l'index sera resynchronisé à la prochaine lecture
+
+    def append_user_record(self, record: dict):
+        """
+            Ajoute une opération au journal des utilisateurs et l'applique à l'index des e-mails
+            ainsi qu'aux utilisateurs en mémoire.
+
+        Args:
+            record (dict): L'opération à ajouter.
+        """
+
+        journal = self.users_journal
+        with journal.lock:
+            self.sync_email_index()
+            signature = journal.signature()
+            cached = self.users_cache if self.users_cache and self.users_cache[0] == signature else None
+
+            journal.append(record)
+
+            signature = journal.signature()
+            self.email_index.apply_record(record)
+            self.email_index.signature = signature
+            if cached:
+                self.apply_user_record(cached[1], record)
+                self.users_cache = (signature, cached[1])
+
+    def email_exists(self, email: str) -> bool:
+        self.sync_email_index()
+        return self.email_index.get(email) is not None
+
+    def get_user(self, user_id: str) -> dict:
+        return self.load_users().get(user_id)
+
+    def find_user_by_email(self, email: str) -> tuple:
+        self.sync_email_index()
+        user_id = self.email_index.get(email)
+        if user_id is None:
+            return None
+        user_data = self.get_user(user_id)
+        return (user_id, user_data) if user_data else None
+
+    def add_user(self, user_id: str, user_data: dict) -> bool:
+        with self.users_journal.lock:                       # Vérification et ajout atomiques
+            if self.email_exists(user_data['email']):
+                return False
+            self.append_user_record({"op": "add", "id": user_id, "user": user_data})
+        return True
+
+    def delete_user(self, user_id: str) -> bool:
+        with self.users_journal.lock:
+            user_data = self.get_user(user_id)
+            if not user_data:
+                return False
+            self.append_user_record({"op": "delete", "id": user_id, "email": user_data['email']})
+        return True
+
+    def iter_users(self):
+        return self.load_users().items()
+
+    #
+    #   Vidéothèques
+    #
+
+    def journal(self, user_id: str) -> Journal:
+        """
+            Retourne le journal de la vidéothèque d'un utilisateur.
+            L'instantané reste le fichier historique storage/movies_{user_id}.json.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            Journal: Le journal de la vidéothèque.
+        """
+
+        return Journal(
+            os.path.join(self.storage_dir, f'movies_{user_id}.json'),
+            Library.apply_record,
+            decode=Library.from_dict,
+            encode=Library.to_dict
+        )
+
+    def load(self, user_id: str) -> Library:
+        """
+            Retourne la vidéothèque en mémoire d'un utilisateur, depuis le cache si ses fichiers n'ont pas changé.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            Library: La vidéothèque.
+        """
+
+        journal = self.journal(user_id)
+        with journal.lock:
+            signature = journal.signature()                 # Relevée avant la lecture : une écriture concurrente invalidera l'entrée
+            library = self.cache.get(user_id, signature)
+            if library is None:
+                library = journal.load()
+                self.cache.put(user_id, signature, library, library.memory_size())
+        return library
+
+    def track(self, user_id: str, library: Library):
+        """
+            Met à jour la taille en cache d'une vidéothèque après une lecture qui a pu construire un index
+            (listes triées, recherche, titres, images, versions, voir Library.memory_size).
+            Le verrou du journal doit être tenu par l'appelant.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            library (Library): La vidéothèque lue.
+        """
+
+        self.cache.resize(user_id, library, library.memory_size())
+
+    def append_record(self, user_id: str, journal: Journal, record: dict):
+        """
+            Ajoute une opération au journal et l'applique à la vidéothèque en cache.
+            Le verrou du journal doit être tenu par l'appelant.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            journal (Journal): Le journal de la vidéothèque.
+            record (dict): L'opération à ajouter.
+        """
+
+        library = self.load(user_id)
+        journal.append(record)
+        Library.apply_record(library, record)
+        self.cache.put(user_id, journal.signature(), library, library.memory_size())
+
+    def create_library(self, user_id: str, data: dict = None):
+        self.journal(user_id).write(data or {"nb_movies": 0, "next_id": 1, "movies": []})
+        self.cache.invalidate(user_id)
+
+    def delete_library(self, user_id: str):
+        self.journal(user_id).delete()
+        self.cache.invalidate(user_id)
+
+    def load_library(self, user_id: str) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # Le format JSON est produit sous verrou, à l'abri des écritures
+            library = self.load(user_id)
+            data = library.to_dict()
+            self.track(user_id, library)
+            return data
+
+    def list_movies(self, user_id: str, query: MovieQuery) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # Les listes triées ne doivent pas changer pendant le parcours
+            library = self.load(user_id)
+            page = {"nb_movies": len(library.movies), **query.paginate(library.ordered(query))}
+            self.track(user_id, library)
+            return page
+
+    def search_movies(self, user_id: str, text: str, limit: int = 20, category: str = None) -> list:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # L'index de recherche ne doit pas changer pendant la recherche
+            library = self.load(user_id)
+            results = library.search(text, limit, category)
+            self.track(user_id, library)
+            return results
+
+    def similar_titles(self, user_id: str, title: str, limit: int = 5, threshold: float = None, exclude: int = None) -> list:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # L'index des titres ne doit pas changer pendant la recherche
+            library = self.load(user_id)
+            results = library.similar_titles(title, limit, threshold, exclude)
+            self.track(user_id, library)
+            return results
+
+    def movie_stats(self, user_id: str) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # Les compteurs ne doivent pas changer pendant leur lecture
+            library = self.load(user_id)
+            stats = library.statistics()
+            self.track(user_id, library)
+            return stats
+
+    def movie_changes(self, user_id: str, since: int) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # Les versions ne doivent pas changer pendant le parcours
+            library = self.load(user_id)
+            changes = library.changes(since)
+            self.track(user_id, library)
+            return changes
+
+    def library_version(self, user_id: str) -> int:
+        return self.load(user_id).version                   # Vidéothèque en cache : seule la signature des fichiers est relue
+
+    def get_movie(self, user_id: str, movie_id: int) -> dict:
+        return self.load(user_id).get(movie_id)
+
+    def find_movie_by_cover(self, user_id: str, cover_image_path: str, movie_name: str = None) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # L'index des images ne doit pas changer pendant la recherche
+            library = self.load(user_id)
+            movie = library.find_by_cover(cover_image_path, movie_name)
+            self.track(user_id, library)
+            return movie
+
+    def add_movie(self, user_id: str, movie: dict) -> int:
+        journal = self.journal(user_id)
+        with journal.lock:                                  # Le verrou évite que deux ajouts simultanés obtiennent le même ID
+            movie["id"] = self.load(user_id).next_id
+            self.append_record(user_id, journal, {"op": "add", "movie": movie})
+        return movie["id"]
+
+    def update_movie(self, user_id: str, movie_id: int, fields: dict) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:
+            if not self.get_movie(user_id, movie_id):
+                return None
+            self.append_record(user_id, journal, {"op": "edit", "id": movie_id, "fields": fields})
+            return self.get_movie(user_id, movie_id)
+
+    def delete_movie(self, user_id: str, movie_id: int) -> dict:
+        journal = self.journal(user_id)
+        with journal.lock:
+            movie = self.get_movie(user_id, movie_id)
+            if not movie:
+                return None
+            self.append_record(user_id, journal, {"op": "delete", "id": movie_id})
+        return movie
+
+    def apply_batch(self, user_id: str, operations: list) -> list:
+        journal = self.journal(user_id)
+        with journal.lock:
+            library = self.load(user_id)
+            records = []
+            results = []
+            try:
+                for operation in operations:
+                    if operation["op"] == "add":
+                        movie = operation["movie"]
+                        movie["id"] = library.next_id
+                        record = {"op": "add", "movie": movie}
+                    elif not library.get(operation["id"]):
+                        results.append(None)
+                        continue
+                    elif operation["op"] == "edit":
+                        record = {"op": "edit", "id": operation["id"], "fields": operation["fields"]}
+                    else:
+                        record = {"op": "delete", "id": operation["id"]}
+                        results.append(library.get(operation["id"]))
+
+                    Library.apply_record(library, record)
+                    records.append(record)
+                    if operation["op"] == "add":
+                        results.append(movie["id"])
+                    elif operation["op"] == "edit":
+                        results.append(library.get(operation["id"]))
+
+                if records:
+                    journal.append(*records)                # Une seule écriture pour tout le lot
+            except Exception:
+                self.cache.invalidate(user_id)              # La vidéothèque en cache a déjà été modifiée
+                raise
+
+            self.cache.put(user_id, journal.signature(), library, library.memory_size())
+        return results
+
+    #
+    #   Références des images de couverture
+    #
+
+    @staticmethod
+    def apply_cover_record(counts: dict, record: dict):
+        """
+            Applique une opération du journal des références au dictionnaire chemin -> nombre de références.
+
+            Opérations reconnues :
+            - {"op": "acquire", "path": str} : ajoute une référence.
+            - {"op": "release", "path": str} : retire une référence (l'entrée disparaît à 0).
+
+        Args:
+            counts (dict): Les références à modifier.
+            record (dict): L'opération à appliquer.
+        """
+
+        path = record["path"]
+        if record.get("op") == "acquire":
+            counts[path] = counts.get(path, 0) + 1
+        elif record.get("op") == "release":
+            remaining = counts.get(path, 0) - 1
+            if remaining > 0:
+                counts[path] = remaining
+            else:
+                counts.pop(path, None)
+
+    def load_cover_references(self) -> dict:
+        """
+            Charge les références des images (covers.json et son journal).
+            Le résultat est conservé en mémoire tant que les fichiers ne changent pas.
+
+        Returns:
+            dict: Le nombre de références par chemin d'image.
+        """
+
+        journal = self.covers_journal
+        with journal.lock:
+            if not journal.exists():
+                journal.write({})
+
+            signature = journal.signature()
+            if self.covers_cache and self.covers_cache[0] == signature:
+                return self.covers_cache[1]
+
+            counts = journal.load()
+            self.covers_cache = (signature, counts)
+            return counts
+
+    def append_cover_record(self, record: dict) -> int:
+        """
+            Ajoute une opération au journal des références et l'applique aux références en mémoire.
+
+        Args:
+            record (dict): L'opération à ajouter.
+
+        Returns:
+            int: Le nombre de références de l'image après l'opération.
+        """
+
+        journal = self.covers_journal
+        with journal.lock:
+            counts = self.load_cover_references()
+            journal.append(record)
+            self.apply_cover_record(counts, record)
+            self.covers_cache = (journal.signature(), counts)
+            return counts.get(record["path"], 0)
+
+    def acquire_cover(self, image_path: str) -> int:
+        return self.append_cover_record({"op": "acquire", "path": image_path})
+
+    def release_cover(self, image_path: str) -> int:
+        with self.covers_journal.lock:
+            if image_path not in self.load_cover_references():
+                return 0
+            return self.append_cover_record({"op": "release", "path": image_path})
+
+    def set_cover_references(self, counts: dict):
+        with self.covers_journal.lock:
+            self.covers_journal.write(dict(counts))
+            self.covers_cache = None
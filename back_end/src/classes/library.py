@@ -0,0 +1,496 @@
+from __future__ import annotations  # Permet d'utiliser le nom de la classe en tant que type dans les annotations de type
+import sys                                              # Pour la taille en mémoire des films
+from bisect import bisect_left, bisect_right, insort    # Pour la maintenance des ordres de tri
+from src.classes.movie_query import MovieQuery          # Pour les clés de tri des films
+from src.classes.search_index import SearchIndex        # Pour la recherche plein texte
+from src.classes.title_index import TitleIndex          # Pour la recherche de titres approchants
+from src.classes.library_stats import LibraryStats      # Pour les statistiques de la vidéothèque
+
+"""
+|
+|   Représentation en mémoire d'une vidéothèque, indexée par identifiant de film.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class Library:
+    """
+    Vidéothèque en mémoire : les films sont indexés par identifiant, la recherche, la modification
+    et la suppression d'un film ne parcourent donc pas la liste des films.
+
+    Les identifiants sont attribués par un compteur monotone (next_id) enregistré avec la vidéothèque :
+    un identifiant n'est jamais réutilisé, même après la suppression d'un film.
+
+    Les listes triées utilisées par la pagination sont calculées au premier besoin pour chaque critère
+    de tri, puis tenues à jour à chaque ajout, modification ou suppression : une page est servie sans
+    retrier la vidéothèque. L'index de recherche plein texte, l'index des titres, l'index des images
+    de couverture et les statistiques suivent le même principe.
+
+    memory_size() estime la mémoire occupée par la vidéothèque et ses index déjà construits (taille d'une
+    entrée du cache des vidéothèques) : la taille des films est tenue à jour à chaque modification, celle
+    des index est déduite de leur nombre d'entrées (coefficients mesurés avec tracemalloc, memory_costs).
+
+    Chaque modification incrémente la version de la vidéothèque (version) : un film ajouté ou modifié
+    reçoit cette version (champ version du film), un film supprimé laisse une pierre tombale (identifiant,
+    version). Un client qui connaît la version N ne reçoit que les films et les suppressions plus récents
+    (changes). Les versions sont attribuées par apply_record : rejouer le journal redonne les mêmes.
+    Seules les max_tombstones dernières suppressions sont conservées ; un client plus ancien que la plus
+    ancienne pierre tombale oubliée (tombstone_floor) reçoit toute la vidéothèque.
+
+    Attributes:
+        movies (dict): Les films indexés par identifiant, dans l'ordre d'ajout.
+        next_id (int): Le prochain identifiant à attribuer.
+        version (int): La version de la vidéothèque (nombre de modifications).
+        tombstones (dict): Les films supprimés et la version de leur suppression, dans l'ordre des versions.
+        tombstone_floor (int): La version de la dernière pierre tombale oubliée.
+        version_log (dict): Par version, le film qui l'a reçue (dans l'ordre des versions), None tant
+                            qu'aucun client n'a demandé de modifications.
+        orders (dict): Par critère de tri, la liste triée des couples (clé de tri, identifiant).
+        search_index (SearchIndex): L'index de recherche plein texte, None tant qu'aucune recherche n'a été faite.
+        title_index (TitleIndex): L'index des titres, None tant qu'aucun titre approchant n'a été cherché.
+        cover_index (dict): Par chemin d'image de couverture, les films qui l'utilisent (dans l'ordre d'indexation),
+                            None tant qu'aucun film n'a été cherché par son image.
+        stats (LibraryStats): Les statistiques, None tant qu'elles n'ont pas été demandées.
+        movies_bytes (int): La taille estimée des films en mémoire.
+
+    Class Attributes:
+        max_tombstones (int): Le nombre maximal de pierres tombales conservées.
+        memory_costs (dict): Par index, la taille estimée d'une entrée en octets (voir memory_size).
+
+    Methods:
+        from_dict(data): Construit une vidéothèque à partir de son format JSON.
+        to_dict(): Retourne la vidéothèque au format JSON.
+        apply_record(library, record): Applique une opération du journal à une vidéothèque.
+        get(movie_id): Retourne un film.
+        add(movie): Ajoute un film et lui attribue un identifiant.
+        update(movie_id, fields): Modifie les champs d'un film.
+        delete(movie_id): Supprime un film.
+        bump(): Incrémente la version de la vidéothèque.
+        changes(since): Retourne les modifications postérieures à une version.
+        ordered(query): Parcourt les films dans l'ordre d'une requête, à partir de son curseur.
+        search(text, limit, category): Recherche des films par mots-clés.
+        similar_titles(title, limit, threshold, exclude): Retourne les films dont le titre est proche d'un titre.
+        find_by_cover(cover_image_path, movie_name): Retourne un film qui utilise une image de couverture.
+        statistics(): Retourne les statistiques de la vidéothèque.
+        movie_size(movie): Retourne la taille estimée d'un film en mémoire.
+        memory_size(): Retourne la taille estimée de la vidéothèque et de ses index en mémoire.
+    """
+
+    max_tombstones = 10000
+
+    # Octets par entrée des index (mesurés avec tracemalloc), l'index plein texte est proportionnel aux films
+    memory_costs = {"order": 120, "search": 1.0, "title": 20, "cover": 250, "version": 100, "tombstone": 100, "view": 8}
+
+    def __init__(self, movies: dict = None, next_id: int = 1, version: int = 0, tombstones: dict = None, tombstone_floor: int = 0):
+        """
+            Initialise une vidéothèque.
+
+        Args:
+            movies (dict): Les films indexés par identifiant.
+            next_id (int): Le prochain identifiant à attribuer.
+            version (int): La version de la vidéothèque.
+            tombstones (dict): Les films supprimés et la version de leur suppression.
+            tombstone_floor (int): La version de la dernière pierre tombale oubliée.
+        """
+        self.movies = movies or {}
+        self.next_id = next_id
+        self.version = max(version, max((movie.get("version") or 0 for movie in self.movies.values()), default=0))
+        self.tombstones = dict(sorted((tombstones or {}).items(), key=lambda item: item[1]))
+        self.tombstone_floor = tombstone_floor
+        self.version_log = None
+        self.view = None        # Format JSON mis en cache jusqu'à la prochaine modification
+        self.orders = {}
+        self.search_index = None
+        self.title_index = None
+        self.cover_index = None
+        self.stats = None
+        self.movies_bytes = sum(self.movie_size(movie) for movie in self.movies.values())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Library:
+        """
+            Construit une vidéothèque à partir de son format JSON {"nb_movies", "next_id", "movies",
+            "version", "tombstones", "tombstone_floor"}.
+
+            Les anciens fichiers n'ont pas de compteur next_id : il est déduit du plus grand identifiant.
+            Ils n'ont pas non plus de version : leurs films ont la version 0 (ils ne sont envoyés qu'aux
+            clients qui demandent toute la vidéothèque).
+            L'ancienne attribution (nb_movies + 1) pouvait produire des doublons après une suppression ;
+            un film dont l'identifiant est déjà pris reçoit un nouvel identifiant.
+
+        Args:
+            data (dict): La vidéothèque au format JSON.
+
+        Returns:
+            Library: La vidéothèque.
+        """
+        movies = {}
+        duplicates = []
+        for movie in data.get("movies", []):
+            if movie["id"] in movies:
+                duplicates.append(movie)
+            else:
+                movies[movie["id"]] = movie
+
+        next_id = max(data.get("next_id") or 1, max(movies, default=0) + 1)
+        tombstones = {movie_id: version for movie_id, version in data.get("tombstones", [])}
+        library = cls(movies, next_id, data.get("version") or 0, tombstones, data.get("tombstone_floor") or 0)
+        for movie in duplicates:
+            library.add(dict(movie))
+        return library
+
+    def to_dict(self) -> dict:
+        """
+            Retourne la vidéothèque au format JSON. Le résultat est réutilisé tant que la
+            vidéothèque n'est pas modifiée et ne doit pas être modifié par l'appelant.
+
+        Returns:
+            dict: La vidéothèque {"nb_movies": int, "next_id": int, "movies": list, "version": int,
+                  "tombstones": [[identifiant, version]], "tombstone_floor": int}.
+        """
+        if self.view is None:
+            self.view = {
+                "nb_movies": len(self.movies),
+                "next_id": self.next_id,
+                "movies": list(self.movies.values()),
+                "version": self.version,
+                "tombstones": [[movie_id, version] for movie_id, version in self.tombstones.items()],
+                "tombstone_floor": self.tombstone_floor
+            }
+        return self.view
+
+    @staticmethod
+    def apply_record(library: Library, record: dict):
+        """
+            Applique une opération du journal à une vidéothèque et incrémente sa version.
+
+            Opérations reconnues :
+            - {"op": "add", "movie": dict} : ajoute un film (son identifiant est déjà attribué).
+            - {"op": "edit", "id": int, "fields": dict} : modifie les champs d'un film.
+            - {"op": "delete", "id": int} : supprime un film.
+
+        Args:
+            library (Library): La vidéothèque à modifier.
+            record (dict): L'opération à appliquer.
+        """
+        op = record.get("op")
+        if op == "add":
+            movie = record["movie"]
+            previous = library.movies.pop(movie["id"], None)
+            if previous is not None:
+                library.unindex(previous)
+            library.tombstones.pop(movie["id"], None)
+            movie["version"] = library.bump()
+            library.movies[movie["id"]] = movie
+            library.next_id = max(library.next_id, movie["id"] + 1)
+            library.index(movie)
+            library.view = None
+        elif op == "edit":
+            library.update(record["id"], record["fields"])
+        elif op == "delete":
+            library.delete(record["id"])
+
+    def get(self, movie_id: int) -> dict:
+        """
+            Retourne un film.
+
+        Args:
+            movie_id (int): L'identifiant du film.
+
+        Returns:
+            dict: Le film ou None s'il n'existe pas.
+        """
+        return self.movies.get(movie_id)
+
+    def add(self, movie: dict) -> int:
+        """
+            Ajoute un film et lui attribue le prochain identifiant.
+
+        Args:
+            movie (dict): Le film à ajouter.
+
+        Returns:
+            int: L'identifiant attribué.
+        """
+        movie["id"] = self.next_id
+        self.next_id += 1
+        movie["version"] = self.bump()
+        self.movies[movie["id"]] = movie
+        self.index(movie)
+        self.view = None
+        return movie["id"]
+
+    def update(self, movie_id: int, fields: dict) -> dict:
+        """
+            Modifie les champs d'un film. Le film est remplacé par une copie modifiée, car l'ancien
+            peut être en cours de sérialisation par une autre requête.
+
+        Args:
+            movie_id (int): L'identifiant du film.
+            fields (dict): Les champs à modifier.
+
+        Returns:
+            dict: Le film modifié ou None s'il n'existe pas.
+        """
+        movie = self.movies.get(movie_id)
+        if movie is None:
+            return None
+        self.unindex(movie)
+        movie = {**movie, **fields, "id": movie_id, "version": self.bump()}
+        self.movies[movie_id] = movie
+        self.index(movie)
+        self.view = None
+        return movie
+
+    def delete(self, movie_id: int) -> dict:
+        """
+            Supprime un film.
+
+        Args:
+            movie_id (int): L'identifiant du film.
+
+        Returns:
+            dict: Le film supprimé ou None s'il n'existe pas.
+        """
+        movie = self.movies.pop(movie_id, None)
+        if movie is not None:
+            self.unindex(movie)
+            self.tombstones.pop(movie_id, None)                 # Une pierre tombale est rangée à sa nouvelle version
+            self.tombstones[movie_id] = self.bump()
+            if len(self.tombstones) > self.max_tombstones:
+                self.tombstone_floor = self.tombstones.pop(next(iter(self.tombstones)))
+            self.view = None
+        return movie
+
+    def bump(self) -> int:
+        """
+            Incrémente la version de la vidéothèque.
+
+        Returns:
+            int: La nouvelle version.
+        """
+        self.version += 1
+        return self.version
+
+    def changes(self, since: int) -> dict:
+        """
+            Retourne les films ajoutés ou modifiés et les films supprimés après une version.
+            Seules les modifications récentes sont parcourues (en partant de la plus récente).
+
+            Toute la vidéothèque est renvoyée (reset) si since vaut 0, si des pierres tombales plus récentes
+            que since ont été oubliées ou si since est plus récente que la vidéothèque (vidéothèque recréée).
+
+        Args:
+            since (int): La dernière version connue du client.
+
+        Returns:
+            dict: {"version": int, "reset": bool, "movies": list, "deleted": list}, les films et les
+                  suppressions dans l'ordre des versions.
+        """
+        if since <= 0 or since < self.tombstone_floor or since > self.version:
+            return {"version": self.version, "reset": True, "movies": list(self.movies.values()), "deleted": []}
+
+        if self.version_log is None:
+            versioned = sorted((movie for movie in self.movies.values() if movie.get("version")), key=lambda movie: movie["version"])
+            self.version_log = {movie["version"]: movie["id"] for movie in versioned}
+
+        movies = []
+        for version in reversed(self.version_log):
+            if version <= since:
+                break
+            movies.append(self.movies[self.version_log[version]])
+        deleted = []
+        for movie_id in reversed(self.tombstones):
+            if self.tombstones[movie_id] <= since:
+                break
+            deleted.append(movie_id)
+
+        return {"version": self.version, "reset": False, "movies": movies[::-1], "deleted": deleted[::-1]}
+
+    def index(self, movie: dict):
+        """
+            Insère un film dans les listes triées déjà calculées, dans les index de recherche et dans les statistiques.
+
+        Args:
+            movie (dict): Le film.
+        """
+        self.movies_bytes += self.movie_size(movie)
+        for sort, keys in self.orders.items():
+            insort(keys, (MovieQuery.sort_keys[sort](movie), movie["id"]))
+        if self.search_index is not None:
+            self.search_index.add(movie)
+        if self.title_index is not None:
+            self.title_index.add(movie["id"], movie.get("movie_name"))
+        if self.cover_index is not None:
+            self.cover_index.setdefault(movie.get("cover_image_path"), {})[movie["id"]] = None
+        if self.stats is not None:
+            self.stats.add(movie)
+        if self.version_log is not None and movie.get("version"):
+            self.version_log[movie["version"]] = movie["id"]
+
+    def unindex(self, movie: dict):
+        """
+            Retire un film des listes triées déjà calculées, des index de recherche et des statistiques.
+
+        Args:
+            movie (dict): Le film, tel qu'il a été indexé.
+        """
+        self.movies_bytes -= self.movie_size(movie)
+        for sort, keys in self.orders.items():
+            key = (MovieQuery.sort_keys[sort](movie), movie["id"])
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+        if self.search_index is not None:
+            self.search_index.remove(movie)
+        if self.title_index is not None:
+            self.title_index.remove(movie["id"])
+        if self.cover_index is not None:
+            movie_ids = self.cover_index.get(movie.get("cover_image_path"), {})
+            movie_ids.pop(movie["id"], None)
+            if not movie_ids:
+                self.cover_index.pop(movie.get("cover_image_path"), None)
+        if self.stats is not None:
+            self.stats.remove(movie)
+        if self.version_log is not None:
+            self.version_log.pop(movie.get("version"), None)
+
+    def ordered(self, query: MovieQuery):
+        """
+            Parcourt les films dans l'ordre d'une requête, à partir de son curseur.
+            La liste triée du critère est calculée au premier appel puis tenue à jour.
+
+        Args:
+            query (MovieQuery): La requête (critère de tri, ordre, curseur).
+
+        Returns:
+            generator: Les films, dans l'ordre de la requête.
+        """
+        keys = self.orders.get(query.sort)
+        if keys is None:
+            sort_key = MovieQuery.sort_keys[query.sort]
+            keys = self.orders[query.sort] = sorted((sort_key(movie), movie_id) for movie_id, movie in self.movies.items())
+
+        after = tuple(query.after) if query.after else None
+        if query.descending:
+            position = bisect_left(keys, after) if after else len(keys)
+            positions = range(position - 1, -1, -1)
+        else:
+            position = bisect_right(keys, after) if after else 0
+            positions = range(position, len(keys))
+
+        for position in positions:
+            yield self.movies[keys[position][1]]
+
+    def search(self, text: str, limit: int = 20, category: str = None) -> list:
+        """
+            Recherche des films par mots-clés (voir SearchIndex).
+            L'index est construit à la première recherche puis tenu à jour.
+
+        Args:
+            text (str): La recherche.
+            limit (int): Le nombre maximal de résultats.
+            category (str): La catégorie recherchée, None pour toutes.
+
+        Returns:
+            list: Les couples (film, score), du plus pertinent au moins pertinent.
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex(self.movies.values())
+
+        accept = None
+        if category is not None:
+            accept = lambda movie_id: self.movies[movie_id].get("category") == category
+        return [(self.movies[movie_id], score) for movie_id, score in self.search_index.search(text, limit, accept)]
+
+    def similar_titles(self, title: str, limit: int = 5, threshold: float = None, exclude: int = None) -> list:
+        """
+            Retourne les films dont le titre est proche d'un titre (voir TitleIndex).
+            L'index est construit au premier appel puis tenu à jour.
+
+        Args:
+            title (str): Le titre recherché.
+            limit (int): Le nombre maximal de films.
+            threshold (float): La similarité minimale (TitleIndex.threshold par défaut).
+            exclude (int): L'identifiant d'un film à ignorer, None pour aucun.
+
+        Returns:
+            list: Les couples (film, similarité), du plus proche au moins proche.
+        """
+        if self.title_index is None:
+            self.title_index = TitleIndex(self.movies.values())
+        return [(self.movies[movie_id], similarity) for movie_id, similarity in self.title_index.similar(title, limit, threshold, exclude)]
+
+    def find_by_cover(self, cover_image_path: str, movie_name: str = None) -> dict:
+        """
+            Retourne un film qui utilise une image de couverture (détection des doublons), de même titre
+            si movie_name est donné (voir Repository.find_movie_by_cover).
+            L'index des images est construit au premier appel puis tenu à jour.
+
+        Args:
+            cover_image_path (str): Le chemin de l'image de couverture.
+            movie_name (str): Le titre du film, None pour ignorer le titre.
+
+        Returns:
+            dict: Le film ou None si aucun film ne correspond.
+        """
+        if self.cover_index is None:
+            self.cover_index = {}
+            for movie in self.movies.values():
+                self.cover_index.setdefault(movie.get("cover_image_path"), {})[movie["id"]] = None
+        title = None if movie_name is None else TitleIndex.normalize(movie_name)
+        for movie_id in self.cover_index.get(cover_image_path, ()):
+            movie = self.movies[movie_id]
+            if title is None or TitleIndex.normalize(movie.get("movie_name")) == title:
+                return movie
+        return None
+
+    def statistics(self) -> dict:
+        """
+            Retourne les statistiques de la vidéothèque (voir LibraryStats).
+            Elles sont calculées au premier appel puis tenues à jour.
+
+        Returns:
+            dict: Les statistiques au format JSON.
+        """
+        if self.stats is None:
+            self.stats = LibraryStats(self.movies.values())
+        return self.stats.to_dict()
+
+    @staticmethod
+    def movie_size(movie: dict) -> int:
+        """
+            Retourne la taille estimée d'un film en mémoire : le dictionnaire et ses valeurs (les noms des
+            champs sont partagés entre les films).
+
+        Args:
+            movie (dict): Le film.
+
+        Returns:
+            int: La taille en octets.
+        """
+        return sys.getsizeof(movie) + sum(sys.getsizeof(value) for value in movie.values())
+
+    def memory_size(self) -> int:
+        """
+            Retourne la taille estimée de la vidéothèque en mémoire : ses films et les index déjà construits.
+            Le calcul ne parcourt pas les films.
+
+        Returns:
+            int: La taille en octets.
+        """
+        costs = self.memory_costs
+        size = self.movies_bytes + len(self.tombstones) * costs["tombstone"]
+        size += sum(len(keys) for keys in self.orders.values()) * costs["order"]
+        if self.search_index is not None:
+            size += int(self.movies_bytes * costs["search"])
+        if self.title_index is not None:
+            size += self.title_index.entries * costs["title"]
+        if self.cover_index is not None:
+            size += len(self.movies) * costs["cover"]
+        if self.version_log is not None:
+            size += len(self.version_log) * costs["version"]
+        if self.view is not None:
+            size += len(self.movies) * costs["view"]
+        return size
@@ -0,0 +1,157 @@
+import threading                        # Pour le verrou du cache.
+from collections import OrderedDict     # Pour l'ordre LRU des entrées.
+
+"""
+|
+|   Cache LRU en mémoire des vidéothèques déjà chargées.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class LibraryCache:
+    """
+    Cache LRU borné des vidéothèques, indexé par identifiant d'utilisateur.
+
+    Chaque entrée est associée à une signature (dates de modification et tailles des fichiers de la
+    vidéothèque). Une entrée dont la signature ne correspond plus aux fichiers est ignorée, les
+    modifications faites en dehors du processus sont donc prises en compte. La taille d'une entrée est
+    une estimation de la mémoire occupée par la vidéothèque et ses index (voir Library.memory_size),
+    revue lorsqu'un index est construit (resize) ; le total est borné par max_bytes.
+
+    Attributes:
+        max_bytes (int): La taille cumulée maximale des entrées (0 désactive le cache).
+        hits (int): Le nombre de lectures servies par le cache.
+        misses (int): Le nombre de lectures qui ont nécessité un chargement.
+        evictions (int): Le nombre d'entrées retirées pour respecter max_bytes.
+
+    Methods:
+        get(user_id, signature): Retourne la vidéothèque en cache si sa signature est toujours valide.
+        put(user_id, signature, data, size): Ajoute ou remplace une vidéothèque dans le cache.
+        resize(user_id, data, size): Met à jour la taille estimée d'une vidéothèque en cache.
+        invalidate(user_id): Retire une vidéothèque du cache.
+        stats(): Retourne les compteurs du cache.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+            Initialise un cache vide.
+
+        Args:
+            max_bytes (int): La taille cumulée maximale des entrées.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()    # user_id -> (signature, data, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, user_id: str, signature: tuple) -> dict:
+        """
+            Retourne la vidéothèque en cache si sa signature est toujours valide.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            signature (tuple): La signature actuelle des fichiers de la vidéothèque.
+
+        Returns:
+            dict: La vidéothèque ou None si elle n'est pas en cache ou si elle est périmée.
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: str, signature: tuple, data: dict, size: int):
+        """
+            Ajoute ou remplace une vidéothèque dans le cache, puis retire les entrées
+            les moins récemment utilisées tant que la taille maximale est dépassée.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            signature (tuple): La signature des fichiers correspondant à data.
+            data (dict): La vidéothèque.
+            size (int): La taille estimée de la vidéothèque en octets.
+        """
+        with self.lock:
+            self._insert(user_id, signature, data, size)
+
+    def resize(self, user_id: str, data: dict, size: int):
+        """
+            Met à jour la taille estimée d'une vidéothèque en cache (un index vient d'être construit), puis
+            retire les entrées les moins récemment utilisées tant que la taille maximale est dépassée.
+            Rien n'est fait si la vidéothèque en cache n'est plus data.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            data (dict): La vidéothèque.
+            size (int): La nouvelle taille estimée en octets.
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[1] is data and entry[2] != size:
+                self._insert(user_id, entry[0], data, size)
+
+    def invalidate(self, user_id: str):
+        """
+            Retire une vidéothèque du cache.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+        """
+        with self.lock:
+            self._remove(user_id)
+
+    def stats(self) -> dict:
+        """
+            Retourne les compteurs du cache.
+
+        Returns:
+            dict: Les compteurs (hits, misses, evictions) et l'occupation du cache.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _insert(self, user_id: str, signature: tuple, data: dict, size: int):
+        """
+            Ajoute ou remplace une entrée puis retire les moins récemment utilisées (le verrou doit être tenu).
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            signature (tuple): La signature des fichiers correspondant à data.
+            data (dict): La vidéothèque.
+            size (int): La taille estimée de la vidéothèque en octets.
+        """
+        self._remove(user_id)
+        if size > self.max_bytes:
+            return
+        self.entries[user_id] = (signature, data, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, user_id: str):
+        """
+            Retire une entrée (le verrou doit être tenu).
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+        """
+        entry = self.entries.pop(user_id, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
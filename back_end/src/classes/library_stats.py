@@ -0,0 +1,138 @@
+from collections import Counter                     # Pour le nombre de films par valeur.
+
+"""
+|
+|   Statistiques d'une vidéothèque tenues à jour film par film.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class LibraryStats:
+    """
+    Statistiques d'une vidéothèque : nombre de films, nombre de films par catégorie et par année,
+    histogramme des notes et note moyenne.
+
+    Les statistiques sont des compteurs (type, valeur) → nombre de films, modifiés à chaque ajout,
+    modification ou suppression d'un film (add, remove) : elles ne sont jamais recalculées en parcourant
+    la vidéothèque. La note moyenne est déduite de l'histogramme des notes. Le dépôt SQLite enregistre
+    les mêmes compteurs dans sa table movie_stats (voir keys et from_counts).
+
+    Attributes:
+        nb_movies (int): Le nombre de films.
+        counts (Counter): Le nombre de films par couple (type, valeur), type valant category, year ou rating.
+
+    Class Attributes:
+        ratings (range): Les notes possibles.
+
+    Methods:
+        keys(movie): Retourne les couples (type, valeur) comptés pour un film.
+        add(movie): Compte un film.
+        remove(movie): Décompte un film.
+        from_counts(nb_movies, counts): Construit les statistiques à partir de compteurs enregistrés.
+        to_dict(): Retourne les statistiques au format JSON.
+    """
+
+    ratings = range(0, 6)
+
+    def __init__(self, movies=()):
+        """
+            Initialise les statistiques.
+
+        Args:
+            movies (iterable): Les films à compter.
+        """
+        self.nb_movies = 0
+        self.counts = Counter()
+        for movie in movies:
+            self.add(movie)
+
+    @classmethod
+    def keys(cls, movie: dict) -> list:
+        """
+            Retourne les couples (type, valeur) comptés pour un film. Une valeur absente ou une note
+            invalide n'est pas comptée.
+
+        Args:
+            movie (dict): Le film.
+
+        Returns:
+            list: Les couples (type, valeur), les valeurs étant des chaînes.
+        """
+        keys = []
+        category = str(movie.get("category") or "").strip()
+        if category:
+            keys.append(("category", category))
+        year = str(movie.get("year_of_creation") or "").strip()
+        if year:
+            keys.append(("year", year))
+        try:
+            rating = int(movie.get("notation"))
+        except (TypeError, ValueError):
+            rating = None
+        if rating in cls.ratings:
+            keys.append(("rating", str(rating)))
+        return keys
+
+    def add(self, movie: dict):
+        """
+            Compte un film.
+
+        Args:
+            movie (dict): Le film.
+        """
+        self.nb_movies += 1
+        self.counts.update(self.keys(movie))
+
+    def remove(self, movie: dict):
+        """
+            Décompte un film.
+
+        Args:
+            movie (dict): Le film, tel qu'il a été compté.
+        """
+        self.nb_movies -= 1
+        for key in self.keys(movie):
+            self.counts[key] -= 1
+            if self.counts[key] <= 0:
+                del self.counts[key]
+
+    @classmethod
+    def from_counts(cls, nb_movies: int, counts) -> 'LibraryStats':
+        """
+            Construit les statistiques à partir de compteurs enregistrés (table movie_stats).
+
+        Args:
+            nb_movies (int): Le nombre de films.
+            counts (iterable): Les triplets (type, valeur, nombre de films).
+
+        Returns:
+            LibraryStats: Les statistiques.
+        """
+        stats = cls()
+        stats.nb_movies = nb_movies
+        stats.counts = Counter({(kind, value): count for kind, value, count in counts if count > 0})
+        return stats
+
+    def to_dict(self) -> dict:
+        """
+            Retourne les statistiques au format JSON.
+
+        Returns:
+            dict: {"nb_movies": int, "categories": {catégorie: int}, "years": {année: int},
+                   "ratings": {note: int}, "average_rating": float ou None}.
+        """
+        by_kind = {"category": {}, "year": {}, "rating": {}}
+        for (kind, value), count in self.counts.items():
+            by_kind[kind][value] = count
+
+        ratings = {str(rating): by_kind["rating"].get(str(rating), 0) for rating in self.ratings}
+        nb_rated = sum(ratings.values())
+        average = sum(int(rating) * count for rating, count in ratings.items()) / nb_rated if nb_rated else None
+        return {
+            "nb_movies": self.nb_movies,
+            "categories": dict(sorted(by_kind["category"].items(), key=lambda item: (-item[1], item[0]))),
+            "years": dict(sorted(by_kind["year"].items())),
+            "ratings": ratings,
+            "average_rating": round(average, 2) if average is not None else None
+        }
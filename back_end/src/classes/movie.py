@@ -1,10 +1,14 @@
 from __future__ import annotations      # Permet d'utiliser le nom de la classe en tant que type dans les annotations de type
-import json                             # Importation pour la manipulation de fichiers JSON
-import base64                           # Importation pour la manipulation de données base64
 import datetime                         # Importation pour la gestion des dates et heures
 import os                               # Importation pour les opérations sur les fichiers et les répertoires
 import re                               # Importation pour les expressions régulières
 from flask import jsonify               # Importation du package jsonify de flask
+from src.classes.repository import get_repository   # Importation du dépôt de données configuré
+from src.classes.cover_cache import get_cover_cache # Importation du cache des images encodées en base64
+from src.classes.cover_store import CoverStore      # Importation du stockage des images adressé par contenu
+from src.classes.base64_stream import Base64Stream  # Importation du décodage base64 par morceaux
+from src.classes.cover_renditions import CoverRenditions    # Importation des déclinaisons WebP des images
+from src.classes.title_index import TitleIndex      # Importation de la comparaison des titres et du seuil des doublons probables
 
 """
 |
@@ -33,9 +37,16 @@ class Movie:
     Methods:
         to_dict(): Convertit l'instance de Movie en un dictionnaire.
         save_image(movie_name, base64_string): Sauvegarde l'image du film à partir d'une chaîne base64.
-        save_movie(movie): Sauvegarde les données du film dans un fichier JSON.
+        save_movie(movie): Sauvegarde les données du film dans la vidéothèque de l'utilisateur.
         delete_movie_(movie_id): Supprime un film en fonction de son identifiant.
-        edit_movie(data): Modifie une information d'un film en fonction de son identifiant.
+        edit_movie(data): Modifie une ou plusieurs informations d'un film en fonction de son identifiant.
+        clean_fields(fields): Prépare les champs modifiés d'un film (bornes de la notation, date de modification).
+        apply_batch(operations, user_id): Applique une liste d'ajouts, de modifications et de suppressions en une seule écriture.
+        delete_cover(image_path): Supprime l'image de couverture d'un film supprimé.
+        release_cover(image_path): Rend la référence à l'image d'un film qui n'a pas été ajouté.
+        cover_url(image_path, user_id): Retourne l'URL de l'image de couverture d'un film.
+        cover_file(user_id, image_name): Retourne le chemin d'une image de couverture servie par /api/covers.
+        load_movies(user_id): Charge la vidéothèque d'un utilisateur.
     """
     
     def __init__(self, movie_data: dict):
@@ -82,22 +93,46 @@ class Movie:
             "last_modified_date": self.last_modified_date
         }
 
+    @staticmethod
+    def load_movies(user_id: str) -> dict:
+        """
+            Charge la vidéothèque d'un utilisateur depuis le dépôt configuré.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            dict: La vidéothèque sous la forme {"nb_movies": int, "movies": list}.
+
+        Raises:
+            FileNotFoundError: Si la vidéothèque de l'utilisateur n'existe pas.
+        """
+        
+        return get_repository().load_library(user_id)
+
     def save_image(self, movie_name: str, base64_string: str, user_id: str) -> str:
         """
             Sauvegarde l'image du film à partir d'une chaîne base64.
-            Le nom de l'image est fait avec le nom du film.
+            L'image est enregistrée sous son empreinte SHA-256 (voir CoverStore) : une image identique
+            n'est écrite qu'une fois et le film en détient une référence.
+            Une image déjà envoyée par /api/covers/upload est désignée par son nom (empreinte.format).
         
         Args:
             movie_name (str): Le nom du film pour générer le nom du fichier image.
-            base64_string (str): La chaîne base64 représentant l'image.
+            base64_string (str): La chaîne base64 représentant l'image, ou le nom d'une image envoyée.
 
         Returns:
             str: Le chemin du fichier image sauvegardé.
         """
         
         try:
+            # Image déjà envoyée en flux par /api/covers/upload : le film en prend une référence
+            uploaded_path = CoverStore.path_from_name(base64_string)
+            if uploaded_path:
+                return uploaded_path if CoverStore.acquire(uploaded_path) else None
+
             # Vérifie si base64_string est un nom de fichier
-            if '.' in base64_string and base64_string.split('.')[-1] in ['jpg', 'jpeg', 'png', 'webp']:
+            elif '.' in base64_string and base64_string.split('.')[-1] in ['jpg', 'jpeg', 'png', 'webp']:
                 return base64_string
         
             elif base64_string == 'null':
@@ -105,33 +140,100 @@ class Movie:
                 image_path = os.path.join('storage', 'covers', image_name)
                 return image_path
             else:
-                format_match = re.search(r'data:image/(?P<format>[a-zA-Z]+);base64,', base64_string)
-                image_format = format_match.group('format') if format_match else 'webp'
+                # Seul l'en-tête « data:image/…;base64, » est analysé, pas toute la chaîne
+                format_match = re.match(r'data:image/(?P<format>[a-zA-Z]+);base64,', base64_string[:64])
+                image_format = format_match.group('format').lower() if format_match else 'webp'
                 if image_format == 'jpeg':
                     image_format = 'jpg'
 
-                image_data = base64.b64decode(base64_string.split(',')[1] if format_match else base64_string)
+                # La chaîne est décodée et écrite par morceaux : l'image décodée n'est jamais entièrement en mémoire
+                image_stream = Base64Stream(base64_string, format_match.end() if format_match else 0)
+                return CoverStore.write_stream(image_stream, default_format=image_format, acquire=True)
+
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde de l'image : {e}")
+            return None
 
-                # Nettoie le nom du film pour l'utiliser dans le nom de fichier
-                safe_movie_name = re.sub(r'[^A-Za-z0-9_]', '', movie_name)  # Remplace les caractères non alphanumériques
+    @staticmethod
+    def cover_url(image_path: str, user_id: str, size: str = None) -> str:
+        """
+            Retourne l'URL de l'image de couverture d'un film.
 
-                image_name = f"{safe_movie_name}_{user_id}.{image_format}"
-                image_path = os.path.join('storage', 'covers', image_name)
+            Les images enregistrées dans storage/covers sont servies par /api/covers/<user_id>/<nom>.
+            L'URL d'une image adressée par contenu ne change jamais. Pour les anciennes images, le paramètre v
+            (date de modification du fichier) change l'URL lorsque l'image est réécrite : le navigateur peut
+            donc garder l'image en cache. Les autres chemins sont des images TheMovieDB.
 
-                os.makedirs(os.path.dirname(image_path), exist_ok=True)
-                with open(image_path, 'wb') as file:
-                    file.write(image_data)
+            Lorsqu'une taille est demandée, l'URL désigne la déclinaison WebP de l'image si elle existe ;
+            sinon, son calcul est planifié et l'URL de l'image d'origine est renvoyée en attendant.
 
-                return image_path
+        Args:
+            image_path (str): Le chemin de l'image de couverture enregistré dans le film.
+            user_id (str): L'identifiant de l'utilisateur.
+            size (str): La déclinaison souhaitée (grid, detail, original), None pour l'image d'origine.
 
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde de l'image : {e}")
+        Returns:
+            str: L'URL de l'image, ou None si le film n'a pas d'image.
+        """
+        
+        if not image_path:
             return None
+        
+        path = image_path.replace("\\", "/")                            # Les chemins enregistrés sous Windows utilisent '\\'
+        if not path.startswith("storage/"):
+            return f"https://image.tmdb.org/t/p/w500/{image_path.lstrip('/')}"
+        
+        image_name = os.path.basename(path)
+        if CoverStore.is_managed(image_path):
+            if size is not None:
+                rendition_path = CoverStore.rendition_path(path, size)
+                if os.path.exists(rendition_path):
+                    return f"/api/covers/{user_id}/{os.path.basename(rendition_path)}"
+                CoverRenditions.submit(path)                            # Image envoyée avant le calcul des déclinaisons
+            return f"/api/covers/{user_id}/{image_name}"                # Le contenu d'une image gérée ne change jamais
+        try:
+            version = os.stat(path).st_mtime_ns
+        except OSError:
+            return f"/api/covers/{user_id}/{image_name}"
+        return f"/api/covers/{user_id}/{image_name}?v={version}"
+
+    @staticmethod
+    def cover_file(user_id: str, image_name: str) -> str:
+        """
+            Retourne le chemin d'une image de couverture servie par /api/covers/<user_id>/<nom>.
+            Une image adressée par contenu (ou l'une de ses déclinaisons) est désignée par son empreinte,
+            qu'il faut connaître pour y accéder.
+            Pour les anciennes images, un utilisateur n'accède qu'aux siennes ({nom}_{user_id}.{format})
+            et à l'image par défaut.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            image_name (str): Le nom du fichier de l'image.
+
+        Returns:
+            str: Le chemin de l'image, ou None si l'image n'existe pas ou n'appartient pas à l'utilisateur.
+        """
+        
+        if os.path.basename(image_name) != image_name or image_name.startswith('.'):    # Pas de chemin dans le nom du fichier
+            return None
+        image_path = CoverStore.path_from_name(image_name) or CoverStore.rendition_from_name(image_name)
+        if image_path:
+            return image_path if os.path.isfile(image_path) else None
+        if image_name != 'NOCOVERMOVIE.webp' and not os.path.splitext(image_name)[0].endswith(f"_{user_id}"):
+            return None
+        
+        image_path = os.path.join('storage', 'covers', image_name)
+        return image_path if os.path.isfile(image_path) else None
 
     @staticmethod
     def save_movie(movie: 'Movie', user_id) -> str:
         """
-            Sauvegarde les données du film dans un fichier JSON.
+            Sauvegarde les données du film dans la vidéothèque de l'utilisateur.
+
+            Un film de même titre (aux accents et à la casse près) et de même image qu'un film de la vidéothèque
+            est refusé (film identique) ; deux films différents peuvent partager une affiche. Un film dont le titre est
+            proche d'un titre de la vidéothèque (faute de frappe, accents) est ajouté, mais la réponse
+            contient un avertissement (warning) et la liste de ces films (similar_movies).
 
             Args:
                 movie (Movie): L'instance de Movie à sauvegarder.
@@ -140,38 +242,39 @@ class Movie:
                 str: Une réponse JSON indiquant le statut de la sauvegarde.
         """
 
+        repository = get_repository()
         try:
-            # ouverture le fichier 'storage/movies.json' en mode lecture et écriture
-            with open(f'storage/movies_{user_id}.json', 'r+') as file:
-                data = json.load(file)                                                                  # Chargement du contenu JSON du fichier dans la variable 'data'
-                
-                if any(film['cover_image_path'] == movie.cover_image_path for film in data['movies']):  # Vérifie si 'movie.cover_image_path' existe déjà (film identique)
-                    return jsonify({
-                        "status": "400",
-                        "error": "Le film existe déjà dans votre vidéothèque."
-                    }), 400
-
-                movies = data["movies"]                                                                 # Accès à la liste 'movies' dans 'data'
-                movie.id = data["nb_movies"] + 1                                                        # Attribution d'un nouvel ID au film en ajoutant 1 au compteur 'nb_movies'
-                movies.append(movie.to_dict())                                                          # Ajout des données du film (sous forme de dictionnaire) à la liste 'movies'
-                data["nb_movies"] += 1
-                file.seek(0)                                                                            # Positionnement de la position de lecture/écriture au début du fichier
-                json.dump(data, file, indent=4)                                                         # Écriture du contenu mis à jour dans le fichier JSON avec une mise en forme de 4 espaces
-                
+            if repository.find_movie_by_cover(user_id, movie.cover_image_path, movie.movie_name):       # Même image et même titre : film identique
+                Movie.release_cover(movie.cover_image_path)                                             # Le film n'est pas ajouté : sa référence à l'image est rendue
                 return jsonify({
-                    "status": "200",
-                    "message": "Le film a bien été ajouté à votre vidéothèque."
-                }), 200
+                    "status": "400",
+                    "error": "Le film existe déjà dans votre vidéothèque."
+                }), 400
+
+            similar = repository.similar_titles(user_id, movie.movie_name, 3, TitleIndex.duplicate_threshold)   # Doublons probables (titre approchant)
+            movie.id = repository.add_movie(user_id, movie.to_dict())                                   # Le dépôt attribue un nouvel ID au film et l'enregistre
+            CoverRenditions.submit(movie.cover_image_path, (user_id, movie.id))                         # Déclinaisons WebP et aperçu calculés en arrière-plan
+            
+            response = {
+                "status": "200",
+                "message": "Le film a bien été ajouté à votre vidéothèque."
+            }
+            if similar:
+                titles = ", ".join(f"« {other['movie_name']} »" for other, _ in similar)
+                response["warning"] = f"Votre vidéothèque contient déjà un film au titre proche : {titles}."
+                response["similar_movies"] = [
+                    {"id": other["id"], "movie_name": other["movie_name"], "similarity": round(similarity, 2)}
+                    for other, similarity in similar
+                ]
+            return jsonify(response), 200
         except FileNotFoundError:
             try:
-                # Si le fichier 'storage/movies_user_id.json' n'existe pas, je le crée en mode écriture
+                # Si la vidéothèque de l'utilisateur n'existe pas, je la crée
                 # Normalement ce cas de figure ne devrai jamais arriver
-                with open(f'storage/movies_{user_id}.json', 'w') as file:  
-                    # Créeation d'un nouveau fichier JSON avec un compteur 'nb_movies' à 1
-                    # et une liste 'movies' contenant les données du film en cours
-                    json.dump({"nb_movies": 1, "movies": [movie.to_dict()]}, file, indent=4)
-                    # Attribution de l'ID 1 au film s'il s'agit du premier film ajouté
-                    movie.id = 1
+                # Attribution de l'ID 1 au film s'il s'agit du premier film ajouté
+                movie.id = 1
+                repository.create_library(user_id, {"nb_movies": 1, "movies": [movie.to_dict()]})
+                CoverRenditions.submit(movie.cover_image_path, (user_id, movie.id))
             except Exception as e:
                 error_message = f"Erreur lors de l'ouverture du fichier movies.json : {str(e)}"
                 return jsonify({
@@ -200,32 +303,16 @@ class Movie:
             }), 303
         
         try:
-            # Ouvre le fichier JSON
-            with open(f'storage/movies_{user_id}.json', 'r') as file:
-                movies_data = json.load(file)
-                
-            # Trouve le film à supprimer
-            movie_to_update = next((movie for movie in movies_data["movies"] if movie["id"] == movie_id), None)
+            # Supprime le film de la vidéothèque
+            movie_to_update = get_repository().delete_movie(user_id, int(movie_id))
             if not movie_to_update:
                 return jsonify({
                     "status": "404",
                     "error": "Film non trouvé"
                 }), 404
 
-            # Récupère le chemin de l'image
-            image_path = movie_to_update["cover_image_path"]
-
-            # Vérifie si l'image n'est pas NOCOVERMOVIE.webp avant de la supprimer
-            if image_path != 'storage\\covers\\NOCOVERMOVIE.webp' and os.path.exists(image_path):
-                os.remove(image_path)
-
-            # Supprime le film de la liste
-            movies_data["movies"] = [movie for movie in movies_data["movies"] if movie["id"] != movie_id]
-            movies_data["nb_movies"] -= 1  # Mettre à jour le compteur de films
-
-            # Sauvegarde les modifications dans le fichier JSON
-            with open(f'storage/movies_{user_id}.json', 'w') as file:
-                json.dump(movies_data, file, indent=4)
+            # Supprime l'image de couverture du film
+            Movie.delete_cover(movie_to_update["cover_image_path"])
 
             return jsonify({
                 "status": "200",
@@ -238,10 +325,66 @@ class Movie:
                 "error": "Le fichier de films n'a pas été trouvé"
             }), 404
             
+    @staticmethod
+    def delete_cover(image_path: str):
+        """
+            Supprime l'image de couverture d'un film supprimé.
+            Une image adressée par contenu n'est supprimée que si plus aucun film ne l'utilise.
+
+            Args:
+                image_path (str): Le chemin de l'image de couverture.
+        """
+        
+        if CoverStore.is_managed(image_path):
+            CoverStore.release(image_path)
+        # Seules les anciennes images du dossier des couvertures sont supprimées, jamais NOCOVERMOVIE.webp
+        elif image_path and image_path.replace("\\", "/").startswith("storage/covers/") \
+                and os.path.basename(image_path.replace("\\", "/")) != 'NOCOVERMOVIE.webp' and os.path.exists(image_path):
+            os.remove(image_path)
+            get_cover_cache().evict(image_path)
+
+    @staticmethod
+    def release_cover(image_path: str):
+        """
+            Rend la référence à l'image d'un film qui n'a finalement pas été ajouté (doublon, erreur).
+
+            Args:
+                image_path (str): Le chemin de l'image de couverture.
+        """
+        
+        if CoverStore.is_managed(image_path):
+            CoverStore.release(image_path)
+
+    @staticmethod
+    def clean_fields(fields: dict) -> dict:
+        """
+            Prépare les champs modifiés d'un film : la notation est ramenée entre 1 et 5
+            et la date de dernière modification est mise à jour.
+
+            Args:
+                fields (dict): Les champs à modifier et leurs nouvelles valeurs.
+
+            Returns:
+                dict: Les champs à enregistrer.
+
+            Raises:
+                ValueError: Si la notation n'est pas un nombre entier.
+        """
+        
+        # L'identifiant d'un film, son image (référencée par le stockage des images), son aperçu et sa version ne se modifient pas
+        fields = {name: content for name, content in fields.items() if name not in ("id", "cover_image_path", "cover_placeholder", "version")}
+        if "notation" in fields:
+            fields["notation"] = str(min(max(int(fields["notation"]), 1), 5))
+        fields["last_modified_date"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return fields
+
     @staticmethod
     def edit_movie(data: str, user_id: str) -> str:
         """
-            Modifie une information d'un film en fonction de son identifiant.
+            Modifie une ou plusieurs informations d'un film en fonction de son identifiant.
+
+            Les champs sont reçus soit un par un (inputName, inputContent), soit ensemble dans
+            "fields" : {nom: valeur}. Dans les deux cas le film n'est écrit qu'une fois.
 
             Args:
                 data (str): Les données de modification du film.
@@ -251,31 +394,16 @@ class Movie:
         """
         
         movieId = data["movieId"]
-        nameInfoToUpdate = data["inputName"]
-        inputContent = data["inputContent"]
+        fields = data.get("fields") or {data["inputName"]: data["inputContent"]}
         try:
-            # Ouvrre le fichier JSON
-            with open(f'storage/movies_{user_id}.json', 'r') as file:
-                movies_data = json.load(file)
-                
-            # Trouve le film à modifier
-            movie_to_update = next((movie for movie in movies_data["movies"] if movie["id"] == int(movieId)), None)
+            # Modifie les champs du film et met à jour la date de dernière modification
+            movie_to_update = get_repository().update_movie(user_id, int(movieId), Movie.clean_fields(fields))
             if not movie_to_update:
                 return jsonify({
                     "status": "404",
                     "error": "Film non trouvé."
                 }), 404
 
-            # Modifie le champ nameInfoToUpdate du film avec inputContent
-            movie_to_update[nameInfoToUpdate] = inputContent
-
-            # Met à jour la date de dernière modification
-            movie_to_update["last_modified_date"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            # Sauvegarde les modifications dans le fichier JSON
-            with open(f'storage/movies_{user_id}.json', 'w') as file:
-                json.dump(movies_data, file, indent=4)
-
             return jsonify({
                 "status": "200",
                 "message": "L'information du film a été mise à jour avec succès."
@@ -286,3 +414,90 @@ class Movie:
                 "status": "404",
                 "error": "Le fichier de films n'a pas été trouvé"
             }), 404
+
+    @staticmethod
+    def apply_batch(operations: list, user_id: str) -> str:
+        """
+            Applique une liste d'opérations sur la vidéothèque de l'utilisateur en une seule écriture.
+
+            Opérations acceptées :
+            - {"op": "add", "movie": dict} : les données du film, comme pour /api/add-movie.
+            - {"op": "edit", "movieId": int, "fields": dict} : les champs à modifier.
+            - {"op": "delete", "movieId": int}
+
+            Une opération invalide ne bloque pas les autres : chaque opération reçoit son propre résultat.
+            Si l'écriture du lot échoue, aucune opération n'est appliquée et les références aux images
+            des films à ajouter sont rendues.
+
+            Args:
+                operations (list): Les opérations à appliquer, dans l'ordre.
+                user_id (str): L'identifiant de l'utilisateur.
+
+            Returns:
+                str: Une réponse JSON contenant le résultat de chaque opération, dans l'ordre.
+        """
+        
+        repository = get_repository()
+        results = [None] * len(operations)
+        pending = []                    # (position, opération du dépôt)
+        try:
+            repository.library_version(user_id)                                                     # Vidéothèque absente : FileNotFoundError avant toute image
+            added = set()                                                                           # Images et titres des films ajoutés plus tôt dans le lot
+
+            for position, operation in enumerate(operations):
+                try:
+                    if not isinstance(operation, dict):
+                        raise TypeError("une opération doit être un objet JSON.")
+                    if operation.get("op") == "add":
+                        movie = Movie({**operation["movie"], "user_id": user_id})
+                        identity = (movie.cover_image_path, TitleIndex.normalize(movie.movie_name))
+                        if identity in added or repository.find_movie_by_cover(user_id, movie.cover_image_path, movie.movie_name):   # Film identique déjà présent ou ajouté plus tôt dans le lot
+                            Movie.release_cover(movie.cover_image_path)
+                            results[position] = {"status": "400", "error": "Le film existe déjà dans votre vidéothèque."}
+                            continue
+                        added.add(identity)
+                        pending.append((position, {"op": "add", "movie": movie.to_dict()}))
+                    elif operation.get("op") == "edit":
+                        if not isinstance(operation.get("fields"), dict):
+                            raise TypeError("fields doit être un objet JSON.")
+                        fields = Movie.clean_fields(operation["fields"])
+                        pending.append((position, {"op": "edit", "id": int(operation["movieId"]), "fields": fields}))
+                    elif operation.get("op") == "delete":
+                        pending.append((position, {"op": "delete", "id": int(operation["movieId"])}))
+                    else:
+                        results[position] = {"status": "400", "error": "Opération inconnue."}
+                except (KeyError, TypeError, ValueError) as e:
+                    results[position] = {"status": "400", "error": f"Opération invalide : {str(e)}"}
+
+            outcomes = repository.apply_batch(user_id, [operation for _, operation in pending])
+        except Exception as e:
+            # Aucun film du lot n'a été ajouté : les références aux images prises par Movie() sont rendues
+            for _, operation in pending:
+                if operation["op"] == "add":
+                    Movie.release_cover(operation["movie"]["cover_image_path"])
+            if isinstance(e, FileNotFoundError):
+                return jsonify({
+                    "status": "404",
+                    "error": "Le fichier de films n'a pas été trouvé"
+                }), 404
+            print(f"Erreur lors de l'application du lot d'opérations : {e}")
+            return jsonify({
+                "status": "500",
+                "error": "Erreur lors de l'enregistrement des opérations."
+            }), 500
+
+        for (position, operation), outcome in zip(pending, outcomes):
+            if operation["op"] == "add":
+                CoverRenditions.submit(operation["movie"]["cover_image_path"], (user_id, outcome))
+                results[position] = {"status": "200", "id": outcome}
+            elif outcome is None:
+                results[position] = {"status": "404", "error": "Film non trouvé."}
+            else:
+                if operation["op"] == "delete":
+                    Movie.delete_cover(outcome["cover_image_path"])
+                results[position] = {"status": "200", "id": operation["id"]}
+
+        return jsonify({
+            "status": "200",
+            "results": results
+        }), 200
@@ -0,0 +1,237 @@
+import base64       # Pour l'encodage des curseurs de pagination.
+import json         # Pour la sérialisation des curseurs de pagination.
+
+"""
+|
+|   Paramètres de tri, de filtre et de pagination des listes de films.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class MovieQuery:
+    """
+    Décrit une page de la liste des films d'un utilisateur : l'ordre de tri, les filtres,
+    la taille de la page et le curseur de reprise.
+
+    La pagination se fait par curseur : le curseur contient la clé de tri et l'identifiant du dernier film
+    de la page précédente. La page suivante commence juste après ce couple (key, id), ce qui reste juste
+    lorsque des films sont ajoutés ou supprimés entre deux pages.
+
+    Attributes:
+        sort (str): Le critère de tri (voir sort_keys).
+        descending (bool): True pour un tri décroissant.
+        limit (int): Le nombre maximal de films de la page, None pour tous les films.
+        after (tuple): Le couple (clé de tri, identifiant) du dernier film de la page précédente, ou None.
+        category (str): La catégorie recherchée, ou None.
+        year_min (int): L'année de sortie minimale, ou None.
+        year_max (int): L'année de sortie maximale, ou None.
+        min_rating (int): La notation minimale, ou None.
+
+    Class Attributes:
+        sort_keys (dict): Les fonctions qui calculent la clé de tri d'un film, par critère de tri.
+        max_limit (int): La taille maximale d'une page.
+
+    Methods:
+        from_args(args): Construit une requête à partir des paramètres d'une requête HTTP.
+        key(movie): Retourne le couple (clé de tri, identifiant) d'un film.
+        matches(movie): Indique si un film passe les filtres.
+        cursor(movie): Retourne le curseur qui reprend la liste après un film.
+        encode_cursor(key, movie_id): Retourne le curseur qui reprend la liste après un couple (clé, identifiant).
+        decode_cursor(cursor): Décode un curseur.
+        paginate(movies): Sélectionne la page dans des films déjà triés.
+    """
+
+    sort_keys = {
+        "id": lambda movie: movie["id"],
+        "name": lambda movie: (movie.get("movie_name") or "").casefold(),
+        "year": lambda movie: MovieQuery.to_int(movie.get("year_of_creation")),
+        "rating": lambda movie: MovieQuery.to_int(movie.get("notation")),
+        "created": lambda movie: movie.get("creation_date") or "",
+        "modified": lambda movie: movie.get("last_modified_date") or ""
+    }
+
+    max_limit = 500
+
+    def __init__(self, sort: str = "id", descending: bool = False, limit: int = None, after: tuple = None,
+                 category: str = None, year_min: int = None, year_max: int = None, min_rating: int = None):
+        """
+            Initialise une requête.
+
+        Args:
+            sort (str): Le critère de tri.
+            descending (bool): True pour un tri décroissant.
+            limit (int): Le nombre maximal de films de la page, None pour tous les films.
+            after (tuple): Le couple (clé de tri, identifiant) après lequel la page commence.
+            category (str): La catégorie recherchée.
+            year_min (int): L'année de sortie minimale.
+            year_max (int): L'année de sortie maximale.
+            min_rating (int): La notation minimale.
+
+        Raises:
+            ValueError: Si le critère de tri n'existe pas.
+        """
+        if sort not in self.sort_keys:
+            raise ValueError(f"Critère de tri inconnu : {sort}")
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+        self.after = after
+        self.category = category
+        self.year_min = year_min
+        self.year_max = year_max
+        self.min_rating = min_rating
+
+    @classmethod
+    def from_args(cls, args) -> 'MovieQuery':
+        """
+            Construit une requête à partir des paramètres d'une requête HTTP :
+            sort, order (asc|desc), limit, cursor, category, year_min, year_max, min_rating.
+
+        Args:
+            args (dict): Les paramètres de la requête (request.args).
+
+        Returns:
+            MovieQuery: La requête.
+
+        Raises:
+            ValueError: Si un paramètre est invalide.
+        """
+        optional_int = lambda name: int(args[name]) if args.get(name) not in (None, "") else None
+
+        limit = optional_int("limit")
+        if limit is not None and not 1 <= limit <= cls.max_limit:
+            raise ValueError(f"La taille de page doit être comprise entre 1 et {cls.max_limit}.")
+        if args.get("order", "asc") not in ("asc", "desc"):
+            raise ValueError("L'ordre de tri doit être asc ou desc.")
+
+        query = cls(
+            sort=args.get("sort") or "id",
+            descending=args.get("order") == "desc",
+            limit=limit,
+            category=args.get("category") or None,
+            year_min=optional_int("year_min"),
+            year_max=optional_int("year_max"),
+            min_rating=optional_int("min_rating")
+        )
+        if args.get("cursor"):
+            query.after = query.decode_cursor(args["cursor"])
+        return query
+
+    @staticmethod
+    def to_int(value) -> int:
+        """
+            Convertit une année ou une notation en entier (0 si la valeur n'est pas un nombre).
+
+        Args:
+            value: La valeur à convertir.
+
+        Returns:
+            int: La valeur entière.
+        """
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
+
+    def key(self, movie: dict) -> tuple:
+        """
+            Retourne le couple (clé de tri, identifiant) d'un film. L'identifiant départage les films
+            de même clé, l'ordre est donc total et stable d'une page à l'autre.
+
+        Args:
+            movie (dict): Le film.
+
+        Returns:
+            tuple: Le couple (clé de tri, identifiant).
+        """
+        return self.sort_keys[self.sort](movie), movie["id"]
+
+    def matches(self, movie: dict) -> bool:
+        """
+            Indique si un film passe les filtres de la requête.
+
+        Args:
+            movie (dict): Le film.
+
+        Returns:
+            bool: True si le film doit figurer dans la liste.
+        """
+        if self.category is not None and movie.get("category") != self.category:
+            return False
+        if self.year_min is not None or self.year_max is not None:
+            year = self.to_int(movie.get("year_of_creation"))
+            if (self.year_min is not None and year < self.year_min) or (self.year_max is not None and year > self.year_max):
+                return False
+        if self.min_rating is not None and self.to_int(movie.get("notation")) < self.min_rating:
+            return False
+        return True
+
+    def cursor(self, movie: dict) -> str:
+        """
+            Retourne le curseur qui reprend la liste juste après un film.
+
+        Args:
+            movie (dict): Le dernier film de la page.
+
+        Returns:
+            str: Le curseur (JSON encodé en base64).
+        """
+        return self.encode_cursor(*self.key(movie))
+
+    def encode_cursor(self, key, movie_id: int) -> str:
+        """
+            Retourne le curseur qui reprend la liste juste après un couple (clé de tri, identifiant).
+
+        Args:
+            key: La clé de tri du dernier film de la page.
+            movie_id (int): L'identifiant du dernier film de la page.
+
+        Returns:
+            str: Le curseur (JSON encodé en base64).
+        """
+        payload = json.dumps([self.sort, self.descending, key, movie_id], ensure_ascii=False)
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor: str) -> tuple:
+        """
+            Décode un curseur produit par cursor().
+
+        Args:
+            cursor (str): Le curseur.
+
+        Returns:
+            tuple: Le couple (clé de tri, identifiant).
+
+        Raises:
+            ValueError: Si le curseur est invalide ou a été produit pour un autre tri.
+        """
+        try:
+            sort, descending, key, movie_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, TypeError):
+            raise ValueError("Curseur de pagination invalide.")
+        if sort != self.sort or descending != self.descending:
+            raise ValueError("Le curseur de pagination ne correspond pas au tri demandé.")
+        key_type = str if sort in ("name", "created", "modified") else int
+        if type(key) is not key_type or type(movie_id) is not int:
+            raise ValueError("Curseur de pagination invalide.")
+        return key, movie_id
+
+    def paginate(self, movies) -> dict:
+        """
+            Sélectionne la page demandée parmi des films déjà triés et reprenant après le curseur.
+
+        Args:
+            movies (iterable): Les films, dans l'ordre de la requête, à partir du curseur.
+
+        Returns:
+            dict: {"movies": list, "next_cursor": str ou None}.
+        """
+        page = []
+        for movie in movies:
+            if not self.matches(movie):
+                continue
+            if self.limit is not None and len(page) == self.limit:
+                return {"movies": page, "next_cursor": self.cursor(page[-1])}
+            page.append(movie)
+        return {"movies": page, "next_cursor": None}
@@ -0,0 +1,479 @@
+from abc import ABC, abstractmethod     # Pour la définition de l'interface des dépôts
+from src.classes.movie_query import MovieQuery  # Tri, filtres et pagination des films
+from src.classes.search_index import SearchIndex  # Recherche plein texte
+from src.classes.title_index import TitleIndex    # Recherche de titres approchants
+from src.classes.library_stats import LibraryStats  # Statistiques des vidéothèques
+
+"""
+|
+|   Interface commune des dépôts de données (utilisateurs et vidéothèques).
+|   Le dépôt utilisé est choisi par la configuration de l'application (STORAGE_BACKEND).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class Repository(ABC):
+    """
+    Interface d'accès aux utilisateurs et aux vidéothèques.
+
+    Une vidéothèque est un dictionnaire {"nb_movies": int, "next_id": int, "movies": list} et un film est le dictionnaire
+    produit par Movie.to_dict(). Les méthodes qui portent sur une vidéothèque lèvent FileNotFoundError
+    si la vidéothèque de l'utilisateur n'existe pas.
+
+    Methods:
+        get_user(user_id): Retourne les données d'un utilisateur.
+        find_user_by_email(email): Retourne l'identifiant et les données de l'utilisateur ayant cet e-mail.
+        email_exists(email): Indique si un utilisateur utilise déjà un e-mail.
+        add_user(user_id, user_data): Enregistre un nouvel utilisateur, sauf si son e-mail est déjà utilisé.
+        delete_user(user_id): Supprime un utilisateur.
+        iter_users(): Parcourt tous les utilisateurs.
+        create_library(user_id, data): Crée la vidéothèque d'un utilisateur.
+        delete_library(user_id): Supprime la vidéothèque d'un utilisateur.
+        load_library(user_id): Charge la vidéothèque complète d'un utilisateur.
+        list_movies(user_id, query): Retourne une page triée et filtrée des films d'un utilisateur.
+        search_movies(user_id, text, limit, category): Recherche des films par mots-clés.
+        similar_titles(user_id, title, limit, threshold, exclude): Retourne les films dont le titre est proche d'un titre.
+        movie_stats(user_id): Retourne les statistiques de la vidéothèque d'un utilisateur.
+        movie_changes(user_id, since): Retourne les modifications de la vidéothèque postérieures à une version.
+        library_version(user_id): Retourne la version de la vidéothèque d'un utilisateur.
+        get_movie(user_id, movie_id): Retourne un film.
+        find_movie_by_cover(user_id, cover_image_path, movie_name): Retourne un film qui utilise une image de couverture.
+        add_movie(user_id, movie): Ajoute un film et retourne son identifiant.
+        update_movie(user_id, movie_id, fields): Modifie les champs d'un film.
+        delete_movie(user_id, movie_id): Supprime un film.
+        apply_batch(user_id, operations): Applique une liste d'opérations sur les films en une seule écriture.
+        acquire_cover(image_path): Ajoute une référence à une image de couverture.
+        release_cover(image_path): Retire une référence à une image de couverture.
+        set_cover_references(counts): Remplace tous les compteurs de références des images.
+        metrics(): Retourne les compteurs internes du dépôt (caches).
+    """
+
+    def metrics(self) -> dict:
+        """
+            Retourne les compteurs internes du dépôt (caches), vide par défaut.
+
+        Returns:
+            dict: Les compteurs du dépôt.
+        """
+        return {}
+
+    #
+    #   Utilisateurs
+    #
+
+    @abstractmethod
+    def get_user(self, user_id: str) -> dict:
+        """
+            Retourne les données d'un utilisateur.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            dict: Les données de l'utilisateur (first_name, email, password) ou None s'il n'existe pas.
+        """
+
+    @abstractmethod
+    def find_user_by_email(self, email: str) -> tuple:
+        """
+            Retourne l'identifiant et les données de l'utilisateur ayant cet e-mail.
+
+        Args:
+            email (str): L'adresse e-mail recherchée.
+
+        Returns:
+            tuple: (user_id, user_data) ou None si aucun utilisateur n'utilise cet e-mail.
+        """
+
+    def email_exists(self, email: str) -> bool:
+        """
+            Indique si un utilisateur utilise déjà un e-mail.
+
+        Args:
+            email (str): L'adresse e-mail recherchée.
+
+        Returns:
+            bool: True si l'e-mail est déjà utilisé.
+        """
+        return self.find_user_by_email(email) is not None
+
+    @abstractmethod
+    def add_user(self, user_id: str, user_data: dict) -> bool:
+        """
+            Enregistre un nouvel utilisateur, sauf si son e-mail est déjà utilisé. La vérification et
+            l'enregistrement sont atomiques : deux inscriptions simultanées avec le même e-mail n'en
+            enregistrent qu'une.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            user_data (dict): Les données de l'utilisateur (first_name, email, password).
+
+        Returns:
+            bool: True si l'utilisateur a été enregistré, False si l'e-mail est déjà utilisé.
+        """
+
+    @abstractmethod
+    def delete_user(self, user_id: str) -> bool:
+        """
+            Supprime un utilisateur.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            bool: True si l'utilisateur existait, False sinon.
+        """
+
+    @abstractmethod
+    def iter_users(self):
+        """
+            Parcourt tous les utilisateurs.
+
+        Returns:
+            iterable: Des couples (user_id, user_data).
+        """
+
+    #
+    #   Vidéothèques
+    #
+
+    @abstractmethod
+    def create_library(self, user_id: str, data: dict = None):
+        """
+            Crée (ou remplace) la vidéothèque d'un utilisateur.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            data (dict): Le contenu initial de la vidéothèque, vide par défaut.
+        """
+
+    @abstractmethod
+    def delete_library(self, user_id: str):
+        """
+            Supprime la vidéothèque d'un utilisateur.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+        """
+
+    @abstractmethod
+    def load_library(self, user_id: str) -> dict:
+        """
+            Charge la vidéothèque complète d'un utilisateur.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            dict: La vidéothèque {"nb_movies": int, "next_id": int, "movies": list}. Elle peut être partagée avec un
+                  cache et ne doit pas être modifiée par l'appelant.
+        """
+
+    def list_movies(self, user_id: str, query: MovieQuery) -> dict:
+        """
+            Retourne une page triée et filtrée des films d'un utilisateur.
+            Cette implémentation trie toute la vidéothèque ; les dépôts la redéfinissent
+            pour s'appuyer sur des clés de tri déjà calculées ou sur leurs index.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            query (MovieQuery): Le tri, les filtres et la pagination.
+
+        Returns:
+            dict: {"nb_movies": int (taille de la vidéothèque), "movies": list, "next_cursor": str ou None}.
+        """
+        library = self.load_library(user_id)
+        movies = sorted(library["movies"], key=query.key, reverse=query.descending)
+        if query.after:
+            after = tuple(query.after)
+            movies = [movie for movie in movies if (query.key(movie) < after if query.descending else query.key(movie) > after)]
+        return {"nb_movies": library["nb_movies"], **query.paginate(movies)}
+
+    def search_movies(self, user_id: str, text: str, limit: int = 20, category: str = None) -> list:
+        """
+            Recherche des films par mots-clés dans le titre, le réalisateur, la catégorie et le synopsis
+            (voir SearchIndex). Cette implémentation indexe toute la vidéothèque à chaque recherche ;
+            les dépôts la redéfinissent pour s'appuyer sur un index tenu à jour.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            text (str): La recherche.
+            limit (int): Le nombre maximal de résultats.
+            category (str): La catégorie recherchée, None pour toutes.
+
+        Returns:
+            list: Les couples (film, score), du plus pertinent au moins pertinent.
+        """
+        movies = {movie["id"]: movie for movie in self.load_library(user_id)["movies"]}
+        accept = None
+        if category is not None:
+            accept = lambda movie_id: movies[movie_id].get("category") == category
+        return [(movies[movie_id], score) for movie_id, score in SearchIndex(movies.values()).search(text, limit, accept)]
+
+    def similar_titles(self, user_id: str, title: str, limit: int = 5, threshold: float = None, exclude: int = None) -> list:
+        """
+            Retourne les films dont le titre est proche d'un titre, malgré les fautes de frappe (voir TitleIndex).
+            Cette implémentation indexe toute la vidéothèque à chaque appel ; les dépôts la redéfinissent
+            pour s'appuyer sur un index tenu à jour.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            title (str): Le titre recherché.
+            limit (int): Le nombre maximal de films.
+            threshold (float): La similarité minimale (TitleIndex.threshold par défaut).
+            exclude (int): L'identifiant d'un film à ignorer, None pour aucun.
+
+        Returns:
+            list: Les couples (film, similarité), du plus proche au moins proche.
+        """
+        movies = {movie["id"]: movie for movie in self.load_library(user_id)["movies"]}
+        return [(movies[movie_id], similarity) for movie_id, similarity in TitleIndex(movies.values()).similar(title, limit, threshold, exclude)]
+
+    def movie_stats(self, user_id: str) -> dict:
+        """
+            Retourne les statistiques de la vidéothèque d'un utilisateur (voir LibraryStats).
+            Cette implémentation parcourt toute la vidéothèque ; les dépôts la redéfinissent pour
+            s'appuyer sur des compteurs tenus à jour.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            dict: Les statistiques au format JSON.
+        """
+        return LibraryStats(self.load_library(user_id)["movies"]).to_dict()
+
+    def movie_changes(self, user_id: str, since: int) -> dict:
+        """
+            Retourne les films ajoutés ou modifiés et les films supprimés après une version de la vidéothèque
+            (voir Library.changes). Cette implémentation renvoie toujours toute la vidéothèque (reset) ;
+            les dépôts qui tiennent des versions la redéfinissent.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            since (int): La dernière version connue du client.
+
+        Returns:
+            dict: {"version": int, "reset": bool, "movies": list, "deleted": list}.
+        """
+        library = self.load_library(user_id)
+        return {"version": library.get("version", 0), "reset": True, "movies": library["movies"], "deleted": []}
+
+    def library_version(self, user_id: str) -> int:
+        """
+            Retourne la version de la vidéothèque d'un utilisateur, incrémentée à chaque modification
+            (validateur des réponses HTTP, voir ETag). Cette implémentation charge toute la vidéothèque ;
+            les dépôts la redéfinissent pour ne lire que la version.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            int: La version.
+
+        Raises:
+            FileNotFoundError: Si la vidéothèque n'existe pas.
+        """
+        return self.load_library(user_id).get("version", 0)
+
+    @abstractmethod
+    def get_movie(self, user_id: str, movie_id: int) -> dict:
+        """
+            Retourne un film.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_id (int): L'identifiant du film.
+
+        Returns:
+            dict: Le film ou None s'il n'existe pas.
+        """
+
+    @abstractmethod
+    def find_movie_by_cover(self, user_id: str, cover_image_path: str, movie_name: str = None) -> dict:
+        """
+            Retourne un film qui utilise une image de couverture (détection des doublons). Les images étant
+            adressées par leur contenu, deux films différents peuvent partager la même affiche : avec
+            movie_name, seul un film de même titre (aux accents et à la casse près, voir TitleIndex.normalize)
+            est retourné.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            cover_image_path (str): Le chemin de l'image de couverture.
+            movie_name (str): Le titre du film, None pour ignorer le titre.
+
+        Returns:
+            dict: Le film ou None si aucun film ne correspond.
+        """
+
+    @abstractmethod
+    def add_movie(self, user_id: str, movie: dict) -> int:
+        """
+            Ajoute un film à la vidéothèque et lui attribue un identifiant (jamais réutilisé).
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            movie (dict): Le film à ajouter, sa clé "id" est renseignée par le dépôt.
+
+        Returns:
+            int: L'identifiant attribué au film.
+        """
+
+    @abstractmethod
+    def update_movie(self, user_id: str, movie_id: int, fields: dict) -> dict:
+        """
+            Modifie les champs d'un film.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_id (int): L'identifiant du film.
+            fields (dict): Les champs à modifier et leurs nouvelles valeurs.
+
+        Returns:
+            dict: Le film modifié ou None s'il n'existe pas.
+        """
+
+    @abstractmethod
+    def delete_movie(self, user_id: str, movie_id: int) -> dict:
+        """
+            Supprime un film.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_id (int): L'identifiant du film.
+
+        Returns:
+            dict: Le film supprimé ou None s'il n'existe pas.
+        """
+
+    def apply_batch(self, user_id: str, operations: list) -> list:
+        """
+            Applique une liste d'opérations sur les films d'une vidéothèque, dans l'ordre.
+
+            Opérations reconnues :
+            - {"op": "add", "movie": dict} : ajoute un film, le résultat est l'identifiant attribué.
+            - {"op": "edit", "id": int, "fields": dict} : modifie un film, le résultat est le film modifié.
+            - {"op": "delete", "id": int} : supprime un film, le résultat est le film supprimé.
+
+            Le résultat d'une modification ou d'une suppression est None si le film n'existe pas.
+            Cette implémentation appelle les méthodes unitaires ; les dépôts la redéfinissent pour
+            n'effectuer qu'une seule écriture (une transaction, un ajout au journal) par lot.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            operations (list): Les opérations à appliquer.
+
+        Returns:
+            list: Le résultat de chaque opération, dans l'ordre des opérations.
+        """
+        results = []
+        for operation in operations:
+            if operation["op"] == "add":
+                results.append(self.add_movie(user_id, operation["movie"]))
+            elif operation["op"] == "edit":
+                results.append(self.update_movie(user_id, operation["id"], operation["fields"]))
+            else:
+                results.append(self.delete_movie(user_id, operation["id"]))
+        return results
+
+    #
+    #   Références des images de couverture (voir CoverStore)
+    #
+
+    @abstractmethod
+    def acquire_cover(self, image_path: str) -> int:
+        """
+            Ajoute une référence à une image de couverture.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            int: Le nombre de références de l'image après l'ajout.
+        """
+
+    @abstractmethod
+    def release_cover(self, image_path: str) -> int:
+        """
+            Retire une référence à une image de couverture.
+
+        Args:
+            image_path (str): Le chemin de l'image.
+
+        Returns:
+            int: Le nombre de références restantes (0 si l'image n'est plus utilisée).
+        """
+
+    @abstractmethod
+    def set_cover_references(self, counts: dict):
+        """
+            Remplace tous les compteurs de références des images (migrations, recomptage).
+
+        Args:
+            counts (dict): Le nombre de références par chemin d'image.
+        """
+
+"""
+|
+|   Sélection du dépôt
+|
+"""
+
+_repository = None
+
+def create_repository(backend: str = 'json', **options) -> Repository:
+    """
+        Crée un dépôt à partir du nom de son moteur de stockage.
+
+    Args:
+        backend (str): 'json' (fichiers du dossier storage) ou 'sqlite'.
+        **options: Les options du dépôt (storage_dir, cache_max_bytes, database_path).
+
+    Returns:
+        Repository: Le dépôt créé.
+
+    Raises:
+        ValueError: Si le moteur de stockage n'est pas reconnu.
+    """
+    if backend == 'json':
+        from src.classes.json_repository import JsonRepository
+        return JsonRepository(
+            options.get('storage_dir', 'storage'),
+            options.get('cache_max_bytes', 64 * 1024 * 1024)
+        )
+    if backend == 'sqlite':
+        from src.classes.sqlite_repository import SqliteRepository
+        return SqliteRepository(options.get('database_path', 'storage/videotheque.db'))
+    raise ValueError(f"Moteur de stockage inconnu : {backend}")
+
+def configure_repository(config) -> Repository:
+    """
+        Configure le dépôt global à partir de la configuration Flask.
+
+    Args:
+        config (dict): La configuration de l'application (STORAGE_BACKEND, SQLITE_DATABASE_PATH,
+                       LIBRARY_CACHE_MAX_BYTES).
+
+    Returns:
+        Repository: Le dépôt configuré.
+    """
+    global _repository
+    _repository = create_repository(
+        config.get('STORAGE_BACKEND', 'json'),
+        database_path=config.get('SQLITE_DATABASE_PATH', 'storage/videotheque.db'),
+        cache_max_bytes=config.get('LIBRARY_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+    )
+    return _repository
+
+def get_repository() -> Repository:
+    """
+        Retourne le dépôt global (les fichiers JSON si aucun dépôt n'a été configuré).
+
+    Returns:
+        Repository: Le dépôt courant.
+    """
+    global _repository
+    if _repository is None:
+        _repository = create_repository()
+    return _repository
@@ -0,0 +1,179 @@
+import heapq                                        # Pour la sélection des meilleurs résultats.
+import math                                         # Pour le calcul de l'IDF.
+import re                                           # Pour le découpage des textes en mots.
+import unicodedata                                  # Pour la suppression des accents.
+from collections import Counter                     # Pour le nombre d'occurrences des mots.
+
+"""
+|
+|   Index inversé de recherche plein texte dans une vidéothèque (classement BM25).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class SearchIndex:
+    """
+    Index inversé des films d'une vidéothèque sur le titre, le réalisateur, la catégorie et le synopsis.
+
+    Les textes sont découpés en mots sans accents ni majuscules (« Amélie » et « amelie » sont le même mot),
+    les élisions et les mots vides du français sont ignorés. Un mot du titre compte davantage qu'un mot
+    du synopsis (voir fields). Les résultats contiennent tous les mots de la recherche et sont classés
+    par BM25.
+
+    L'index est tenu à jour film par film (add, remove) : une recherche ne parcourt que les listes des mots
+    recherchés, en commençant par la plus courte.
+
+    Attributes:
+        postings (dict): Par mot, le poids du mot dans chaque film qui le contient {id: poids}.
+        lengths (dict): Par film, la longueur pondérée de son texte.
+        total_length (float): La somme des longueurs pondérées.
+
+    Class Attributes:
+        fields (dict): Les champs indexés et leur poids.
+        k1 (float): La saturation de la fréquence d'un mot (BM25).
+        b (float): La normalisation par la longueur du texte (BM25).
+        stopwords (frozenset): Les mots ignorés.
+        ligatures (dict): Les lettres que la suppression des accents ne décompose pas (œ, æ…).
+        word_pattern (re.Pattern): Le format d'un mot.
+        accent_pattern (re.Pattern): Les signes diacritiques laissés par la décomposition NFKD.
+
+    Methods:
+        tokenize(text, keep_stopwords): Découpe un texte en mots normalisés.
+        terms(movie): Retourne le poids de chaque mot d'un film.
+        add(movie): Ajoute un film à l'index.
+        remove(movie): Retire un film de l'index.
+        search(text, limit, accept): Retourne les identifiants des films les mieux classés.
+    """
+
+    fields = {"movie_name": 3.0, "director": 2.0, "category": 1.5, "synopsis": 1.0}
+    k1 = 1.2
+    b = 0.75
+    stopwords = frozenset("""
+        a au aux avec c ce ces cet cette d dans de des du elle elles en et il ils j l la le les leur leurs
+        lui m ma mes mon n ne ni on ou par pas pour qu que qui s sa se ses son sur t ta te tes ton un une
+        vos votre y the of and
+    """.split())
+    ligatures = str.maketrans({"œ": "oe", "Œ": "oe", "æ": "ae", "Æ": "ae", "ß": "ss"})
+    word_pattern = re.compile(r"[^\W_]+")
+    accent_pattern = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+
+    def __init__(self, movies=()):
+        """
+            Initialise l'index.
+
+        Args:
+            movies (iterable): Les films à indexer.
+        """
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0.0
+        for movie in movies:
+            self.add(movie)
+
+    @classmethod
+    def tokenize(cls, text, keep_stopwords: bool = False) -> list:
+        """
+            Découpe un texte en mots normalisés : sans accents, en minuscules, sans mots vides.
+
+        Args:
+            text (str): Le texte.
+            keep_stopwords (bool): True pour garder les mots vides (comparaison de titres).
+
+        Returns:
+            list: Les mots, dans l'ordre du texte.
+        """
+        if not text:
+            return []
+        text = str(text)
+        if not text.isascii():                                # Les textes sans accent n'ont rien à décomposer
+            text = cls.accent_pattern.sub("", unicodedata.normalize("NFKD", text.translate(cls.ligatures)))
+        words = cls.word_pattern.findall(text.casefold())
+        return words if keep_stopwords else [word for word in words if word not in cls.stopwords]
+
+    @classmethod
+    def terms(cls, movie: dict) -> Counter:
+        """
+            Retourne le poids de chaque mot d'un film (nombre d'occurrences pondéré par le poids du champ).
+
+        Args:
+            movie (dict): Le film.
+
+        Returns:
+            Counter: Le poids de chaque mot.
+        """
+        terms = Counter()
+        for field, weight in cls.fields.items():
+            for word in cls.tokenize(movie.get(field)):
+                terms[word] += weight
+        return terms
+
+    def add(self, movie: dict):
+        """
+            Ajoute un film à l'index.
+
+        Args:
+            movie (dict): Le film.
+        """
+        terms = self.terms(movie)
+        for word, weight in terms.items():
+            self.postings.setdefault(word, {})[movie["id"]] = weight
+        length = sum(terms.values())
+        self.lengths[movie["id"]] = length
+        self.total_length += length
+
+    def remove(self, movie: dict):
+        """
+            Retire un film de l'index.
+
+        Args:
+            movie (dict): Le film, tel qu'il a été indexé.
+        """
+        length = self.lengths.pop(movie["id"], None)
+        if length is None:
+            return
+        self.total_length -= length
+        for word in self.terms(movie):
+            posting = self.postings.get(word)
+            if posting is not None:
+                posting.pop(movie["id"], None)
+                if not posting:
+                    del self.postings[word]
+
+    def search(self, text: str, limit: int = 20, accept=None) -> list:
+        """
+            Retourne les films qui contiennent tous les mots de la recherche, classés par BM25.
+
+        Args:
+            text (str): La recherche.
+            limit (int): Le nombre maximal de résultats.
+            accept (callable): Filtre appliqué aux identifiants avant le classement, None pour tous les films.
+
+        Returns:
+            list: Les couples (identifiant, score), du plus pertinent au moins pertinent.
+        """
+        words = list(dict.fromkeys(self.tokenize(text)))
+        if not words or not self.lengths:
+            return []
+        postings = [self.postings.get(word) for word in words]
+        if not all(postings):
+            return []
+
+        nb_movies = len(self.lengths)
+        average_length = self.total_length / nb_movies or 1.0
+        weighted = sorted(
+            ((math.log(1 + (nb_movies - len(posting) + 0.5) / (len(posting) + 0.5)), posting) for posting in postings),
+            key=lambda item: len(item[1])
+        )
+
+        def score(movie_id):
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[movie_id] / average_length)
+            return sum(idf * posting[movie_id] * (self.k1 + 1) / (posting[movie_id] + norm) for idf, posting in weighted)
+
+        # Les candidats sont les films de la liste la plus courte qui figurent dans toutes les autres
+        rest = [posting for _, posting in weighted[1:]]
+        candidates = (
+            movie_id for movie_id in weighted[0][1]
+            if all(movie_id in posting for posting in rest) and (accept is None or accept(movie_id))
+        )
+        return heapq.nlargest(limit, ((movie_id, score(movie_id)) for movie_id in candidates), key=lambda item: item[1])
@@ -0,0 +1,874 @@
+import json                                         # Pour la sérialisation des champs supplémentaires des films.
+import os                                           # Pour les opérations sur le système de fichiers.
+import sqlite3                                      # Pour la base de données SQLite.
+import threading                                    # Pour une connexion par thread.
+from src.classes.movie_query import MovieQuery      # Tri, filtres et pagination des films
+from src.classes.repository import Repository       # Interface commune des dépôts
+from src.classes.search_index import SearchIndex    # Découpage des textes pour la recherche plein texte
+from src.classes.title_index import TitleIndex      # Index en mémoire des titres (titres approchants)
+from src.classes.library_stats import LibraryStats  # Compteurs des statistiques des vidéothèques
+from src.classes.library import Library             # Nombre maximal de pierres tombales
+
+"""
+|
+|   Dépôt basé sur une base de données SQLite (storage/videotheque.db par défaut).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class SqliteRepository(Repository):
+    """
+    Dépôt qui stocke les utilisateurs et les films dans une base SQLite indexée.
+    Les identifiants de films sont attribués par le compteur monotone libraries.next_id.
+
+    La recherche par e-mail (inscription, connexion) passe par l'index idx_users_email et les opérations
+    sur un film par la clé primaire (user_id, id). Les index idx_movies_category et idx_movies_year servent
+    aux filtres sur la catégorie et l'année, les index idx_movies_sort_* à la pagination triée (une page
+    est lue dans l'index à partir du curseur, sans trier la vidéothèque). Le tri par nom utilise la colonne
+    sort_name, le titre passé par str.casefold comme dans le dépôt JSON (LOWER ne traite que l'ASCII et
+    classerait « École » et « élan » autrement). Les champs d'un film qui ne correspondent à aucune colonne
+    sont conservés en JSON dans la colonne extra.
+
+    La recherche plein texte passe par la table FTS5 movies_search (classement bm25), dont chaque ligne a le
+    rowid du film dans movies. Les textes y sont enregistrés déjà découpés par SearchIndex.tokenize (sans
+    accents ni mots vides), comme dans le dépôt JSON, et la ligne est mise à jour dans la même transaction
+    que le film.
+
+    Les statistiques d'une vidéothèque (/api/movies/stats) sont lues dans la table movie_stats : le nombre
+    de films par catégorie, par année et par note (voir LibraryStats), modifié dans la même transaction
+    que le film.
+
+    La recherche de titres approchants s'appuie sur un index de trigrammes en mémoire (TitleIndex) par
+    utilisateur, construit à la première recherche. Après chaque écriture validée, les titres des films
+    modifiés sont relus dans la base : l'index reflète toujours le dernier état validé, même si deux
+    écritures se terminent dans le désordre.
+
+    La synchronisation par différences (/api/movies/changes) suit les mêmes règles que Library : chaque
+    écriture incrémente libraries.version dans sa transaction, la ligne du film reçoit cette version
+    (index idx_movies_version) et une suppression laisse une ligne dans movie_tombstones.
+
+    Attributes:
+        database_path (str): Le chemin du fichier de la base de données.
+        title_indexes (dict): Par utilisateur, l'index de trigrammes de ses titres.
+        title_lock (threading.Lock): Le verrou des index de titres.
+
+    Class Attributes:
+        movie_columns (tuple): Les colonnes de la table movies (hors user_id et extra).
+        sort_expressions (dict): L'expression SQL de la clé de tri, par critère de tri (voir MovieQuery).
+        search_weights (str): Les poids des colonnes de movies_search pour bm25 (user_key, puis SearchIndex.fields).
+    """
+
+    sort_expressions = {
+        "id": "id",
+        "name": "sort_name",
+        "year": "CAST(COALESCE(year_of_creation, 0) AS INTEGER)",
+        "rating": "CAST(COALESCE(notation, 0) AS INTEGER)",
+        "created": "COALESCE(creation_date, '')",
+        "modified": "COALESCE(last_modified_date, '')"
+    }
+
+    search_weights = ", ".join(["0.0", *(str(weight) for weight in SearchIndex.fields.values())])
+
+    movie_columns = (
+        'id', 'movie_name', 'year_of_creation', 'director', 'category', 'synopsis',
+        'notation', 'cover_image_path', 'creation_date', 'last_modified_date', 'version'
+    )
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            first_name TEXT,
+            email TEXT NOT NULL,
+            password TEXT
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email);
+
+        CREATE TABLE IF NOT EXISTS libraries (
+            user_id TEXT PRIMARY KEY,
+            nb_movies INTEGER NOT NULL DEFAULT 0,
+            next_id INTEGER NOT NULL DEFAULT 1,
+            version INTEGER NOT NULL DEFAULT 0,
+            tombstone_floor INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS cover_references (
+            path TEXT PRIMARY KEY,
+            refs INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS movies (
+            user_id TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            movie_name TEXT,
+            year_of_creation TEXT,
+            director TEXT,
+            category TEXT,
+            synopsis TEXT,
+            notation TEXT,
+            cover_image_path TEXT,
+            creation_date TEXT,
+            last_modified_date TEXT,
+            version INTEGER NOT NULL DEFAULT 0,
+            sort_name TEXT NOT NULL DEFAULT '',
+            extra TEXT,
+            PRIMARY KEY (user_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_movies_category ON movies (user_id, category);
+        CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (user_id, year_of_creation);
+        CREATE INDEX IF NOT EXISTS idx_movies_cover ON movies (user_id, cover_image_path);
+        CREATE INDEX IF NOT EXISTS idx_movies_sort_year ON movies (user_id, CAST(COALESCE(year_of_creation, 0) AS INTEGER), id);
+        CREATE INDEX IF NOT EXISTS idx_movies_sort_rating ON movies (user_id, CAST(COALESCE(notation, 0) AS INTEGER), id);
+        CREATE INDEX IF NOT EXISTS idx_movies_sort_created ON movies (user_id, COALESCE(creation_date, ''), id);
+        CREATE INDEX IF NOT EXISTS idx_movies_sort_modified ON movies (user_id, COALESCE(last_modified_date, ''), id);
+
+        CREATE TABLE IF NOT EXISTS movie_tombstones (
+            user_id TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (user_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_movie_tombstones_version ON movie_tombstones (user_id, version);
+
+        CREATE TABLE IF NOT EXISTS movie_stats (
+            user_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            value TEXT NOT NULL,
+            nb_movies INTEGER NOT NULL,
+            PRIMARY KEY (user_id, kind, value)
+        );
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS movies_search USING fts5(
+            user_key, movie_name, director, category, synopsis
+        );
+    """
+
+    def __init__(self, database_path: str = 'storage/videotheque.db'):
+        """
+            Initialise le dépôt et crée le schéma s'il n'existe pas.
+
+        Args:
+            database_path (str): Le chemin du fichier de la base de données.
+        """
+        self.database_path = database_path
+        self.local = threading.local()
+        self.title_indexes = {}
+        self.title_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(database_path) or '.', exist_ok=True)
+        self.connection().executescript(self.schema)
+        self.migrate_schema()
+
+    def migrate_schema(self):
+        """
+            Ajoute aux bases existantes les colonnes, l'index de recherche et les statistiques apparus depuis leur création.
+        """
+        connection = self.connection()
+        if 'version' not in {row['name'] for row in connection.execute('PRAGMA table_info(movies)')}:
+            # Base créée avant les versions : les films existants ont la version 0
+            with connection:
+                connection.execute('ALTER TABLE movies ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        # L'index ne peut pas faire partie du schéma : la colonne n'existe pas encore dans les anciennes bases
+        connection.execute('CREATE INDEX IF NOT EXISTS idx_movies_version ON movies (user_id, version)')
+        if 'sort_name' not in {row['name'] for row in connection.execute('PRAGMA table_info(movies)')}:
+            # Base triée par LOWER(movie_name) : la clé casefold est calculée une fois pour les films existants
+            with connection:
+                connection.execute("ALTER TABLE movies ADD COLUMN sort_name TEXT NOT NULL DEFAULT ''")
+                connection.execute('DROP INDEX IF EXISTS idx_movies_sort_name')
+                connection.executemany(
+                    'UPDATE movies SET sort_name = ? WHERE user_id = ? AND id = ?',
+                    [(self.sort_name(row['movie_name']), row['user_id'], row['id'])
+                     for row in connection.execute('SELECT user_id, id, movie_name FROM movies').fetchall()]
+                )
+        connection.execute('CREATE INDEX IF NOT EXISTS idx_movies_sort_name ON movies (user_id, sort_name, id)')
+        if connection.execute('SELECT 1 FROM movies LIMIT 1').fetchone() and not connection.execute('SELECT 1 FROM movie_stats LIMIT 1').fetchone():
+            # Base créée avant les statistiques : les films existants sont comptés une fois
+            with connection:
+                for row in connection.execute('SELECT * FROM movies').fetchall():
+                    self.count_movie(connection, row['user_id'], self.row_to_movie(row), 1)
+        if connection.execute('SELECT 1 FROM movies LIMIT 1').fetchone() and not connection.execute('SELECT 1 FROM movies_search LIMIT 1').fetchone():
+            # Base créée avant la recherche plein texte : les films existants sont indexés une fois
+            with connection:
+                for row in connection.execute('SELECT rowid, * FROM movies').fetchall():
+                    self.index_movie(connection, row['rowid'], row['user_id'], self.row_to_movie(row))
+
+        columns = {row['name'] for row in connection.execute('PRAGMA table_info(libraries)')}
+        if 'next_id' not in columns:
+            with connection:
+                connection.execute('ALTER TABLE libraries ADD COLUMN next_id INTEGER NOT NULL DEFAULT 1')
+                connection.execute("""
+                    UPDATE libraries SET next_id = (
+                        SELECT COALESCE(MAX(id), 0) + 1 FROM movies WHERE movies.user_id = libraries.user_id
+                    )
+                """)
+        for column in ('version', 'tombstone_floor'):
+            if column not in columns:
+                with connection:
+                    connection.execute(f'ALTER TABLE libraries ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+
+    def connection(self) -> sqlite3.Connection:
+        """
+            Retourne la connexion SQLite du thread courant (une connexion par thread).
+
+        Returns:
+            sqlite3.Connection: La connexion.
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            self.local.connection = connection
+        return connection
+
+    def row_to_movie(self, row: sqlite3.Row) -> dict:
+        """
+            Convertit une ligne de la table movies en dictionnaire de film.
+
+        Args:
+            row (sqlite3.Row): La ligne à convertir.
+
+        Returns:
+            dict: Le film.
+        """
+        movie = {column: row[column] for column in self.movie_columns}
+        if row['extra']:
+            movie.update(json.loads(row['extra']))
+        return movie
+
+    @staticmethod
+    def sort_name(movie_name: str) -> str:
+        """
+            Retourne la clé de tri par nom d'un titre, calculée comme MovieQuery.sort_keys["name"].
+
+        Args:
+            movie_name (str): Le titre du film.
+
+        Returns:
+            str: Le titre passé par str.casefold.
+        """
+        return MovieQuery.sort_keys["name"]({"movie_name": movie_name})
+
+    def split_fields(self, fields: dict) -> tuple:
+        """
+            Sépare les champs qui correspondent à une colonne de ceux stockés dans la colonne extra.
+
+        Args:
+            fields (dict): Les champs d'un film.
+
+        Returns:
+            tuple: (colonnes, champs supplémentaires).
+        """
+        columns = {key: value for key, value in fields.items() if key in self.movie_columns}
+        extra = {key: value for key, value in fields.items() if key not in self.movie_columns}
+        return columns, extra
+
+    def library_exists(self, user_id: str) -> bool:
+        """
+            Indique si la vidéothèque d'un utilisateur existe.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            bool: True si la vidéothèque existe.
+        """
+        row = self.connection().execute('SELECT 1 FROM libraries WHERE user_id = ?', (user_id,)).fetchone()
+        return row is not None
+
+    def require_library(self, user_id: str):
+        """
+            Lève FileNotFoundError si la vidéothèque de l'utilisateur n'existe pas,
+            comme le fait le dépôt JSON lorsque le fichier est absent.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+        """
+        if not self.library_exists(user_id):
+            raise FileNotFoundError(f"Vidéothèque introuvable : {user_id}")
+
+    #
+    #   Utilisateurs
+    #
+
+    def get_user(self, user_id: str) -> dict:
+        row = self.connection().execute(
+            'SELECT first_name, email, password FROM users WHERE id = ?', (user_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def find_user_by_email(self, email: str) -> tuple:
+        row = self.connection().execute(
+            'SELECT id, first_name, email, password FROM users WHERE email = ?', (email,)
+        ).fetchone()
+        if not row:
+            return None
+        user_data = dict(row)
+        return user_data.pop('id'), user_data
+
+    def add_user(self, user_id: str, user_data: dict) -> bool:
+        try:
+            with self.connection() as connection:
+                connection.execute(
+                    'INSERT INTO users (id, first_name, email, password) VALUES (?, ?, ?, ?)',
+                    (user_id, user_data['first_name'], user_data['email'], user_data['password'])
+                )
+        except sqlite3.IntegrityError:                      # Index unique des e-mails : inscription simultanée
+            return False
+        return True
+
+    def upsert_user(self, user_id: str, user_data: dict):
+        """
+            Enregistre un utilisateur ou remplace celui qui a le même identifiant (migration des fichiers JSON,
+            voir la commande migrate-storage). Un autre utilisateur qui aurait le même e-mail est remplacé.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            user_data (dict): Les données de l'utilisateur (first_name, email, password).
+        """
+        with self.connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO users (id, first_name, email, password) VALUES (?, ?, ?, ?)',
+                (user_id, user_data['first_name'], user_data['email'], user_data['password'])
+            )
+
+    def delete_user(self, user_id: str) -> bool:
+        with self.connection() as connection:
+            cursor = connection.execute('DELETE FROM users WHERE id = ?', (user_id,))
+        return cursor.rowcount > 0
+
+    def iter_users(self):
+        for row in self.connection().execute('SELECT id, first_name, email, password FROM users'):
+            user_data = dict(row)
+            yield user_data.pop('id'), user_data
+
+    #
+    #   Vidéothèques
+    #
+
+    def create_library(self, user_id: str, data: dict = None):
+        data = data or {"nb_movies": 0, "movies": []}
+        next_id = max(data.get("next_id") or 1, max((movie["id"] for movie in data["movies"]), default=0) + 1)
+        version = max(data.get("version") or 0, max((movie.get("version") or 0 for movie in data["movies"]), default=0))
+        with self.connection() as connection:
+            self.unindex_library(connection, user_id)
+            connection.execute('DELETE FROM movies WHERE user_id = ?', (user_id,))
+            connection.execute('DELETE FROM movie_stats WHERE user_id = ?', (user_id,))
+            connection.execute('DELETE FROM movie_tombstones WHERE user_id = ?', (user_id,))
+            connection.execute(
+                'INSERT OR REPLACE INTO libraries (user_id, nb_movies, next_id, version, tombstone_floor) VALUES (?, ?, ?, ?, ?)',
+                (user_id, len(data["movies"]), next_id, version, version)
+            )
+            for movie in data["movies"]:
+                self.insert_movie(connection, user_id, movie)
+        with self.title_lock:
+            self.title_indexes.pop(user_id, None)               # Reconstruit à la prochaine recherche
+
+    def insert_movie(self, connection: sqlite3.Connection, user_id: str, movie: dict):
+        """
+            Insère (ou remplace) un film dans la table movies, dans l'index de recherche et dans les statistiques.
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            movie (dict): Le film à insérer.
+        """
+        columns, extra = self.split_fields(movie)
+        names = ['user_id', *columns.keys(), 'sort_name', 'extra']
+        values = [user_id, *columns.values(), self.sort_name(movie.get("movie_name")),
+                  json.dumps(extra, ensure_ascii=False) if extra else None]
+        previous = connection.execute('SELECT * FROM movies WHERE user_id = ? AND id = ?', (user_id, movie["id"])).fetchone()
+        if previous is not None:
+            # Film remplacé : son ancienne ligne est retirée de l'index et des statistiques
+            self.unindex_movie(connection, user_id, movie["id"])
+            self.count_movie(connection, user_id, self.row_to_movie(previous), -1)
+        cursor = connection.execute(
+            f"INSERT OR REPLACE INTO movies ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+            values
+        )
+        self.index_movie(connection, cursor.lastrowid, user_id, movie)
+        self.count_movie(connection, user_id, movie, 1)
+
+    def delete_library(self, user_id: str):
+        with self.connection() as connection:
+            self.unindex_library(connection, user_id)
+            connection.execute('DELETE FROM movies WHERE user_id = ?', (user_id,))
+            connection.execute('DELETE FROM movie_stats WHERE user_id = ?', (user_id,))
+            connection.execute('DELETE FROM movie_tombstones WHERE user_id = ?', (user_id,))
+            connection.execute('DELETE FROM libraries WHERE user_id = ?', (user_id,))
+        with self.title_lock:
+            self.title_indexes.pop(user_id, None)
+
+    def load_library(self, user_id: str) -> dict:
+        connection = self.connection()
+        library = connection.execute(
+            'SELECT nb_movies, next_id FROM libraries WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if library is None:
+            raise FileNotFoundError(f"Vidéothèque introuvable : {user_id}")
+        rows = connection.execute('SELECT * FROM movies WHERE user_id = ? ORDER BY rowid', (user_id,))
+        return {
+            "nb_movies": library['nb_movies'],
+            "next_id": library['next_id'],
+            "movies": [self.row_to_movie(row) for row in rows]
+        }
+
+    def list_movies(self, user_id: str, query: MovieQuery) -> dict:
+        connection = self.connection()
+        library = connection.execute('SELECT nb_movies FROM libraries WHERE user_id = ?', (user_id,)).fetchone()
+        if library is None:
+            raise FileNotFoundError(f"Vidéothèque introuvable : {user_id}")
+
+        key = self.sort_expressions[query.sort]
+        direction = "DESC" if query.descending else "ASC"
+        conditions = ["user_id = ?"]
+        parameters = [user_id]
+        if query.after:
+            # Reprise après le curseur : (clé, id) strictement après le dernier film de la page précédente
+            comparison = "<" if query.descending else ">"
+            conditions.append(f"({key} {comparison} ? OR ({key} = ? AND id {comparison} ?))")
+            parameters += [query.after[0], query.after[0], query.after[1]]
+        if query.category is not None:
+            conditions.append("category = ?")
+            parameters.append(query.category)
+        if query.year_min is not None:
+            conditions.append("CAST(COALESCE(year_of_creation, 0) AS INTEGER) >= ?")
+            parameters.append(query.year_min)
+        if query.year_max is not None:
+            conditions.append("CAST(COALESCE(year_of_creation, 0) AS INTEGER) <= ?")
+            parameters.append(query.year_max)
+        if query.min_rating is not None:
+            conditions.append("CAST(COALESCE(notation, 0) AS INTEGER) >= ?")
+            parameters.append(query.min_rating)
+
+        sql = f"SELECT *, {key} AS sort_key FROM movies WHERE {' AND '.join(conditions)} ORDER BY {key} {direction}, id {direction}"
+        if query.limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(query.limit + 1)              # Un film de plus indique qu'il reste une page
+
+        rows = connection.execute(sql, parameters).fetchall()
+        next_cursor = None
+        if query.limit is not None and len(rows) > query.limit:
+            rows = rows[:query.limit]
+            next_cursor = query.encode_cursor(rows[-1]['sort_key'], rows[-1]['id'])   # Clé calculée par SQLite, comparée par SQLite
+        page = {"movies": [self.row_to_movie(row) for row in rows], "next_cursor": next_cursor}
+        return {"nb_movies": library['nb_movies'], **page}
+
+    def get_movie(self, user_id: str, movie_id: int) -> dict:
+        self.require_library(user_id)
+        row = self.connection().execute(
+            'SELECT * FROM movies WHERE user_id = ? AND id = ?', (user_id, movie_id)
+        ).fetchone()
+        return self.row_to_movie(row) if row else None
+
+    def find_movie_by_cover(self, user_id: str, cover_image_path: str, movie_name: str = None) -> dict:
+        self.require_library(user_id)
+        rows = self.connection().execute(
+            'SELECT * FROM movies WHERE user_id = ? AND cover_image_path = ? ORDER BY id', (user_id, cover_image_path)
+        )
+        title = None if movie_name is None else TitleIndex.normalize(movie_name)
+        for row in rows:                                    # Index idx_movies_cover : seuls les films de cette image
+            if title is None or TitleIndex.normalize(row['movie_name']) == title:
+                return self.row_to_movie(row)
+        return None
+
+    def add_movie(self, user_id: str, movie: dict) -> int:
+        self.require_library(user_id)
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')       # Verrouille la base pour l'attribution de l'ID
+            movie_id = self.append_movie(connection, user_id, movie)
+        self.refresh_titles(user_id, [movie_id])
+        return movie_id
+
+    def update_movie(self, user_id: str, movie_id: int, fields: dict) -> dict:
+        self.require_library(user_id)
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')       # Le film est relu sous le verrou : pas d'écriture concurrente perdue
+            movie = self.write_movie_fields(connection, user_id, movie_id, fields)
+        if "movie_name" in fields:
+            self.refresh_titles(user_id, [movie_id])
+        return movie
+
+    def delete_movie(self, user_id: str, movie_id: int) -> dict:
+        self.require_library(user_id)
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')       # Le film est relu sous le verrou, comme pour une modification
+            movie = self.remove_movie(connection, user_id, movie_id)
+        self.refresh_titles(user_id, [movie_id])
+        return movie
+
+    def apply_batch(self, user_id: str, operations: list) -> list:
+        self.require_library(user_id)
+        results = []
+        with self.connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')       # Tout le lot est appliqué dans une seule transaction
+            for operation in operations:
+                if operation["op"] == "add":
+                    results.append(self.append_movie(connection, user_id, operation["movie"]))
+                elif operation["op"] == "edit":
+                    results.append(self.write_movie_fields(connection, user_id, operation["id"], operation["fields"]))
+                else:
+                    results.append(self.remove_movie(connection, user_id, operation["id"]))
+        self.refresh_titles(user_id, [
+            result if operation["op"] == "add" else operation["id"]
+            for operation, result in zip(operations, results)
+            if operation["op"] != "edit" or "movie_name" in operation["fields"]
+        ])
+        return results
+
+    def append_movie(self, connection: sqlite3.Connection, user_id: str, movie: dict) -> int:
+        """
+            Attribue le prochain identifiant à un film et l'insère (transaction en cours).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            movie (dict): Le film à ajouter.
+
+        Returns:
+            int: L'identifiant attribué.
+        """
+        movie["id"] = connection.execute(
+            'SELECT next_id FROM libraries WHERE user_id = ?', (user_id,)
+        ).fetchone()['next_id']
+        movie["version"] = self.bump(connection, user_id)
+        connection.execute('DELETE FROM movie_tombstones WHERE user_id = ? AND id = ?', (user_id, movie["id"]))
+        self.insert_movie(connection, user_id, movie)
+        connection.execute(
+            'UPDATE libraries SET nb_movies = nb_movies + 1, next_id = next_id + 1 WHERE user_id = ?', (user_id,)
+        )
+        return movie["id"]
+
+    def write_movie_fields(self, connection: sqlite3.Connection, user_id: str, movie_id: int, fields: dict) -> dict:
+        """
+            Modifie les champs d'un film (transaction ouverte par BEGIN IMMEDIATE : le film est relu sous le verrou d'écriture).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_id (int): L'identifiant du film.
+            fields (dict): Les champs à modifier.
+
+        Returns:
+            dict: Le film modifié ou None s'il n'existe pas.
+        """
+        movie = self.get_movie(user_id, movie_id)
+        if not movie:
+            return None
+        previous_keys = LibraryStats.keys(movie)
+        movie.update(fields)
+        movie["version"] = self.bump(connection, user_id)
+        columns, extra = self.split_fields(movie)
+        columns.pop('id')
+        assignments = ', '.join(f"{column} = ?" for column in columns)
+        connection.execute(
+            f"UPDATE movies SET {assignments}, sort_name = ?, extra = ? WHERE user_id = ? AND id = ?",
+            [*columns.values(), self.sort_name(movie.get("movie_name")),
+             json.dumps(extra, ensure_ascii=False) if extra else None, user_id, movie_id]
+        )
+        if any(field in SearchIndex.fields for field in fields):
+            rowid = self.unindex_movie(connection, user_id, movie_id)
+            self.index_movie(connection, rowid, user_id, movie)
+        if LibraryStats.keys(movie) != previous_keys:
+            self.count_keys(connection, user_id, previous_keys, -1)
+            self.count_keys(connection, user_id, LibraryStats.keys(movie), 1)
+        return movie
+
+    def remove_movie(self, connection: sqlite3.Connection, user_id: str, movie_id: int) -> dict:
+        """
+            Supprime un film (transaction ouverte par BEGIN IMMEDIATE : le film est relu sous le verrou d'écriture).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_id (int): L'identifiant du film.
+
+        Returns:
+            dict: Le film supprimé ou None s'il n'existe pas.
+        """
+        movie = self.get_movie(user_id, movie_id)
+        if not movie:
+            return None
+        self.unindex_movie(connection, user_id, movie_id)
+        self.count_movie(connection, user_id, movie, -1)
+        connection.execute('DELETE FROM movies WHERE user_id = ? AND id = ?', (user_id, movie_id))
+        connection.execute('UPDATE libraries SET nb_movies = nb_movies - 1 WHERE user_id = ?', (user_id,))
+        connection.execute(
+            'INSERT OR REPLACE INTO movie_tombstones (user_id, id, version) VALUES (?, ?, ?)',
+            (user_id, movie_id, self.bump(connection, user_id))
+        )
+        # Au-delà de Library.max_tombstones, les plus anciennes pierres tombales sont oubliées
+        forgotten = connection.execute(
+            'SELECT version FROM movie_tombstones WHERE user_id = ? ORDER BY version DESC LIMIT 1 OFFSET ?',
+            (user_id, Library.max_tombstones)
+        ).fetchone()
+        if forgotten is not None:
+            connection.execute(
+                'DELETE FROM movie_tombstones WHERE user_id = ? AND version <= ?', (user_id, forgotten['version'])
+            )
+            connection.execute(
+                'UPDATE libraries SET tombstone_floor = MAX(tombstone_floor, ?) WHERE user_id = ?',
+                (forgotten['version'], user_id)
+            )
+        return movie
+
+    #
+    #   Synchronisation par différences
+    #
+
+    def bump(self, connection: sqlite3.Connection, user_id: str) -> int:
+        """
+            Incrémente la version d'une vidéothèque (transaction en cours).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            int: La nouvelle version.
+        """
+        connection.execute('UPDATE libraries SET version = version + 1 WHERE user_id = ?', (user_id,))
+        return connection.execute('SELECT version FROM libraries WHERE user_id = ?', (user_id,)).fetchone()['version']
+
+    def library_version(self, user_id: str) -> int:
+        library = self.connection().execute('SELECT version FROM libraries WHERE user_id = ?', (user_id,)).fetchone()
+        if library is None:
+            raise FileNotFoundError(f"Vidéothèque introuvable : {user_id}")
+        return library['version']
+
+    def movie_changes(self, user_id: str, since: int) -> dict:
+        connection = self.connection()
+        with connection:
+            connection.execute('BEGIN')                     # Lecture cohérente de la version et des films
+            library = connection.execute(
+                'SELECT version, tombstone_floor FROM libraries WHERE user_id = ?', (user_id,)
+            ).fetchone()
+            if library is None:
+                raise FileNotFoundError(f"Vidéothèque introuvable : {user_id}")
+            version = library['version']
+            if since <= 0 or since < library['tombstone_floor'] or since > version:
+                rows = connection.execute('SELECT * FROM movies WHERE user_id = ? ORDER BY rowid', (user_id,))
+                return {"version": version, "reset": True, "movies": [self.row_to_movie(row) for row in rows], "deleted": []}
+
+            rows = connection.execute(
+                'SELECT * FROM movies WHERE user_id = ? AND version > ? ORDER BY version', (user_id, since)
+            )
+            movies = [self.row_to_movie(row) for row in rows]
+            deleted = [row['id'] for row in connection.execute(
+                'SELECT id FROM movie_tombstones WHERE user_id = ? AND version > ? ORDER BY version', (user_id, since)
+            )]
+        return {"version": version, "reset": False, "movies": movies, "deleted": deleted}
+
+    #
+    #   Recherche plein texte
+    #
+
+    @staticmethod
+    def user_key(user_id: str) -> str:
+        """
+            Retourne le mot qui désigne un utilisateur dans la colonne user_key de movies_search.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            str: L'identifiant réduit à ses lettres et chiffres, préfixé par « u ».
+        """
+        return "u" + "".join(character for character in user_id.lower() if character.isalnum())
+
+    def index_movie(self, connection: sqlite3.Connection, rowid: int, user_id: str, movie: dict):
+        """
+            Ajoute un film à l'index de recherche (transaction en cours).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            rowid (int): Le rowid du film dans la table movies.
+            user_id (str): L'identifiant de l'utilisateur.
+            movie (dict): Le film.
+        """
+        texts = [" ".join(SearchIndex.tokenize(movie.get(field))) for field in SearchIndex.fields]
+        connection.execute(
+            'INSERT INTO movies_search (rowid, user_key, movie_name, director, category, synopsis) VALUES (?, ?, ?, ?, ?, ?)',
+            (rowid, self.user_key(user_id), *texts)
+        )
+
+    def unindex_movie(self, connection: sqlite3.Connection, user_id: str, movie_id: int) -> int:
+        """
+            Retire un film de l'index de recherche (transaction en cours).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_id (int): L'identifiant du film.
+
+        Returns:
+            int: Le rowid du film dans la table movies, ou None si le film n'existe pas.
+        """
+        row = connection.execute('SELECT rowid FROM movies WHERE user_id = ? AND id = ?', (user_id, movie_id)).fetchone()
+        if row is None:
+            return None
+        connection.execute('DELETE FROM movies_search WHERE rowid = ?', (row['rowid'],))
+        return row['rowid']
+
+    def unindex_library(self, connection: sqlite3.Connection, user_id: str):
+        """
+            Retire tous les films d'un utilisateur de l'index de recherche (transaction en cours).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+        """
+        connection.execute('DELETE FROM movies_search WHERE rowid IN (SELECT rowid FROM movies WHERE user_id = ?)', (user_id,))
+
+    def search_movies(self, user_id: str, text: str, limit: int = 20, category: str = None) -> list:
+        self.require_library(user_id)
+        words = list(dict.fromkeys(SearchIndex.tokenize(text)))
+        if not words:
+            return []
+
+        # Tous les mots doivent figurer dans l'un des champs indexés, pour les films de l'utilisateur
+        columns = " ".join(SearchIndex.fields)
+        words = " AND ".join(f'"{word}"' for word in words)
+        expression = f"user_key : {self.user_key(user_id)} AND {{{columns}}} : ({words})"
+        sql = f"""
+            SELECT movies.*, -bm25(movies_search, {self.search_weights}) AS score
+            FROM movies_search JOIN movies ON movies.rowid = movies_search.rowid
+            WHERE movies_search MATCH ?
+        """
+        parameters = [expression]
+        if category is not None:
+            sql += " AND movies.category = ?"
+            parameters.append(category)
+        sql += " ORDER BY score DESC LIMIT ?"
+        parameters.append(limit)
+
+        return [(self.row_to_movie(row), row['score']) for row in self.connection().execute(sql, parameters)]
+
+    #
+    #   Statistiques
+    #
+
+    def count_movie(self, connection: sqlite3.Connection, user_id: str, movie: dict, delta: int):
+        """
+            Compte (delta = 1) ou décompte (delta = -1) un film dans les statistiques (transaction en cours).
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            movie (dict): Le film.
+            delta (int): 1 ou -1.
+        """
+        self.count_keys(connection, user_id, LibraryStats.keys(movie), delta)
+
+    def count_keys(self, connection: sqlite3.Connection, user_id: str, keys: list, delta: int):
+        """
+            Modifie les compteurs des statistiques (transaction en cours). Un compteur qui tombe à zéro est supprimé.
+
+        Args:
+            connection (sqlite3.Connection): La connexion (transaction en cours).
+            user_id (str): L'identifiant de l'utilisateur.
+            keys (list): Les couples (type, valeur) à modifier (voir LibraryStats.keys).
+            delta (int): 1 ou -1.
+        """
+        for kind, value in keys:
+            connection.execute(
+                """
+                    INSERT INTO movie_stats (user_id, kind, value, nb_movies) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (user_id, kind, value) DO UPDATE SET nb_movies = nb_movies + excluded.nb_movies
+                """,
+                (user_id, kind, value, delta)
+            )
+        if delta < 0:
+            connection.execute('DELETE FROM movie_stats WHERE user_id = ? AND nb_movies <= 0', (user_id,))
+
+    def movie_stats(self, user_id: str) -> dict:
+        connection = self.connection()
+        library = connection.execute('SELECT nb_movies FROM libraries WHERE user_id = ?', (user_id,)).fetchone()
+        if library is None:
+            raise FileNotFoundError(f"Vidéothèque introuvable : {user_id}")
+        rows = connection.execute('SELECT kind, value, nb_movies FROM movie_stats WHERE user_id = ?', (user_id,))
+        return LibraryStats.from_counts(library['nb_movies'], rows).to_dict()
+
+    #
+    #   Titres approchants
+    #
+
+    def title_index(self, user_id: str) -> TitleIndex:
+        """
+            Retourne l'index des titres d'un utilisateur, construit au premier appel (verrou title_lock pris).
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+
+        Returns:
+            TitleIndex: L'index.
+        """
+        index = self.title_indexes.get(user_id)
+        if index is None:
+            rows = self.connection().execute('SELECT id, movie_name FROM movies WHERE user_id = ?', (user_id,))
+            index = self.title_indexes[user_id] = TitleIndex({"id": row['id'], "movie_name": row['movie_name']} for row in rows)
+        return index
+
+    def refresh_titles(self, user_id: str, movie_ids: list):
+        """
+            Met à jour l'index des titres d'un utilisateur (s'il est construit) après une écriture validée,
+            en relisant dans la base le titre des films concernés.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            movie_ids (list): Les identifiants des films ajoutés, renommés ou supprimés.
+        """
+        movie_ids = [movie_id for movie_id in movie_ids if movie_id is not None]
+        if not movie_ids:
+            return
+        with self.title_lock:                                   # Un index en cours de construction lit déjà cette écriture
+            index = self.title_indexes.get(user_id)
+            if index is None:
+                return
+            rows = self.connection().execute(
+                f"SELECT id, movie_name FROM movies WHERE user_id = ? AND id IN ({', '.join('?' for _ in movie_ids)})",
+                (user_id, *movie_ids)
+            )
+            titles = {row['id']: row['movie_name'] for row in rows}
+            for movie_id in movie_ids:
+                if movie_id in titles:
+                    index.add(movie_id, titles[movie_id])
+                else:
+                    index.remove(movie_id)
+
+    def similar_titles(self, user_id: str, title: str, limit: int = 5, threshold: float = None, exclude: int = None) -> list:
+        self.require_library(user_id)
+        with self.title_lock:
+            matches = self.title_index(user_id).similar(title, limit, threshold, exclude)
+        movies = {movie["id"]: movie for movie in (self.get_movie(user_id, movie_id) for movie_id, _ in matches) if movie}
+        return [(movies[movie_id], similarity) for movie_id, similarity in matches if movie_id in movies]
+
+    #
+    #   Références des images de couverture
+    #
+
+    def acquire_cover(self, image_path: str) -> int:
+        with self.connection() as connection:
+            return connection.execute(
+                'INSERT INTO cover_references (path, refs) VALUES (?, 1) '
+                'ON CONFLICT (path) DO UPDATE SET refs = refs + 1 RETURNING refs', (image_path,)
+            ).fetchone()['refs']
+
+    def release_cover(self, image_path: str) -> int:
+        with self.connection() as connection:
+            row = connection.execute(
+                'UPDATE cover_references SET refs = refs - 1 WHERE path = ? RETURNING refs', (image_path,)
+            ).fetchone()
+            if row is None:
+                return 0
+            if row['refs'] <= 0:
+                connection.execute('DELETE FROM cover_references WHERE path = ?', (image_path,))
+            return max(row['refs'], 0)
+
+    def set_cover_references(self, counts: dict):
+        with self.connection() as connection:
+            connection.execute('DELETE FROM cover_references')
+            connection.executemany(
+                'INSERT INTO cover_references (path, refs) VALUES (?, ?)',
+                [(path, count) for path, count in counts.items() if count > 0]
+            )
@@ -1,6 +1,9 @@
 from __future__ import annotations  # Permet d'utiliser le nom de la classe en tant que type dans les annotations de type
 from flask import jsonify          
-import requests, datetime
+import requests, datetime, threading, math
+from concurrent.futures import ThreadPoolExecutor   # Pour la récupération simultanée des pages de résultats
+from requests.adapters import HTTPAdapter           # Pour le groupe de connexions réutilisées
+from src.classes.tmdb_cache import get_tmdb_cache   # Cache des réponses de l'API
 
 """
 |
@@ -13,6 +16,19 @@ class TheMovieDB:
     """
     Classe pour interagir avec l'API de TheMovieDB.
 
+    Toutes les instances partagent une même session HTTP (get_session), créée à la première requête :
+    les connexions TLS vers l'API sont gardées ouvertes (keep-alive) et réutilisées d'une requête à
+    l'autre, au lieu de payer à chaque appel la résolution DNS, la connexion TCP et la négociation TLS.
+    Chaque requête est bornée par un délai de connexion et un délai de lecture.
+
+    Les réponses de l'API sont gardées en cache (TmdbCache) pendant une durée propre à chaque endpoint
+    (cache_ttls) : les détails d'un film pendant des heures, les films en salle pendant quelques minutes.
+
+    Les recherches et les listes de films peuvent porter sur plusieurs pages de résultats (page_size films
+    par page, max_pages pages au plus) : les pages sont demandées en même temps par un groupe de threads
+    partagé (page_executor, pool_size threads), puis leurs films sont réunis dans l'ordre des pages, sans
+    doublons. La durée reste proche de celle d'une seule requête.
+
     Attributes:
         api_key (str): La clé d'API pour accéder à l'API de TheMovieDB.
         base_url (str): L'URL de base de l'API de TheMovieDB.
@@ -21,14 +37,30 @@ class TheMovieDB:
     Class Attributes:
         key_mapping (dict): Mapping des clés de données de l'API aux noms de clés souhaités.
         genre_id_to_name (dict): Mapping des IDs de genre aux noms de genre correspondants.
+        pool_size (int): Le nombre maximal de connexions gardées ouvertes vers l'API (TMDB_POOL_SIZE).
+        connect_timeout (float): Le délai de connexion à l'API, en secondes (TMDB_CONNECT_TIMEOUT).
+        read_timeout (float): Le délai d'attente de la réponse de l'API, en secondes (TMDB_READ_TIMEOUT).
+        session (requests.Session): La session partagée, créée à la première requête.
+        session_lock (threading.Lock): Le verrou de la création de la session.
+        cache_ttls (dict): La durée de validité (secondes) des réponses en cache, par préfixe d'endpoint.
+        default_cache_ttl (int): La durée de validité des réponses des autres endpoints.
+        page_size (int): Le nombre de films d'une page de résultats de l'API.
+        max_pages (int): Le nombre maximal de pages demandées pour une même recherche (TMDB_MAX_PAGES).
+        page_executor (ThreadPoolExecutor): Les threads qui demandent les pages, créés à la première recherche sur plusieurs pages.
 
     Methods:
+        get_session(): Retourne la session HTTP partagée par toutes les instances.
+        get_page_executor(): Retourne les threads partagés qui demandent les pages de résultats.
+        page_count(pages, max_results): Retourne le nombre de pages à demander.
+        cache_ttl(path): Retourne la durée de validité en cache de la réponse d'un endpoint.
+        fetch(path, params): Demande une réponse à l'API, sans passer par le cache.
         extract_movie_data(api_response): Extrait les données de films à partir d'une réponse de l'API.
         extract_movie_data_by_movie_id(api_response): Extrait les données d'un film à partir d'une réponse de l'API.
-        search_movie_by_name(movie_name): Recherche des films par nom.
-        get_movies_by_category(genre_names): Récupère des films par catégorie de genre.
-        get_movies_by_year(year): Récupère des films par année de sortie.
+        search_movie_by_name(movie_name, pages, max_results): Recherche des films par nom.
+        get_movies_by_category(genre_names, pages, max_results): Récupère des films par catégorie de genre.
+        get_movies_by_year(year, pages, max_results): Récupère des films par année de sortie.
         get_api_response(endpoint, params): Effectue une requête à l'API et renvoie la réponse.
+        get_api_pages(endpoint, params, pages, max_results): Demande plusieurs pages de résultats et les réunit.
 
     """
     
@@ -49,6 +81,24 @@ class TheMovieDB:
         'revenue': 'revenue'
     }
 
+    pool_size = 10
+    connect_timeout = 3.05
+    read_timeout = 10
+    session = None
+    session_lock = threading.Lock()
+
+    cache_ttls = {
+        "/movie/now_playing": 10 * 60,
+        "/movie/": 6 * 3600,
+        "/search/movie": 3600,
+        "/discover/movie": 30 * 60
+    }
+    default_cache_ttl = 15 * 60
+
+    page_size = 20
+    max_pages = 5
+    page_executor = None
+
     genre_id_to_name = {
         28: 'Action',
         12: 'Aventure',
@@ -88,10 +138,96 @@ class TheMovieDB:
     |   Méthodes de classe
     |
     """
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """
+            Retourne la session HTTP partagée par toutes les instances, créée au premier appel.
+            Son groupe de connexions (pool_size connexions au plus par hôte) est sûr entre threads :
+            un thread qui ne trouve pas de connexion libre en ouvre une, qui n'est pas conservée.
+
+        Returns:
+            requests.Session: La session.
+        """
+        if cls.session is None:
+            with cls.session_lock:
+                if cls.session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=cls.pool_size, pool_maxsize=cls.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls.session = session
+        return cls.session
+
+    @classmethod
+    def get_page_executor(cls) -> ThreadPoolExecutor:
+        """
+            Retourne les threads partagés qui demandent les pages de résultats, créés au premier appel
+            (autant que de connexions gardées ouvertes vers l'API).
+
+        Returns:
+            ThreadPoolExecutor: Les threads.
+        """
+        if cls.page_executor is None:
+            with cls.session_lock:
+                if cls.page_executor is None:
+                    cls.page_executor = ThreadPoolExecutor(max_workers=cls.pool_size, thread_name_prefix="tmdb-pages")
+        return cls.page_executor
+
+    @classmethod
+    def page_count(cls, pages: int = 1, max_results: int = None) -> int:
+        """
+            Retourne le nombre de pages à demander : pages, ou assez de pages pour max_results films,
+            entre 1 et max_pages.
+
+        Args:
+            pages (int): Le nombre de pages souhaité.
+            max_results (int): Le nombre de films souhaité, None pour s'en tenir à pages.
+
+        Returns:
+            int: Le nombre de pages.
+        """
+        if max_results is not None:
+            pages = max(pages, math.ceil(max_results / cls.page_size))
+        return min(max(pages, 1), cls.max_pages)
+
+    @classmethod
+    def cache_ttl(cls, path: str) -> int:
+        """
+            Retourne la durée de validité en cache de la réponse d'un endpoint (préfixe le plus long de cache_ttls).
+
+        Args:
+            path (str): Le chemin de l'endpoint (identifiant du film compris).
+
+        Returns:
+            int: La durée en secondes.
+        """
+        prefixes = [prefix for prefix in cls.cache_ttls if path.startswith(prefix)]
+        return cls.cache_ttls[max(prefixes, key=len)] if prefixes else cls.default_cache_ttl
+
+    def fetch(self, path: str, params: dict) -> dict:
+        """
+            Demande une réponse à l'API, sans passer par le cache.
+
+        Args:
+            path (str): Le chemin de l'endpoint (identifiant du film compris).
+            params (dict): Les paramètres de la requête, clé d'API et langue comprises.
+
+        Returns:
+            dict: La réponse de l'API.
+
+        Raises:
+            requests.exceptions.RequestException: Si la requête échoue (délai dépassé, erreur HTTP).
+        """
+        response = self.get_session().get(self.base_url + path, params=params, timeout=(self.connect_timeout, self.read_timeout))
+        response.raise_for_status()                                                                 # Lève une exception si la requête échoue (par exemple, une erreur HTTP)
+        return response.json()
     
     def get_api_response(self, endpoint, params):
         """
-                Effectue une requête à l'API et renvoie la réponse.
+                Effectue une requête à l'API et renvoie la réponse, depuis le cache si la même requête
+                a été faite récemment (les réponses en erreur ne sont pas gardées). Les requêtes identiques
+                simultanées partagent un seul appel à l'API et son résultat, erreur comprise.
 
             Args:
                 endpoint (str): L'endpoint de l'API à interroger.
@@ -104,11 +240,12 @@ class TheMovieDB:
             params["api_key"] = self.api_key
             params["language"] = self.language
             if "id" in params:                                                                      # Si l'utilisateur souhaite avoir les détails sur un film je dois modifier un peu la requête pour quelle soit correcte.
-                response = requests.get(self.base_url + endpoint + params["id"], params=params)
+                path = endpoint + params["id"]
             else:                                                                                   # Pour les autres requête ça sera la meme chose
-                response = requests.get(self.base_url + endpoint, params=params)
-            response.raise_for_status()                                                             # Lève une exception si la requête échoue (par exemple, une erreur HTTP)
-            return response.json()
+                path = endpoint
+            cache = get_tmdb_cache()
+            key = cache.make_key(path, params)
+            return cache.get_or_fetch(key, self.cache_ttl(path), lambda: self.fetch(path, dict(params)))
         except requests.exceptions.RequestException as e:
             print(f"Erreur de requête : {e}")
             response = {
@@ -116,7 +253,44 @@ class TheMovieDB:
                 "message": "Erreur serveur distant"
             }
             return response
-        
+
+    def get_api_pages(self, endpoint, params, pages=1, max_results=None):
+        """
+            Demande en même temps les pages 1 à N d'une recherche (voir page_count) et réunit leurs films
+            dans l'ordre des pages, sans doublons (un film peut changer de page entre deux requêtes).
+            Une page en erreur est ignorée, sauf la première dont l'erreur est renvoyée.
+
+        Args:
+            endpoint (str): L'endpoint de l'API à interroger (/search/movie, /discover/movie...).
+            params (dict): Les paramètres de requête, sans le numéro de page.
+            pages (int): Le nombre de pages souhaité.
+            max_results (int): Le nombre maximal de films, None pour garder tous les films des pages.
+
+        Returns:
+            dict: La réponse de la première page, dont results contient les films de toutes les pages.
+        """
+        pages = self.page_count(pages, max_results)
+        if pages == 1 and max_results is None:
+            return self.get_api_response(endpoint, params)
+
+        executor = self.get_page_executor()
+        futures = [executor.submit(self.get_api_response, endpoint, dict(params, page=page)) for page in range(1, pages + 1)]
+        responses = [future.result() for future in futures]
+        first = responses[0]
+        if 'results' not in first:
+            return first
+
+        results = []
+        seen = set()
+        for response in responses:
+            for movie_data in response.get('results', []):
+                if movie_data.get('id') not in seen:
+                    seen.add(movie_data.get('id'))
+                    results.append(movie_data)
+        if max_results is not None:
+            results = results[:max_results]
+        return dict(first, results=results)
+
     def extract_movie_data(self, api_response):
         """
         Extrait les données de films à partir d'une réponse de l'API.
@@ -200,19 +374,21 @@ class TheMovieDB:
     |
     """
     
-    def search_movie_by_name(self, movie_name):
+    def search_movie_by_name(self, movie_name, pages=1, max_results=None):
         """
             Recherche des films par nom.
 
             Args:
                 movie_name (str): Le nom du film à rechercher.
+                pages (int): Le nombre de pages de résultats à demander (page_size films par page).
+                max_results (int): Le nombre maximal de films, None pour garder tous les films des pages.
 
             Returns:
                 list: Une liste de dictionnaires contenant les données des films correspondants à la recherche.
         """
         
         try:
-            api_response = self.get_api_response("/search/movie", {"query": movie_name})
+            api_response = self.get_api_pages("/search/movie", {"query": movie_name}, pages, max_results)
             if api_response:
                 response = {
                     "status": "200",
@@ -234,12 +410,14 @@ class TheMovieDB:
             }
             return jsonify(response), 500
 
-    def get_movies_by_category(self, genre_names):
+    def get_movies_by_category(self, genre_names, pages=1, max_results=None):
         """
             Récupère les films correspondant aux catégories de genre spécifiées.
 
             Args:
                 genre_names (list[str]): Liste des noms de genres de films en minuscules à rechercher.
+                pages (int): Le nombre de pages de résultats à demander (page_size films par page).
+                max_results (int): Le nombre maximal de films, None pour garder tous les films des pages.
 
             Returns:
                 dict: Un dictionnaire contenant les résultats de la requête.
@@ -254,7 +432,7 @@ class TheMovieDB:
             if genre_ids:
                 genre_ids_str = ','.join(map(str, genre_ids)) # Convertir la liste des identifiants en une chaîne séparée par des virgules
                 params = {"with_genres": genre_ids_str}
-                api_response = self.get_api_response("/discover/movie", params)
+                api_response = self.get_api_pages("/discover/movie", params, pages, max_results)
 
                 if api_response:
                     response = {
@@ -284,12 +462,14 @@ class TheMovieDB:
             }
             return jsonify(response), 500
 
-    def get_movies_by_year(self, year):
+    def get_movies_by_year(self, year, pages=1, max_results=None):
         """
             Récupère des films par année de sortie.
 
             Args:
                 year (int): L'année de sortie des films à récupérer.
+                pages (int): Le nombre de pages de résultats à demander (page_size films par page).
+                max_results (int): Le nombre maximal de films, None pour garder tous les films des pages.
 
             Returns:
                 list: Une liste de dictionnaires contenant les données des films correspondants à l'année donnée.
@@ -297,7 +477,7 @@ class TheMovieDB:
         
         try:
             params = {"primary_release_year": year}
-            api_response = self.get_api_response("/discover/movie", params)
+            api_response = self.get_api_pages("/discover/movie", params, pages, max_results)
             if api_response:
                 response = {
                     "status": "200",
@@ -360,12 +540,13 @@ class TheMovieDB:
             }
             return jsonify(response), 500
 
-    def get_movies_horror(self):
+    def get_movies_horror(self, pages=1, max_results=None):
         """
             Retourne les films d'horreur français.
 
             Cette fonction effectue une requête à une API pour obtenir les derniers films français
-            de genre d'horreur (avec le code de genre 27).
+            de genre d'horreur (avec le code de genre 27), sur une ou plusieurs pages de résultats
+            (voir get_api_pages).
 
             Réponses HTTP possibles :
             - 200 OK : Renvoie une liste de films d'horreur français.
@@ -382,7 +563,7 @@ class TheMovieDB:
         endPoint = "/discover/movie"
             
         try:
-            api_response = self.get_api_response(endPoint, params)    
+            api_response = self.get_api_pages(endPoint, params, pages, max_results)
 
             if api_response:
                 extracted_data = self.extract_movie_data(api_response)
@@ -409,9 +590,9 @@ class TheMovieDB:
             }
             return jsonify(response), 500
       
-    def get_movies_by_popularity(self):
+    def get_movies_by_popularity(self, pages=1, max_results=None):
         """
-            Retournes les films les plus populaires
+            Retournes les films les plus populaires, sur une ou plusieurs pages de résultats (voir get_api_pages).
         """
         
         params = {
@@ -421,7 +602,7 @@ class TheMovieDB:
         endPoint = "/discover/movie"
             
         try:
-            api_response = self.get_api_response(endPoint, params)    
+            api_response = self.get_api_pages(endPoint, params, pages, max_results)
     
             if api_response:
                 extracted_data = self.extract_movie_data(api_response)
@@ -448,9 +629,9 @@ class TheMovieDB:
             }
             return jsonify(response), 500
         
-    def get_movies_now_playing(self):
+    def get_movies_now_playing(self, pages=1, max_results=None):
         """
-            Récupère les films actuellement en salle.
+            Récupère les films actuellement en salle, sur une ou plusieurs pages de résultats (voir get_api_pages).
         """
         
         # Calcul des dates pour la plage souhaitée
@@ -472,7 +653,7 @@ class TheMovieDB:
             
         try:
             # Appel à la méthode de classe pour effectuer la requête API avec le paramètre indiqué plus haut
-            api_response = self.get_api_response(endPoint, params)    
+            api_response = self.get_api_pages(endPoint, params, pages, max_results)
     
             if api_response:
                 extracted_data = self.extract_movie_data(api_response)
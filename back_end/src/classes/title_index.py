@@ -0,0 +1,216 @@
+import heapq                                        # Pour la sélection des titres les plus proches.
+import math                                         # Pour le nombre minimal de trigrammes communs.
+from array import array                             # Pour des listes d'identifiants compactes.
+from collections import Counter                     # Pour le comptage des trigrammes communs.
+from src.classes.search_index import SearchIndex    # Pour la normalisation des titres (accents, casse)
+
+"""
+|
+|   Index de trigrammes des titres d'une vidéothèque (titres mal orthographiés, doublons probables).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class TitleIndex:
+    """
+    Index de trigrammes des titres des films, pour retrouver un titre malgré une faute de frappe.
+
+    Un titre est découpé en mots normalisés (SearchIndex.tokenize, mots vides compris) ; chaque mot,
+    entouré de blancs, est découpé en suites de trois caractères (« amelie » : «   a», «  am», « ame »,
+    « mel », « eli », « lie », « ie  »). La similarité de deux titres est la part de leurs trigrammes
+    qui sont communs (indice de Jaccard) : 1.0 pour deux titres identiques aux accents et à la casse près.
+
+    Une seule faute de frappe (lettre changée, ajoutée ou retirée, deux lettres voisines inversées) peut
+    faire perdre jusqu'à quatre trigrammes : « matirx » ne partage que 3 des 11 trigrammes de « matrix »
+    et leur indice de Jaccard reste sous le seuil. Deux titres qui ne diffèrent que d'une faute de frappe
+    ont donc pour similarité au moins 1 - 1 / longueur (0.83 pour « matirx » et « matrix »).
+
+    Un titre dont la similarité atteint le seuil partage au moins seuil × n des n trigrammes du titre
+    recherché, ou n - 4 s'il n'en diffère que d'une faute de frappe. Une recherche compte les apparitions
+    de chaque film dans les listes des trigrammes recherchés (comptage fait en C par Counter) et ne
+    compare en détail que les films qui atteignent ce minimum.
+
+    Les listes sont des tableaux d'entiers (8 octets par entrée), complétés à chaque ajout de titre.
+    Un titre retiré ou remplacé y laisse des entrées périmées, ignorées par la
+    recherche (le candidat est comparé à son titre actuel) ; les listes sont reconstruites lorsque les
+    entrées périmées deviennent plus nombreuses que les autres.
+
+    Attributes:
+        titles (dict): Par film, son titre normalisé.
+        postings (dict): Par trigramme, les films dont le titre le contient (array).
+        entries (int): Le nombre d'entrées des listes.
+        stale (int): Le nombre d'entrées périmées.
+
+    Class Attributes:
+        threshold (float): La similarité minimale d'une suggestion (« Vouliez-vous dire… »).
+        duplicate_threshold (float): La similarité à partir de laquelle un film ajouté est signalé comme doublon probable.
+
+    Methods:
+        normalize(title): Retourne le titre normalisé.
+        trigrams(normalized): Retourne les trigrammes d'un titre normalisé.
+        one_typo(first, second): Indique si deux titres ne diffèrent que d'une faute de frappe.
+        add(movie_id, title): Ajoute (ou remplace) le titre d'un film.
+        remove(movie_id): Retire le titre d'un film.
+        compact(): Reconstruit les listes sans leurs entrées périmées.
+        similar(title, limit, threshold, exclude): Retourne les films dont le titre est le plus proche.
+    """
+
+    threshold = 0.3
+    duplicate_threshold = 0.6
+
+    def __init__(self, movies=()):
+        """
+            Initialise l'index.
+
+        Args:
+            movies (iterable): Les films à indexer.
+        """
+        self.titles = {}
+        self.postings = {}
+        self.entries = 0
+        self.stale = 0
+        for movie in movies:
+            self.add(movie["id"], movie.get("movie_name"))
+
+    @staticmethod
+    def normalize(title) -> str:
+        """
+            Retourne le titre normalisé : mots sans accents, en minuscules, séparés par un blanc.
+
+        Args:
+            title (str): Le titre.
+
+        Returns:
+            str: Le titre normalisé.
+        """
+        return " ".join(SearchIndex.tokenize(title, keep_stopwords=True))
+
+    @staticmethod
+    def trigrams(normalized: str) -> set:
+        """
+            Retourne les trigrammes d'un titre normalisé.
+
+        Args:
+            normalized (str): Le titre normalisé.
+
+        Returns:
+            set: Les trigrammes.
+        """
+        trigrams = set()
+        for word in normalized.split():
+            padded = f"  {word} "
+            trigrams.update(padded[i:i + 3] for i in range(len(word) + 1))
+        return trigrams
+
+    @staticmethod
+    def one_typo(first: str, second: str) -> bool:
+        """
+            Indique si deux titres différents ne diffèrent que d'une faute de frappe : une lettre changée,
+            ajoutée ou retirée, ou deux lettres voisines inversées.
+
+        Args:
+            first (str): Le premier titre normalisé.
+            second (str): Le second titre normalisé.
+
+        Returns:
+            bool: True si une seule faute de frappe les sépare.
+        """
+        if len(first) > len(second):
+            first, second = second, first
+        if len(second) - len(first) > 1 or first == second:
+            return False
+        start = 0
+        while start < len(first) and first[start] == second[start]:
+            start += 1
+        if len(first) < len(second):
+            return first[start:] == second[start + 1:]                          # Lettre ajoutée
+        if first[start + 1:] == second[start + 1:]:
+            return True                                                         # Lettre changée
+        return (first[start] == second[start + 1] and first[start + 1] == second[start]
+                and first[start + 2:] == second[start + 2:])                    # Lettres voisines inversées
+
+    def add(self, movie_id: int, title: str):
+        """
+            Ajoute le titre d'un film à l'index (ou remplace son ancien titre).
+
+        Args:
+            movie_id (int): L'identifiant du film.
+            title (str): Le titre.
+        """
+        normalized = self.normalize(title)
+        if self.titles.get(movie_id) == normalized:
+            return
+        self.remove(movie_id)
+        trigrams = self.trigrams(normalized)
+        self.titles[movie_id] = normalized
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                posting = self.postings[trigram] = array('q')
+            posting.append(movie_id)
+        self.entries += len(trigrams)
+
+    def remove(self, movie_id: int):
+        """
+            Retire le titre d'un film de l'index.
+
+        Args:
+            movie_id (int): L'identifiant du film.
+        """
+        normalized = self.titles.pop(movie_id, None)
+        if normalized is None:
+            return
+        self.stale += len(self.trigrams(normalized))
+        if self.stale * 2 > self.entries:
+            self.compact()
+
+    def compact(self):
+        """
+            Reconstruit les listes sans leurs entrées périmées.
+        """
+        titles = self.titles
+        self.titles, self.postings, self.entries, self.stale = {}, {}, 0, 0
+        for movie_id, normalized in titles.items():
+            self.add(movie_id, normalized)
+
+    def similar(self, title: str, limit: int = 5, threshold: float = None, exclude: int = None) -> list:
+        """
+            Retourne les films dont le titre est le plus proche d'un titre.
+
+        Args:
+            title (str): Le titre recherché.
+            limit (int): Le nombre maximal de films.
+            threshold (float): La similarité minimale (TitleIndex.threshold par défaut).
+            exclude (int): L'identifiant d'un film à ignorer (le film lui-même), None pour aucun.
+
+        Returns:
+            list: Les couples (identifiant, similarité), du plus proche au moins proche.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        searched = self.normalize(title)
+        trigrams = self.trigrams(searched)
+        if not trigrams:
+            return []
+
+        counts = Counter()
+        for trigram in trigrams:
+            counts.update(self.postings.get(trigram, ()))
+        minimum = max(1, min(math.ceil(threshold * len(trigrams) - 1e-9), len(trigrams) - 4))
+
+        results = []
+        for movie_id, count in counts.items():
+            # Le compte peut inclure des entrées périmées : il ne sert qu'à écarter les films trop éloignés
+            if count < minimum or movie_id == exclude:
+                continue
+            normalized = self.titles.get(movie_id)
+            if normalized is None:
+                continue                                    # Film retiré
+            other = self.trigrams(normalized)
+            common = len(trigrams & other)
+            similarity = common / (len(trigrams) + len(other) - common)
+            if similarity < threshold and self.one_typo(searched, normalized):
+                similarity = 1 - 1 / max(len(searched), len(normalized))
+            if similarity >= threshold:
+                results.append((movie_id, similarity))
+        return heapq.nlargest(limit, results, key=lambda item: item[1])
@@ -0,0 +1,404 @@
+import json                                         # Pour la taille estimée des réponses.
+import threading                                    # Pour le verrou du cache.
+import time                                         # Pour la durée de validité des réponses.
+from collections import OrderedDict                 # Pour l'ordre LRU des réponses.
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor  # Pour les appels en cours et le rafraîchissement en arrière-plan.
+from concurrent.futures import TimeoutError as WaitTimeout  # Pour l'attente bornée d'un appel en cours.
+from urllib.parse import urlencode                  # Pour la clé d'une requête.
+from src.classes.tmdb_store import TmdbStore        # Stockage persistant des réponses (facultatif)
+
+"""
+|
+|   Cache LRU en mémoire des réponses de l'API TheMovieDB (durée de validité, stale-while-revalidate),
+|   adossé au stockage persistant TmdbStore.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class TmdbCache:
+    """
+    Cache LRU borné des réponses de l'API TheMovieDB, partagé par toutes les requêtes du processus.
+
+    Les réponses sont indexées par requête normalisée (voir make_key) et gardées pendant une durée
+    propre à l'endpoint (voir TheMovieDB.cache_ttls). Une réponse expirée depuis moins de stale_seconds
+    est encore renvoyée immédiatement, pendant qu'un thread du cache la redemande à l'API
+    (stale-while-revalidate) : une requête fréquente n'attend jamais l'API. Au-delà, la requête attend
+    la nouvelle réponse. La taille d'une entrée est la longueur de la réponse en JSON, le total est
+    borné par max_bytes.
+
+    Avec un stockage persistant (store, voir TmdbStore), chaque réponse reçue de l'API y est aussi
+    enregistrée, et une réponse absente de la mémoire y est cherchée avant d'appeler l'API : les
+    réponses survivent aux redémarrages et sont partagées entre les processus d'une même machine.
+    warm() précharge en mémoire les réponses enregistrées au démarrage.
+
+    Les requêtes identiques simultanées absentes du cache ne font qu'un seul appel à l'API : la première
+    l'effectue, les suivantes attendent son résultat (inflight) et reçoivent la même réponse, ou la même
+    exception si l'appel échoue. Une erreur n'est pas gardée : la requête suivante rappelle l'API.
+    L'attente est bornée par wait_seconds ; si l'appel partagé est interrompu (KeyboardInterrupt, délai
+    du serveur WSGI) ou dépasse ce délai, chaque requête en attente appelle l'API elle-même.
+
+    Attributes:
+        max_bytes (int): La taille cumulée maximale des réponses (TMDB_CACHE_MAX_BYTES).
+        stale_seconds (float): La durée pendant laquelle une réponse expirée est encore renvoyée (TMDB_CACHE_STALE_SECONDS).
+        wait_seconds (float): La durée maximale d'attente d'un appel identique en cours (TMDB_CACHE_WAIT_SECONDS).
+        entries (OrderedDict): Par clé, la réponse (données, taille, fin de validité, fin de renvoi).
+        refreshing (set): Les clés en cours de rafraîchissement.
+        inflight (dict): Par clé, le résultat (Future) de l'appel à l'API en cours pour une réponse absente du cache.
+        executor (ThreadPoolExecutor): Les threads de rafraîchissement, créés au premier rafraîchissement.
+        store (TmdbStore): Le stockage persistant des réponses, None pour n'en garder qu'en mémoire.
+        lock (threading.Lock): Le verrou des entrées et des compteurs.
+
+    Class Attributes:
+        workers (int): Le nombre de threads de rafraîchissement.
+
+    Methods:
+        make_key(path, params): Retourne la clé d'une requête.
+        get_or_fetch(key, ttl, fetch): Retourne la réponse en cache ou la demande à l'API.
+        put(key, data, ttl): Ajoute ou remplace une réponse.
+        warm(): Précharge en mémoire les réponses du stockage persistant.
+        stats(): Retourne les compteurs du cache.
+    """
+
+    workers = 2
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, stale_seconds: float = 3600, store: TmdbStore = None, wait_seconds: float = 15):
+        """
+            Initialise un cache vide.
+
+        Args:
+            max_bytes (int): La taille cumulée maximale des réponses, 0 pour désactiver le cache.
+            stale_seconds (float): La durée pendant laquelle une réponse expirée est encore renvoyée.
+            store (TmdbStore): Le stockage persistant des réponses, None pour n'en garder qu'en mémoire.
+            wait_seconds (float): La durée maximale d'attente d'un appel identique en cours.
+        """
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.wait_seconds = wait_seconds
+        self.entries = OrderedDict()    # clé -> (données, taille, fin de validité, fin de renvoi)
+        self.total_bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.store_hits = 0
+        self.coalesced = 0
+        self.refreshing = set()
+        self.inflight = {}
+        self.executor = None
+        self.store = store
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(path: str, params: dict) -> str:
+        """
+            Retourne la clé d'une requête : le chemin et les paramètres triés, sans la clé d'API, les
+            valeurs sans majuscules ni blancs superflus (« Amélie  » et « amélie » sont la même recherche).
+
+        Args:
+            path (str): Le chemin de l'endpoint (identifiant du film compris).
+            params (dict): Les paramètres de la requête, langue comprise.
+
+        Returns:
+            str: La clé.
+        """
+        normalized = {
+            name: " ".join(str(value).split()).casefold()
+            for name, value in params.items() if name != "api_key"
+        }
+        return f"{path}?{urlencode(sorted(normalized.items()))}"
+
+    def get_or_fetch(self, key: str, ttl: float, fetch):
+        """
+            Retourne la réponse en cache, ou la demande à l'API (fetch) et l'ajoute au cache.
+            Une réponse expirée depuis moins de stale_seconds est renvoyée et rafraîchie en arrière-plan.
+            Si la même requête est déjà en cours, son résultat est attendu (au plus wait_seconds) au lieu
+            de rappeler l'API.
+
+        Args:
+            key (str): La clé de la requête (voir make_key).
+            ttl (float): La durée de validité de la réponse, en secondes.
+            fetch (callable): La fonction qui demande la réponse à l'API (elle lève une exception en cas d'échec).
+
+        Returns:
+            dict: La réponse, qui ne doit pas être modifiée par l'appelant.
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now < entry[3]:
+                self.entries.move_to_end(key)
+                if now < entry[2]:
+                    self.hits += 1
+                    return entry[0]
+                self.stale_hits += 1
+                self._schedule_refresh(key, ttl, fetch)
+                return entry[0]
+
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            try:
+                return flight.result(timeout=self.wait_seconds)     # Lève l'exception de l'appel partagé
+            except (CancelledError, WaitTimeout):
+                return self._load_or_fetch(key, ttl, fetch)         # Appel partagé interrompu ou trop long
+
+        try:
+            data = self._load_or_fetch(key, ttl, fetch)
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(data)
+            return data
+        finally:
+            if not flight.done():
+                flight.cancel()                                     # Interrompu (BaseException) : les requêtes en attente ne restent pas bloquées
+            with self.lock:
+                del self.inflight[key]
+
+    def _load_or_fetch(self, key: str, ttl: float, fetch) -> dict:
+        """
+            Cherche une réponse absente de la mémoire dans le stockage persistant, ou la demande à l'API
+            et l'ajoute au cache.
+
+        Args:
+            key (str): La clé de la requête.
+            ttl (float): La durée de validité de la réponse.
+            fetch (callable): La fonction qui demande la réponse à l'API.
+
+        Returns:
+            dict: La réponse.
+        """
+        stored = self._load_stored(key)
+        if stored is not None:
+            data, expired = stored
+            with self.lock:
+                self.store_hits += 1
+                if expired:
+                    self._schedule_refresh(key, ttl, fetch)
+            return data
+
+        with self.lock:
+            self.misses += 1
+        data = fetch()
+        self.put(key, data, ttl)
+        return data
+
+    def _schedule_refresh(self, key: str, ttl: float, fetch):
+        """
+            Planifie le rafraîchissement d'une réponse expirée, sauf s'il est déjà en cours (le verrou doit être tenu).
+
+        Args:
+            key (str): La clé de la requête.
+            ttl (float): La durée de validité de la réponse.
+            fetch (callable): La fonction qui demande la réponse à l'API.
+        """
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tmdb-cache")
+        self.executor.submit(self._refresh, key, ttl, fetch)
+
+    def _load_stored(self, key: str, fresh_only: bool = False) -> tuple:
+        """
+            Cherche une réponse dans le stockage persistant et la remet en mémoire avec ses dates d'origine.
+            Une erreur du stockage est affichée et traitée comme une absence.
+
+        Args:
+            key (str): La clé de la requête.
+            fresh_only (bool): True pour ignorer une réponse expirée.
+
+        Returns:
+            tuple: (données, expirée), ou None si le stockage n'a pas de réponse utilisable.
+        """
+        if self.store is None:
+            return None
+        try:
+            stored = self.store.get(key)
+        except Exception as e:
+            print(f"Erreur de lecture du cache persistant TheMovieDB : {e}")
+            return None
+        if stored is None:
+            return None
+        data, expires_at, stale_until = stored
+        expired = expires_at <= time.time()
+        if expired and fresh_only:
+            return None
+        offset = time.monotonic() - time.time()                 # Dates absolues du stockage -> horloge monotone
+        with self.lock:
+            self._insert(key, data, expires_at + offset, stale_until + offset)
+        return data, expired
+
+    def _refresh(self, key: str, ttl: float, fetch):
+        """
+            Redemande une réponse expirée à l'API (tâche des threads du cache). En cas d'échec, l'ancienne
+            réponse reste renvoyée jusqu'à la fin de stale_seconds.
+
+        Args:
+            key (str): La clé de la requête.
+            ttl (float): La durée de validité de la réponse.
+            fetch (callable): La fonction qui demande la réponse à l'API.
+        """
+        try:
+            # Un autre processus a peut-être déjà rafraîchi la réponse dans le stockage persistant
+            if self._load_stored(key, fresh_only=True) is None:
+                self.put(key, fetch(), ttl)
+            with self.lock:
+                self.refreshes += 1
+        except Exception as e:
+            print(f"Erreur lors du rafraîchissement de la réponse TheMovieDB {key} : {e}")
+            with self.lock:
+                self.refresh_errors += 1
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def put(self, key: str, data: dict, ttl: float):
+        """
+            Ajoute ou remplace une réponse en mémoire et dans le stockage persistant.
+
+        Args:
+            key (str): La clé de la requête.
+            data (dict): La réponse de l'API.
+            ttl (float): La durée de validité de la réponse, en secondes.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self._insert(key, data, now + ttl, now + ttl + self.stale_seconds)
+
+        if self.store is not None:
+            try:
+                now = time.time()
+                self.store.put(key, data, now + ttl, now + ttl + self.stale_seconds)
+            except Exception as e:
+                print(f"Erreur d'écriture du cache persistant TheMovieDB : {e}")
+
+    def warm(self) -> int:
+        """
+            Précharge en mémoire les réponses du stockage persistant qui peuvent encore être renvoyées,
+            dans la limite de max_bytes (appelé au démarrage).
+
+        Returns:
+            int: Le nombre de réponses préchargées.
+        """
+        if self.store is None:
+            return 0
+        offset = time.monotonic() - time.time()
+        nb_responses = 0
+        for key, data, expires_at, stale_until in self.store.recent(self.max_bytes):
+            with self.lock:
+                self._insert(key, data, expires_at + offset, stale_until + offset)
+            nb_responses += 1
+        return nb_responses
+
+    def _insert(self, key: str, data: dict, fresh_until: float, stale_until: float):
+        """
+            Ajoute ou remplace une réponse en mémoire, puis retire les réponses les moins récemment utilisées
+            tant que la taille maximale est dépassée (le verrou doit être tenu).
+
+        Args:
+            key (str): La clé de la requête.
+            data (dict): La réponse de l'API.
+            fresh_until (float): La fin de validité (horloge monotone).
+            stale_until (float): La fin de renvoi pendant le rafraîchissement (horloge monotone).
+        """
+        size = len(json.dumps(data, ensure_ascii=False))
+        self._remove(key)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (data, size, fresh_until, stale_until)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+            Retourne les compteurs du cache.
+
+        Returns:
+            dict: Les compteurs (hits, stale_hits, store_hits, misses, coalesced, evictions, refreshes, refresh_errors),
+                  l'occupation du cache et celle du stockage persistant (store, None sans stockage).
+        """
+        store = self.store.stats() if self.store is not None else None
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "store": store
+            }
+
+    def _remove(self, key: str):
+        """
+            Retire une entrée (le verrou doit être tenu).
+
+        Args:
+            key (str): La clé de la requête.
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+"""
+|
+|   Cache partagé
+|
+"""
+
+_tmdb_cache = None
+
+def configure_tmdb_cache(config) -> TmdbCache:
+    """
+        Configure le cache global des réponses TheMovieDB à partir de la configuration Flask.
+
+    Args:
+        config (dict): La configuration de l'application (TMDB_CACHE_MAX_BYTES, TMDB_CACHE_STALE_SECONDS,
+                       TMDB_CACHE_WAIT_SECONDS, TMDB_STORE_PATH, TMDB_STORE_MAX_BYTES, TMDB_STORE_SWEEP_SECONDS).
+
+    Returns:
+        TmdbCache: Le cache configuré.
+    """
+    global _tmdb_cache
+    store = None
+    if config.get('TMDB_STORE_PATH'):
+        store = TmdbStore(
+            config['TMDB_STORE_PATH'],
+            config.get('TMDB_STORE_MAX_BYTES', 64 * 1024 * 1024),
+            config.get('TMDB_STORE_SWEEP_SECONDS', 300)
+        )
+    _tmdb_cache = TmdbCache(
+        config.get('TMDB_CACHE_MAX_BYTES', 16 * 1024 * 1024),
+        config.get('TMDB_CACHE_STALE_SECONDS', 3600),
+        store,
+        config.get('TMDB_CACHE_WAIT_SECONDS', 15)
+    )
+    return _tmdb_cache
+
+def get_tmdb_cache() -> TmdbCache:
+    """
+        Retourne le cache global des réponses TheMovieDB (16 Mo si aucun cache n'a été configuré).
+
+    Returns:
+        TmdbCache: Le cache des réponses.
+    """
+    global _tmdb_cache
+    if _tmdb_cache is None:
+        _tmdb_cache = TmdbCache()
+    return _tmdb_cache
@@ -0,0 +1,194 @@
+import json                                         # Pour la sérialisation des réponses.
+import os                                           # Pour les opérations sur le système de fichiers.
+import sqlite3                                      # Pour la base de données des réponses.
+import threading                                    # Pour une connexion par thread et le nettoyage en arrière-plan.
+import time                                         # Pour l'expiration des réponses.
+import zlib                                         # Pour la compression des réponses.
+
+"""
+|
+|   Stockage persistant des réponses de l'API TheMovieDB (storage/tmdb_cache.db par défaut).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class TmdbStore:
+    """
+    Conserve sur disque, dans une base SQLite, les réponses de l'API TheMovieDB gardées par TmdbCache :
+    après un redémarrage, les réponses encore valides sont relues au lieu d'être redemandées à l'API.
+
+    Les réponses sont enregistrées en JSON compressé (zlib) avec leur date d'expiration et la date
+    jusqu'à laquelle elles peuvent encore être renvoyées pendant leur rafraîchissement (dates absolues,
+    communes à tous les processus). La base est en mode WAL : plusieurs processus (workers gunicorn) d'une
+    même machine la lisent et l'écrivent en même temps.
+
+    La taille de la base est bornée : au plus une fois toutes les sweep_seconds, une écriture déclenche en
+    arrière-plan la suppression des réponses qui ne peuvent plus être renvoyées, puis, tant que la taille
+    compressée dépasse max_bytes, des réponses qui expirent le plus tôt.
+
+    Attributes:
+        database_path (str): Le chemin du fichier de la base.
+        max_bytes (int): La taille compressée maximale des réponses (TMDB_STORE_MAX_BYTES).
+        sweep_seconds (float): L'intervalle minimal entre deux nettoyages (TMDB_STORE_SWEEP_SECONDS).
+        last_sweep (float): La date (horloge monotone) du dernier nettoyage.
+        lock (threading.Lock): Le verrou de last_sweep.
+
+    Methods:
+        connection(): Retourne la connexion SQLite du thread courant.
+        get(key): Retourne une réponse enregistrée.
+        put(key, data, expires_at, stale_until): Enregistre une réponse.
+        recent(max_bytes): Parcourt les réponses encore utilisables, les plus récentes d'abord.
+        sweep(): Supprime les réponses périmées et les plus anciennes au-delà de max_bytes.
+        stats(): Retourne l'occupation de la base.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            stale_until REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_stale_until ON responses (stale_until);
+        CREATE INDEX IF NOT EXISTS idx_responses_expires_at ON responses (expires_at);
+    """
+
+    def __init__(self, database_path: str = 'storage/tmdb_cache.db', max_bytes: int = 64 * 1024 * 1024, sweep_seconds: float = 300):
+        """
+            Initialise le stockage et crée la base si elle n'existe pas.
+
+        Args:
+            database_path (str): Le chemin du fichier de la base.
+            max_bytes (int): La taille compressée maximale des réponses.
+            sweep_seconds (float): L'intervalle minimal entre deux nettoyages.
+        """
+        self.database_path = database_path
+        self.max_bytes = max_bytes
+        self.sweep_seconds = sweep_seconds
+        self.last_sweep = time.monotonic()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(database_path) or '.', exist_ok=True)
+        self.connection().executescript(self.schema)
+
+    def connection(self) -> sqlite3.Connection:
+        """
+            Retourne la connexion SQLite du thread courant (une connexion par thread).
+
+        Returns:
+            sqlite3.Connection: La connexion.
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self.local.connection = connection
+        return connection
+
+    def get(self, key: str) -> tuple:
+        """
+            Retourne une réponse enregistrée, si elle peut encore être renvoyée.
+
+        Args:
+            key (str): La clé de la requête (voir TmdbCache.make_key).
+
+        Returns:
+            tuple: (données, date d'expiration, date de fin de renvoi), ou None.
+        """
+        row = self.connection().execute(
+            'SELECT data, expires_at, stale_until FROM responses WHERE key = ? AND stale_until > ?', (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0])), row[1], row[2]
+
+    def put(self, key: str, data: dict, expires_at: float, stale_until: float):
+        """
+            Enregistre (ou remplace) une réponse, puis lance un nettoyage si le précédent date de plus de sweep_seconds secondes.
+
+        Args:
+            key (str): La clé de la requête.
+            data (dict): La réponse de l'API.
+            expires_at (float): La date d'expiration (time.time()).
+            stale_until (float): La date jusqu'à laquelle la réponse peut être renvoyée pendant son rafraîchissement.
+        """
+        compressed = zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        with self.connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO responses (key, data, size, expires_at, stale_until) VALUES (?, ?, ?, ?, ?)',
+                (key, compressed, len(compressed), expires_at, stale_until)
+            )
+
+        with self.lock:
+            if time.monotonic() - self.last_sweep < self.sweep_seconds:
+                return
+            self.last_sweep = time.monotonic()
+        threading.Thread(target=self._sweep_quietly, name="tmdb-store-sweep", daemon=True).start()
+
+    def recent(self, max_bytes: int):
+        """
+            Parcourt les réponses qui peuvent encore être renvoyées, de celle qui expire le plus tard à celle
+            qui expire le plus tôt, jusqu'à max_bytes octets de JSON (préchargement du cache en mémoire).
+
+        Args:
+            max_bytes (int): La taille maximale (JSON non compressé) des réponses parcourues.
+
+        Yields:
+            tuple: (clé, données, date d'expiration, date de fin de renvoi).
+        """
+        total = 0
+        rows = self.connection().execute(
+            'SELECT key, data, expires_at, stale_until FROM responses WHERE stale_until > ? ORDER BY expires_at DESC',
+            (time.time(),)
+        )
+        for key, compressed, expires_at, stale_until in rows:
+            text = zlib.decompress(compressed).decode('utf-8')
+            total += len(text)
+            if total > max_bytes:
+                break
+            yield key, json.loads(text), expires_at, stale_until
+
+    def sweep(self) -> int:
+        """
+            Supprime les réponses qui ne peuvent plus être renvoyées puis, tant que la taille compressée
+            dépasse max_bytes, les réponses qui expirent le plus tôt.
+
+        Returns:
+            int: Le nombre de réponses supprimées.
+        """
+        with self.connection() as connection:
+            removed = connection.execute('DELETE FROM responses WHERE stale_until <= ?', (time.time(),)).rowcount
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                # Les réponses qui expirent le plus tôt sont retirées jusqu'à couvrir l'excédent
+                cutoff = connection.execute("""
+                    SELECT expires_at FROM (
+                        SELECT expires_at, SUM(size) OVER (ORDER BY expires_at, key) AS cumulated FROM responses
+                    ) WHERE cumulated >= ? ORDER BY expires_at LIMIT 1
+                """, (excess,)).fetchone()
+                if cutoff is not None:
+                    removed += connection.execute('DELETE FROM responses WHERE expires_at <= ?', (cutoff[0],)).rowcount
+        return removed
+
+    def _sweep_quietly(self):
+        """
+            Nettoie la base (tâche du thread de nettoyage) ; une erreur est affichée sans interrompre le serveur.
+        """
+        try:
+            self.sweep()
+        except sqlite3.Error as e:
+            print(f"Erreur lors du nettoyage du cache TheMovieDB {self.database_path} : {e}")
+
+    def stats(self) -> dict:
+        """
+            Retourne l'occupation de la base.
+
+        Returns:
+            dict: Le nombre de réponses (entries), leur taille compressée (bytes) et la taille maximale (max_bytes).
+        """
+        entries, total = self.connection().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes}
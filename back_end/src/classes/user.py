@@ -1,41 +1,40 @@
-import json # Pour la manipulation de fichiers JSON.
-import os   # Pour les opérations sur le système de fichiers.
-import uuid # Pour la génération d'identifiants uniques.
+import threading    # Pour la suppression des images en arrière-plan.
+import uuid         # Pour la génération d'identifiants uniques.
+
+from src.classes.repository import get_repository # Pour l'accès au dépôt de données configuré.
+from src.classes.movie import Movie                 # Pour la suppression des images de couverture.
 
 class User:
     """
         Cette classe représente un utilisateur dans un système d'authentification.
 
-        Attributes:
-            users_file_path (str): Le chemin vers le fichier JSON qui stocke les données des utilisateurs.
+        Les données sont lues et écrites au travers du dépôt configuré (fichiers JSON ou SQLite).
 
         Methods:
             __init__(self, email, password, first_name):
                 Initialise un nouvel utilisateur avec un identifiant unique, une adresse e-mail,
                 un mot de passe et un prénom.
 
-            load_users(cls):
-                Charge les utilisateurs à partir du fichier JSON et retourne un dictionnaire d'utilisateurs.
-
             email_exists(cls, email):
                 Vérifie si l'adresse e-mail existe déjà parmi les utilisateurs enregistrés.
 
             save_user(cls, new_user):
-                Enregistre un nouvel utilisateur dans le fichier JSON des utilisateurs.
+                Enregistre un nouvel utilisateur dans le dépôt des utilisateurs.
 
             register(cls, email, password, first_name):
-                Enregistre un nouvel utilisateur avec un identifiant unique, crée un fichier JSON associé
-                et initialise les données de films pour cet utilisateur.
+                Enregistre un nouvel utilisateur avec un identifiant unique et initialise
+                sa vidéothèque.
 
             authenticate_user(email, password):
-                Authentifie un utilisateur en vérifiant l'e-mail et le mot de passe dans le fichier JSON des utilisateurs.
+                Authentifie un utilisateur en vérifiant l'e-mail et le mot de passe dans le dépôt des utilisateurs.
 
             delete_user(user_id):
                 Supprime un utilisateur de la base de données des utilisateurs, ses données de films associées
                 et les images de couverture associées à ses films.
+
+            delete_covers(cover_paths):
+                Supprime les images de couverture d'un utilisateur supprimé (tâche d'arrière-plan).
     """
-    
-    users_file_path = 'storage/users.json'
 
     def __init__(self, email, password, first_name):
         """
@@ -52,26 +51,6 @@ class User:
         self.email = email
         self.password = password
 
-    @classmethod
-    def load_users(cls):
-        """
-            Charge les utilisateurs à partir du fichier JSON et retourne un dictionnaire d'utilisateurs.
-
-            Returns:
-                dict: Un dictionnaire contenant les données des utilisateurs.
-        """
-        
-        if not os.path.exists(cls.users_file_path):
-            with open(cls.users_file_path, 'w') as file:
-                json.dump({}, file)  # Initialise le fichier avec un objet JSON vide
-            return {}
-
-        with open(cls.users_file_path, 'r') as file:
-            try:
-                return json.load(file)
-            except json.JSONDecodeError:
-                return {}  # Retourne un objet vide si le fichier JSON est mal formaté
-
     @classmethod
     def email_exists(cls, email):
         """
@@ -84,32 +63,31 @@ class User:
                 bool: True si l'adresse e-mail existe déjà, False sinon.
         """
         
-        users = cls.load_users()
-        return any(user['email'] == email for user in users.values())
+        return get_repository().email_exists(email)
 
     @classmethod
     def save_user(cls, new_user):
         """
-            Enregistre un nouvel utilisateur dans le fichier JSON des utilisateurs.
+            Enregistre un nouvel utilisateur dans le dépôt des utilisateurs.
 
             Args:
                 new_user (User): L'objet utilisateur à enregistrer.
+
+            Returns:
+                bool: True si l'utilisateur a été enregistré, False si son e-mail est déjà utilisé.
         """
         
-        users = cls.load_users()
-        users[new_user.id] = {
+        return get_repository().add_user(new_user.id, {
             'first_name': new_user.first_name,
             'email': new_user.email,
             'password': new_user.password  # Le mot de passe en clair.
-        }
-        with open(cls.users_file_path, 'w') as file:
-            json.dump(users, file, indent=4)
+        })
 
     @classmethod
     def register(cls, email, password, first_name):
         """
-            Enregistre un nouvel utilisateur avec un identifiant unique, crée un fichier JSON associé
-            et initialise les données de films pour cet utilisateur.
+            Enregistre un nouvel utilisateur avec un identifiant unique et initialise
+            sa vidéothèque vide.
 
             Args:
                 email (str): L'adresse e-mail de l'utilisateur.
@@ -127,18 +105,20 @@ class User:
             }
 
         new_user = cls(email, password, first_name)
-        cls.save_user(new_user)
+        if not cls.save_user(new_user):                     # E-mail enregistré entre-temps par une autre inscription
+            return {
+                'status': 409,
+                'error': 'L\'email est déjà utilisé.'
+            }
 
-        # Crée un fichier JSON vide dans le répertoire "storage" avec le nom "movies_id.json"
+        # Crée la vidéothèque vide de l'utilisateur
         user_id = new_user.id
-        file_name = os.path.join("storage", f"movies_{user_id}.json")
         data = {
             "nb_movies": 0,
+            "next_id": 1,
             "movies": []
         }
-
-        with open(file_name, 'w') as json_file:
-            json.dump(data, json_file, indent=4)
+        get_repository().create_library(user_id, data)
 
         return {
             'status': 201,
@@ -150,7 +130,7 @@ class User:
     @staticmethod
     def authenticate_user(email, password):
         """
-            Authentifie un utilisateur en vérifiant l'e-mail et le mot de passe dans le fichier JSON des utilisateurs.
+            Authentifie un utilisateur en vérifiant l'e-mail et le mot de passe dans le dépôt des utilisateurs.
 
             Args:
                 email (str): L'adresse e-mail de l'utilisateur.
@@ -160,20 +140,17 @@ class User:
                 dict: Un dictionnaire de réponse indiquant le statut de l'authentification et les informations de l'utilisateur.
         """
         
-        users_file_path = 'storage/users.json'
-
-        if os.path.exists(users_file_path):
-            with open(users_file_path, 'r') as file:
-                users = json.load(file)
-                for user_id, user_data in users.items():
-                    if user_data['email'] == email and user_data['password'] == password:
-                        # Les identifiants sont corrects, retourner les informations de l'utilisateur
-                        return {
-                            'status': 200,
-                            'id': user_id,
-                            'first_name': user_data['first_name'],
-                            'email': user_data['email']
-                        }
+        found = get_repository().find_user_by_email(email)
+        if found:
+            user_id, user_data = found
+            if user_data['password'] == password:
+                # Les identifiants sont corrects, retourner les informations de l'utilisateur
+                return {
+                    'status': 200,
+                    'id': user_id,
+                    'first_name': user_data['first_name'],
+                    'email': user_data['email']
+                }
         return {
             'status': 401,
             'error': 'Identifiants incorrects'
@@ -192,30 +169,40 @@ class User:
                 bool: True si la suppression a réussi, False sinon.
         """
         
-        users_file_path = 'storage/users.json'
-
-        # Supprimer l'utilisateur de users.json
-        if os.path.exists(users_file_path):
-            with open(users_file_path, 'r') as file:
-                users = json.load(file)
-
-            if user_id in users:
-                del users[user_id]
-
-                with open(users_file_path, 'w') as file:
-                    json.dump(users, file, indent=4)
-            else:
-                return False
-
-        # Supprimer le fichier movies_user_id.json
-        movies_file_path = f'storage/movies_{user_id}.json'
-        if os.path.exists(movies_file_path):
-            os.remove(movies_file_path)
-
-        # Supprimer les images de couverture associées
-        covers_dir = 'storage/covers'
-        if os.path.isdir(covers_dir):
-            for filename in os.listdir(covers_dir):
-                if filename.endswith(f'_{user_id}.jpg') or filename.endswith(f'_{user_id}.png') or filename.endswith(f'_{user_id}.webp') or filename.endswith(f'_{user_id}.jpeg'):
-                    os.remove(os.path.join(covers_dir, filename))
+        repository = get_repository()
+
+        # Supprimer l'utilisateur du dépôt des utilisateurs
+        if not repository.delete_user(user_id):
+            return False
+
+        # La vidéothèque sert de manifeste des images de l'utilisateur : chaque film référence sa couverture
+        try:
+            cover_paths = [movie["cover_image_path"] for movie in repository.load_library(user_id)["movies"]]
+        except FileNotFoundError:
+            cover_paths = []
+
+        # Supprimer la vidéothèque de l'utilisateur
+        repository.delete_library(user_id)
+
+        # Les images sont supprimées en arrière-plan, la réponse n'attend pas les accès disque
+        threading.Thread(target=User.delete_covers, args=(cover_paths,), daemon=True).start()
         return True
+
+    @staticmethod
+    def delete_covers(cover_paths: list):
+        """
+            Supprime les images de couverture d'un utilisateur supprimé (tâche d'arrière-plan).
+            Une image adressée par contenu n'est supprimée que si plus aucun film ne l'utilise.
+
+            Le travail est proportionnel au nombre de films de l'utilisateur : le dossier des images
+            n'est pas parcouru.
+
+            Args:
+                cover_paths (list): Les chemins des images des films de l'utilisateur.
+        """
+        
+        for image_path in cover_paths:
+            try:
+                Movie.delete_cover(image_path)
+            except OSError as e:
+                print(f"Erreur lors de la suppression de l'image {image_path} : {e}")
@@ -0,0 +1,32 @@
+import os                                           # Pour les chemins des fichiers
+import sys                                          # Pour l'accès aux modules du back-end
+import pytest
+
+"""
+|
+|   Configuration des tests du back-end (python -m pytest depuis le dossier back_end).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """
+        Retourne l'application Flask, importée dans un dossier jetable : les chemins relatifs
+        (storage/...) des dépôts, des images et du cache TheMovieDB y sont créés.
+    """
+    root = tmp_path_factory.mktemp("back_end")
+    os.makedirs(root / "storage" / "covers")
+    previous = os.getcwd()
+    os.chdir(root)
+    from app import app
+    app.config['TESTING'] = True
+    yield app
+    os.chdir(previous)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
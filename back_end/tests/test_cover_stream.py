@@ -0,0 +1,55 @@
+import base64                                       # Pour la construction de l'image en base64
+import hashlib                                      # Pour l'empreinte attendue de l'image
+import tracemalloc                                  # Pour la mémoire allouée pendant le décodage
+import pytest
+from src.classes.base64_stream import Base64Stream  # Décodage base64 par morceaux
+from src.classes.cover_store import CoverStore      # Stockage des images adressé par contenu
+
+"""
+|
+|   Tests du décodage base64 par morceaux : contenu écrit et mémoire de travail bornée.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+PAYLOAD_BYTES = 50 * 1024 * 1024
+MAX_PEAK_BYTES = 2 * 1024 * 1024
+
+@pytest.fixture
+def covers_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(CoverStore, "root", str(tmp_path / "covers"))
+    return tmp_path
+
+@pytest.fixture(scope="module")
+def large_image():
+    block = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 16
+    image = (block * (PAYLOAD_BYTES // len(block) + 1))[:PAYLOAD_BYTES]
+    return image, hashlib.sha256(image).hexdigest()
+
+@pytest.mark.parametrize("as_text", [False, True], ids=["corps de la requête", "chaîne JSON"])
+def test_50mb_cover_is_decoded_with_bounded_memory(covers_root, large_image, as_text):
+    image, digest = large_image
+    header = "data:image/png;base64,"
+    encoded = header + base64.b64encode(image).decode('ascii')
+    payload = encoded if as_text else encoded.encode('ascii')
+    del encoded
+
+    tracemalloc.start()
+    try:
+        image_path = CoverStore.write_stream(Base64Stream(payload, len(header)), max_bytes=PAYLOAD_BYTES)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < MAX_PEAK_BYTES
+    assert image_path.endswith(f"{digest}.png")
+    with open(image_path, 'rb') as file:
+        assert hashlib.sha256(file.read()).hexdigest() == digest
+
+def test_whitespace_and_padding_are_handled():
+    image = bytes(range(256)) * 3 + b'xy'
+    encoded = base64.encodebytes(image)             # Retours à la ligne tous les 76 caractères
+    stream = Base64Stream(encoded)
+    decoded = b''.join(iter(lambda: stream.read(10), b''))
+    assert decoded == image
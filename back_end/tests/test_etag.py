@@ -0,0 +1,45 @@
+import uuid                                         # Pour des utilisateurs distincts
+import pytest
+from src.classes.repository import get_repository   # Dépôt configuré
+
+"""
+|
+|   Tests des ETag du back-end : réponse 304 sans corps tant que la vidéothèque n'a pas changé.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def new_library() -> str:
+    user_id = str(uuid.uuid4())
+    get_repository().create_library(user_id)
+    get_repository().add_movie(user_id, {"movie_name": "Matrix", "year_of_creation": "1999", "director": "X",
+                                         "category": "Action", "synopsis": "", "notation": "5",
+                                         "cover_image_path": "storage/covers/matrix.png"})
+    return user_id
+
+@pytest.mark.parametrize("url", ['/api/get-movies/gestions', '/api/movies/stats'])
+def test_not_modified_until_library_changes(client, url):
+    user_id = new_library()
+    first = client.get(url, json={"user_id": user_id})
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    unchanged = client.get(url, json={"user_id": user_id}, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+    assert unchanged.headers["ETag"] == etag
+
+    get_repository().update_movie(user_id, 1, {"notation": "3"})
+    changed = client.get(url, json={"user_id": user_id}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+def test_etag_depends_on_user_and_query(client):
+    user_id, other_id = new_library(), new_library()
+    etags = {
+        client.get(url, json={"user_id": user}).headers["ETag"]
+        for user in (user_id, other_id)
+        for url in ('/api/get-movies/gestions', '/api/get-movies/gestions?sort=name')
+    }
+    assert len(etags) == 4
@@ -0,0 +1,112 @@
+import json                                         # Pour la lecture des fichiers du journal
+import os                                           # Pour les chemins des fichiers
+import time                                         # Pour l'attente de la compaction en arrière-plan
+import pytest
+from src.classes.journal import Journal             # Moteur de stockage journalisé
+from src.classes.json_repository import JsonRepository  # Dépôt basé sur les fichiers JSON
+
+"""
+|
+|   Tests du journal : relecture des opérations, compaction et reprise des anciens fichiers JSON.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def apply_record(data: dict, record: dict):
+    data[record["key"]] = record["value"]
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = Journal(str(tmp_path / "doc.json"), apply_record)
+    journal.write({"initial": 0})
+    return journal
+
+def test_load_replays_records_in_order(journal):
+    journal.append({"key": "a", "value": 1}, {"key": "b", "value": 2})
+    journal.append({"key": "a", "value": 3})
+
+    assert journal.load() == {"initial": 0, "a": 3, "b": 2}
+    assert journal.load_snapshot() == {"initial": 0}
+
+def test_truncated_last_line_is_ignored(journal):
+    journal.append({"key": "a", "value": 1})
+    with open(journal.journal_path, 'a', encoding='utf-8') as file:
+        file.write('{"key": "b", "val')                 # Écriture interrompue
+
+    assert journal.load() == {"initial": 0, "a": 1}
+
+def test_append_after_truncated_line_is_kept(journal):
+    journal.append({"key": "a", "value": 1})
+    with open(journal.journal_path, 'a', encoding='utf-8') as file:
+        file.write('{"key": "b", "val')                 # Écriture interrompue
+    journal.append({"key": "c", "value": 3})
+    journal.append({"key": "d", "value": 4})
+
+    assert journal.load() == {"initial": 0, "a": 1, "c": 3, "d": 4}
+
+def test_compact_rewrites_snapshot_and_empties_journal(journal):
+    journal.append({"key": "a", "value": 1}, {"key": "b", "value": 2})
+    before = journal.load()
+
+    journal.compact()
+
+    assert not os.path.exists(journal.journal_path)
+    assert not os.path.exists(journal.compacting_path)
+    assert journal.load_snapshot() == before
+    assert journal.load() == before
+
+def test_records_appended_during_compaction_are_kept(journal):
+    journal.append({"key": "a", "value": 1})
+    os.replace(journal.journal_path, journal.compacting_path)   # Compaction interrompue après le renommage
+    journal.append({"key": "b", "value": 2})
+
+    assert journal.load() == {"initial": 0, "a": 1, "b": 2}
+    journal.compact()
+    assert journal.load_snapshot() == {"initial": 0, "a": 1}
+    assert journal.load() == {"initial": 0, "a": 1, "b": 2}
+
+def test_write_replaces_snapshot_and_journal(journal):
+    journal.append({"key": "a", "value": 1})
+    journal.write({"other": True})
+
+    assert journal.load() == {"other": True}
+    assert not os.path.exists(journal.journal_path)
+
+def test_compaction_starts_in_background_past_threshold(journal, monkeypatch):
+    monkeypatch.setattr(Journal, "compaction_threshold", 64)
+    for i in range(10):
+        journal.append({"key": f"k{i}", "value": i})
+
+    deadline = time.monotonic() + 5
+    while (journal.journal_path in Journal._running or os.path.exists(journal.compacting_path)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert journal.load() == {"initial": 0, **{f"k{i}": i for i in range(10)}}
+    assert "k0" in journal.load_snapshot()              # Les premières opérations sont passées dans l'instantané
+
+def test_library_replay_gives_same_ids_and_versions(tmp_path):
+    repository = JsonRepository(str(tmp_path))
+    repository.create_library("u1")
+    first = repository.add_movie("u1", {"movie_name": "Amélie", "cover_image_path": "a.jpg"})
+    second = repository.add_movie("u1", {"movie_name": "Matrix", "cover_image_path": "b.jpg"})
+    repository.update_movie("u1", first, {"notation": "5"})
+    repository.delete_movie("u1", second)
+    expected = repository.load_library("u1")
+
+    replayed = repository.journal("u1").load().to_dict()
+    assert replayed == expected
+    repository.journal("u1").compact()
+    assert repository.journal("u1").load_snapshot().to_dict() == expected
+
+def test_legacy_json_file_is_imported(tmp_path):
+    legacy = {"nb_movies": 2, "movies": [
+        {"id": 1, "movie_name": "A", "cover_image_path": "a.jpg"},
+        {"id": 1, "movie_name": "B", "cover_image_path": "b.jpg"}   # Doublon de l'ancienne attribution des ID
+    ]}
+    with open(tmp_path / "movies_u1.json", 'w', encoding='utf-8') as file:
+        json.dump(legacy, file)
+
+    repository = JsonRepository(str(tmp_path))
+    library = repository.load_library("u1")
+    assert [movie["id"] for movie in library["movies"]] == [1, 2]
+    assert repository.add_movie("u1", {"movie_name": "C", "cover_image_path": "c.jpg"}) == 3
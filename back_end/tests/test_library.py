@@ -0,0 +1,97 @@
+import gc                                           # Pour une mesure de la mémoire sans objets en attente
+import json                                         # Pour une vidéothèque relue depuis son format JSON
+import tracemalloc                                  # Pour la mémoire réellement occupée
+from src.classes.json_repository import JsonRepository  # Dépôt basé sur les fichiers JSON
+from src.classes.library import Library             # Vidéothèque en mémoire
+from src.classes.movie_query import MovieQuery      # Requête de tri des films
+
+"""
+|
+|   Tests de la vidéothèque en mémoire : index des images de couverture tenu à jour par apply_record,
+|   estimation de la mémoire occupée (taille des entrées du cache des vidéothèques).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def movie(movie_id: int, cover: str) -> dict:
+    return {"id": movie_id, "movie_name": f"Film {movie_id}", "cover_image_path": cover}
+
+def test_find_by_cover_follows_add_edit_and_delete():
+    library = Library({1: movie(1, "a.png"), 2: movie(2, "b.png")}, next_id=3)
+    assert library.find_by_cover("a.png")["id"] == 1
+    assert library.find_by_cover("c.png") is None
+
+    Library.apply_record(library, {"op": "add", "movie": movie(3, "c.png")})
+    Library.apply_record(library, {"op": "edit", "id": 1, "fields": {"cover_image_path": "d.png"}})
+    Library.apply_record(library, {"op": "delete", "id": 2})
+
+    assert library.find_by_cover("c.png")["id"] == 3
+    assert library.find_by_cover("d.png")["id"] == 1
+    assert library.find_by_cover("a.png") is None
+    assert library.find_by_cover("b.png") is None
+    assert "a.png" not in library.cover_index and "b.png" not in library.cover_index
+
+def test_find_by_cover_keeps_remaining_movies_sharing_a_cover():
+    library = Library({1: movie(1, "a.png"), 2: movie(2, "a.png")}, next_id=3)
+    assert library.find_by_cover("a.png")["id"] == 1
+
+    Library.apply_record(library, {"op": "delete", "id": 1})
+    assert library.find_by_cover("a.png")["id"] == 2
+
+def test_json_repository_find_movie_by_cover(tmp_path):
+    repository = JsonRepository(str(tmp_path))
+    repository.create_library("u", {"nb_movies": 0, "next_id": 1, "movies": []})
+    movie_id = repository.add_movie("u", {"movie_name": "Film", "cover_image_path": "a.png"})
+    assert repository.find_movie_by_cover("u", "a.png")["id"] == movie_id
+
+    repository.delete_movie("u", movie_id)
+    assert repository.find_movie_by_cover("u", "a.png") is None
+
+def full_movie(movie_id: int) -> dict:
+    return {
+        "id": movie_id, "movie_name": f"Film {movie_id}", "year_of_creation": str(1950 + movie_id % 70),
+        "director": f"Réalisateur {movie_id % 500}", "category": "Drame", "notation": str(movie_id % 6),
+        "synopsis": f"Le synopsis numéro {movie_id} raconte une histoire de quelques phrases. " * 3,
+        "cover_image_path": f"storage/covers/{movie_id:064x}.png", "creation_date": "2024-01-01 12:00:00"
+    }
+
+def test_memory_size_follows_indexes():
+    text = json.dumps({"next_id": 3001, "movies": [full_movie(i) for i in range(1, 3001)]})
+    gc.collect()
+    tracemalloc.start()
+    try:
+        library = Library.from_dict(json.loads(text))
+        list(library.ordered(MovieQuery.from_args({"sort": "name"})))
+        library.search("histoire")
+        library.similar_titles("Film 12")
+        library.find_by_cover("absente.png")
+        gc.collect()
+        measured = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert 0.7 * measured < library.memory_size() < 1.3 * measured
+    assert library.memory_size() > 2 * len(text)    # Bien plus que la taille du JSON
+
+def test_memory_size_follows_writes():
+    library = Library({1: full_movie(1)}, next_id=2)
+    before = library.memory_size()
+    Library.apply_record(library, {"op": "add", "movie": full_movie(2)})
+    assert library.memory_size() > before
+    Library.apply_record(library, {"op": "delete", "id": 2})
+    assert library.memory_size() - before == Library.memory_costs["tombstone"]
+
+def test_cache_entry_grows_when_an_index_is_built(tmp_path):
+    repository = JsonRepository(str(tmp_path))
+    repository.create_library("u", {"next_id": 201, "movies": [full_movie(i) for i in range(1, 201)]})
+    repository.load("u")
+    loaded = repository.cache.stats()["bytes"]
+    assert loaded == repository.load("u").memory_size()
+
+    repository.search_movies("u", "histoire")
+    assert repository.cache.stats()["bytes"] == repository.load("u").memory_size() > loaded
+
+    repository.cache.max_bytes = loaded + 1         # L'index ne tient plus : la vidéothèque quitte le cache
+    repository.similar_titles("u", "Film 1")
+    assert repository.cache.stats()["entries"] == 0
@@ -0,0 +1,102 @@
+import base64                                       # Pour l'envoi des images en base64
+import hashlib                                      # Pour le chemin des images adressées par contenu
+import os                                           # Pour l'existence des fichiers
+import sqlite3                                      # Pour une erreur d'écriture du dépôt
+import uuid                                         # Pour des utilisateurs distincts
+from src.classes.cover_store import CoverStore      # Stockage des images adressé par contenu
+from src.classes.repository import get_repository   # Dépôt configuré
+
+"""
+|
+|   Tests de /api/movies/batch : résultats par opération et références aux images en cas d'échec.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def image(seed: str) -> bytes:
+    return b'\x89PNG\r\n\x1a\n' + seed.encode() * 64
+
+def cover(seed: str) -> str:
+    return "data:image/png;base64," + base64.b64encode(image(seed)).decode()
+
+def movie(name: str, seed: str) -> dict:
+    return {
+        "movie_name": name, "year_of_creation": "1999", "director": "X", "categorie": "Action",
+        "synopsis": "", "notation": "4", "cover_image": cover(seed)
+    }
+
+def new_library() -> str:
+    user_id = str(uuid.uuid4())
+    get_repository().create_library(user_id)
+    return user_id
+
+def test_batch_applies_operations_in_order(client):
+    user_id = new_library()
+    response = client.post('/api/movies/batch', json={"user_id": user_id, "operations": [
+        {"op": "add", "movie": movie("Matrix", "a")},
+        {"op": "add", "movie": movie("MATRIX", "a")},                # Même image et même titre : doublon
+        {"op": "edit", "movieId": 1, "fields": {"movie_name": "The Matrix", "notation": "5"}},
+        {"op": "delete", "movieId": 42},
+        {"op": "rename"}
+    ]})
+
+    statuses = [result["status"] for result in response.json["results"]]
+    assert statuses == ["200", "400", "200", "404", "400"]
+    library = get_repository().load_library(user_id)
+    assert [(m["movie_name"], m["notation"]) for m in library["movies"]] == [("The Matrix", "5")]
+    assert get_repository().load_cover_references()[library["movies"][0]["cover_image_path"]] == 1
+
+def test_batch_releases_covers_when_the_write_fails(client, monkeypatch):
+    user_id = new_library()
+    repository = get_repository()
+
+    def failing_batch(user_id, operations):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(repository, "apply_batch", failing_batch)
+
+    response = client.post('/api/movies/batch', json={"user_id": user_id, "operations": [
+        {"op": "add", "movie": movie("Alien", "b")},
+        {"op": "add", "movie": movie("Aliens", "c")}
+    ]})
+
+    assert response.status_code == 500
+    references = repository.load_cover_references()
+    for seed in ("b", "c"):
+        image_path = CoverStore.path_from_name(hashlib.sha256(image(seed)).hexdigest() + ".png")
+        assert references.get(image_path, 0) == 0
+        assert not os.path.exists(image_path)
+    assert repository.load_library(user_id)["movies"] == []
+
+def test_batch_rejects_malformed_operations_one_by_one(client):
+    user_id = new_library()
+    response = client.post('/api/movies/batch', json={"user_id": user_id, "operations": [
+        {"op": "add", "movie": movie("Heat", "d")},
+        "oops",
+        {"op": "edit", "movieId": 1, "fields": ["a"]},
+        {"op": "add", "movie": "Heat"},
+        {"op": "delete", "movieId": 1}
+    ]})
+
+    assert response.status_code == 200
+    statuses = [result["status"] for result in response.json["results"]]
+    assert statuses == ["200", "400", "400", "400", "200"]
+    assert get_repository().load_library(user_id)["movies"] == []
+
+def test_different_films_may_share_a_poster(client):
+    user_id = new_library()
+    response = client.post('/api/movies/batch', json={"user_id": user_id, "operations": [
+        {"op": "add", "movie": movie("Alien", "e")},
+        {"op": "add", "movie": movie("Aliens", "e")},                # Même affiche, autre film
+        {"op": "add", "movie": movie("alien", "e")}                  # Même affiche, même titre : doublon
+    ]})
+    assert [result["status"] for result in response.json["results"]] == ["200", "200", "400"]
+
+    single = client.post('/api/add-movie', json={"user_id": user_id, **movie("Alien 3", "e")})
+    assert single.status_code == 200
+    duplicate = client.post('/api/add-movie', json={"user_id": user_id, **movie("ALIENS", "e")})
+    assert duplicate.status_code == 400
+
+    library = get_repository().load_library(user_id)
+    assert [m["movie_name"] for m in library["movies"]] == ["Alien", "Aliens", "Alien 3"]
+    assert get_repository().load_cover_references()[library["movies"][0]["cover_image_path"]] == 3
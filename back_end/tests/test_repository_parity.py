@@ -0,0 +1,201 @@
+import sqlite3                                      # Pour simuler une base créée avant sort_name
+import threading                                    # Pour les modifications simultanées
+import pytest
+from src.classes.json_repository import JsonRepository      # Dépôt basé sur les fichiers JSON
+from src.classes.library_stats import LibraryStats          # Statistiques recalculées
+from src.classes.movie_query import MovieQuery              # Tri, filtres et pagination des films
+from src.classes.sqlite_repository import SqliteRepository  # Dépôt basé sur SQLite
+
+"""
+|
+|   Tests de parité des dépôts : les dépôts JSON et SQLite donnent les mêmes résultats pour les lots
+|   d'opérations, les statistiques, la pagination et la synchronisation par versions.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+def movie(name: str, category: str, notation: str, year: str) -> dict:
+    return {
+        "movie_name": name, "year_of_creation": year, "director": "X", "category": category,
+        "synopsis": "", "notation": notation, "cover_image_path": f"storage/covers/{name}.png",
+        "creation_date": "2024-01-01 12:00:00", "last_modified_date": "2024-01-01 12:00:00"
+    }
+
+@pytest.fixture(params=["json", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "json":
+        repository = JsonRepository(str(tmp_path))
+    else:
+        repository = SqliteRepository(str(tmp_path / "videotheque.db"))
+    repository.create_library("u")
+    return repository
+
+def scenario(repository) -> dict:
+    """
+        Applique les mêmes modifications à un dépôt et retourne ce qui doit être identique d'un dépôt à l'autre.
+    """
+    results = repository.apply_batch("u", [
+        {"op": "add", "movie": movie("Matrix", "Action", "5", "1999")},
+        {"op": "add", "movie": movie("Amelie", "Comedie", "4", "2001")},
+        {"op": "add", "movie": movie("Alien", "Horreur", "4", "1979")},
+        {"op": "edit", "id": 2, "fields": {"notation": "3", "category": "Drame"}},
+        {"op": "delete", "id": 42},
+    ])
+    after_batch = repository.library_version("u")
+    repository.apply_batch("u", [
+        {"op": "delete", "id": 3},
+        {"op": "edit", "id": 1, "fields": {"movie_name": "The Matrix"}},
+        {"op": "add", "movie": movie("Heat", "Action", "4", "1995")},
+    ])
+    changes = repository.movie_changes("u", after_batch)
+    return {
+        "results": [result if isinstance(result, int) or result is None else
+                    {key: result[key] for key in ("id", "movie_name", "category", "notation")} for result in results],
+        "version": repository.library_version("u"),
+        "changed": sorted((changed["id"], changed["movie_name"]) for changed in changes["movies"]),
+        "deleted": changes["deleted"],
+        "reset": changes["reset"],
+        "stats": repository.movie_stats("u"),
+        "full": repository.movie_changes("u", 0)["reset"],
+    }
+
+@pytest.fixture(scope="module")
+def expected(tmp_path_factory):
+    repository = JsonRepository(str(tmp_path_factory.mktemp("json")))
+    repository.create_library("u")
+    return scenario(repository)
+
+def test_repositories_agree(repository, expected):
+    assert scenario(repository) == expected
+
+def test_scenario_results(expected):
+    assert expected["results"] == [1, 2, 3, {"id": 2, "movie_name": "Amelie", "category": "Drame", "notation": "3"}, None]
+    assert expected["changed"] == [(1, "The Matrix"), (4, "Heat")]
+    assert expected["deleted"] == [3]
+    assert expected["reset"] is False
+    assert expected["stats"]["nb_movies"] == 3
+
+def test_missing_library(repository):
+    with pytest.raises(FileNotFoundError):
+        repository.movie_stats("absent")
+    with pytest.raises(FileNotFoundError):
+        repository.movie_changes("absent", 0)
+    with pytest.raises(FileNotFoundError):
+        repository.apply_batch("absent", [{"op": "add", "movie": movie("Matrix", "Action", "5", "1999")}])
+
+def test_find_movie_by_cover_compares_titles(repository):
+    poster = "storage/covers/partagee.png"
+    repository.apply_batch("u", [
+        {"op": "add", "movie": dict(movie("Alien", "Horreur", "4", "1979"), cover_image_path=poster)},
+        {"op": "add", "movie": dict(movie("Aliens", "Action", "4", "1986"), cover_image_path=poster)},
+    ])
+    assert repository.find_movie_by_cover("u", poster)["id"] == 1
+    assert repository.find_movie_by_cover("u", poster, "ALIENS")["id"] == 2
+    assert repository.find_movie_by_cover("u", poster, "Alien³") is None
+
+def test_concurrent_edits_are_not_lost(tmp_path):
+    repository = SqliteRepository(str(tmp_path / "videotheque.db"))
+    repository.create_library("u")
+    repository.add_movie("u", movie("Matrix", "Action", "5", "1999"))
+    categories, notations = ["Drame", "Action"] * 25, ["1", "2", "3", "4", "5"] * 10
+
+    def edit(field: str, values: list):
+        for value in values:
+            repository.update_movie("u", 1, {field: value})
+
+    threads = [threading.Thread(target=edit, args=("category", categories)),
+               threading.Thread(target=edit, args=("notation", notations))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stored = repository.get_movie("u", 1)
+    assert (stored["category"], stored["notation"]) == (categories[-1], notations[-1])
+    assert repository.movie_stats("u") == LibraryStats(repository.load_library("u")["movies"]).to_dict()
+    assert repository.library_version("u") == 1 + len(categories) + len(notations)
+
+catalogue = [
+    movie("Zorro", "Action", "3", "1998"), movie("élan", "Drame", "4", "2010"), movie("avatar", "Action", "4", "2009"),
+    movie("École", "Drame", "5", "2010"), movie("Ébène", "Drame", "2", "1985"), movie("Brazil", "Comedie", "5", "1985"),
+    movie("brazil", "Comedie", "1", "2010"), movie("Alien", "Horreur", "4", "1979"),
+]
+
+def pages(repository, args: dict, between_pages=None) -> list:
+    """
+        Parcourt la liste des films page par page en suivant les curseurs et retourne les pages (titres).
+        between_pages(numéro) est appelé après chaque page, avant de demander la suivante.
+    """
+    result, cursor = [], None
+    while True:
+        page = repository.list_movies("u", MovieQuery.from_args({**args, "cursor": cursor}))
+        result.append([movie["movie_name"] for movie in page["movies"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return result
+        if between_pages:
+            between_pages(len(result))
+
+@pytest.mark.parametrize("args", [
+    {"sort": "id"}, {"sort": "name"}, {"sort": "name", "order": "desc"}, {"sort": "year"},
+    {"sort": "rating", "order": "desc"}, {"sort": "created"},
+    {"sort": "name", "category": "Drame"}, {"sort": "year", "year_min": "1985", "year_max": "2009"},
+    {"sort": "name", "order": "desc", "min_rating": "4"},
+])
+def test_cursor_pages_cover_the_full_list(repository, args):
+    repository.apply_batch("u", [{"op": "add", "movie": added} for added in catalogue])
+    full = repository.list_movies("u", MovieQuery.from_args(args))["movies"]
+    paged = pages(repository, {**args, "limit": "3"})
+    assert [name for page in paged for name in page] == [movie["movie_name"] for movie in full]
+    assert all(len(page) == 3 for page in paged[:-1]) and 1 <= len(paged[-1]) <= 3
+
+def test_pagination_is_identical_in_both_repositories(tmp_path):
+    repositories = [JsonRepository(str(tmp_path)), SqliteRepository(str(tmp_path / "videotheque.db"))]
+    for repository in repositories:
+        repository.create_library("u")
+        repository.apply_batch("u", [{"op": "add", "movie": added} for added in catalogue])
+    for args in ({"sort": "name"}, {"sort": "name", "order": "desc"}, {"sort": "year", "min_rating": "2"}):
+        json_pages, sqlite_pages = (pages(repository, {**args, "limit": "2"}) for repository in repositories)
+        assert json_pages == sqlite_pages
+        # Les curseurs ne dépendent pas du dépôt : un curseur JSON reprend la liste SQLite au même endroit
+        cursor = repositories[0].list_movies("u", MovieQuery.from_args({**args, "limit": "2"}))["next_cursor"]
+        resumed = repositories[1].list_movies("u", MovieQuery.from_args({**args, "limit": "2", "cursor": cursor}))
+        assert [movie["movie_name"] for movie in resumed["movies"]] == json_pages[1]
+
+def test_name_sort_ignores_case_beyond_ascii(repository):
+    repository.apply_batch("u", [{"op": "add", "movie": added} for added in catalogue])
+    assert [name for page in pages(repository, {"sort": "name", "limit": "3"}) for name in page] == [
+        "Alien", "avatar", "Brazil", "brazil", "Zorro", "Ébène", "École", "élan"
+    ]
+
+def test_pages_stay_consistent_under_inserts_and_deletes(repository):
+    repository.apply_batch("u", [{"op": "add", "movie": added} for added in catalogue])
+
+    def modify(page_number: int):
+        if page_number == 1:
+            # Après Alien, avatar, Brazil : un film avant le curseur, un film après, une suppression plus loin
+            repository.apply_batch("u", [
+                {"op": "add", "movie": movie("Akira", "Action", "5", "1988")},
+                {"op": "add", "movie": movie("Dune", "Action", "4", "1984")},
+                {"op": "delete", "id": 1},                                      # Zorro
+            ])
+
+    assert pages(repository, {"sort": "name", "limit": "3"}, modify) == [
+        ["Alien", "avatar", "Brazil"], ["brazil", "Dune", "Ébène"], ["École", "élan"]
+    ]
+
+def test_migration_computes_sort_names(tmp_path):
+    repository = SqliteRepository(str(tmp_path / "videotheque.db"))
+    repository.create_library("u")
+    repository.apply_batch("u", [{"op": "add", "movie": added} for added in catalogue])
+    connection = sqlite3.connect(str(tmp_path / "videotheque.db"))
+    with connection:
+        # Base antérieure à la colonne sort_name : index sur LOWER(movie_name)
+        connection.execute('DROP INDEX idx_movies_sort_name')
+        connection.execute('ALTER TABLE movies DROP COLUMN sort_name')
+        connection.execute("CREATE INDEX idx_movies_sort_name ON movies (user_id, LOWER(COALESCE(movie_name, '')), id)")
+    connection.close()
+    migrated = SqliteRepository(str(tmp_path / "videotheque.db"))
+    names = [movie["movie_name"] for movie in migrated.list_movies("u", MovieQuery(sort="name"))["movies"]]
+    assert names == ["Alien", "avatar", "Brazil", "brazil", "Zorro", "Ébène", "École", "élan"]
@@ -0,0 +1,44 @@
+import uuid                                         # Pour des utilisateurs distincts
+from src.classes.repository import get_repository   # Dépôt configuré
+from src.classes.title_index import TitleIndex      # Index de trigrammes des titres
+
+"""
+|
+|   Tests de la recherche de titres approchants (« Vouliez-vous dire… »).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+TITLES = ["Matrix", "Amélie", "The Matrix Reloaded", "Le Parrain"]
+
+def index() -> TitleIndex:
+    return TitleIndex({"id": movie_id, "movie_name": title} for movie_id, title in enumerate(TITLES, 1))
+
+def test_one_typo():
+    assert TitleIndex.one_typo("matirx", "matrix")          # Lettres voisines inversées
+    assert TitleIndex.one_typo("matrox", "matrix")          # Lettre changée
+    assert TitleIndex.one_typo("matrx", "matrix")           # Lettre retirée
+    assert TitleIndex.one_typo("matrixx", "matrix")         # Lettre ajoutée
+    assert not TitleIndex.one_typo("matrix", "matrix")
+    assert not TitleIndex.one_typo("mtarxi", "matrix")
+    assert not TitleIndex.one_typo("abcde", "acbed")
+
+def test_similar_finds_transposed_letters():
+    assert [movie_id for movie_id, _ in index().similar("matirx")] == [1]
+    assert [movie_id for movie_id, _ in index().similar("amleie")] == [2]
+    assert [movie_id for movie_id, _ in index().similar("le prarain")] == [4]
+
+def test_similar_ignores_unrelated_titles():
+    assert index().similar("inception") == []
+
+def test_search_suggests_title_despite_transposition(client):
+    user_id = str(uuid.uuid4())
+    repository = get_repository()
+    repository.create_library(user_id)
+    repository.add_movie(user_id, {"movie_name": "Matrix", "director": "Wachowski", "category": "Action",
+                                   "synopsis": "", "cover_image_path": "storage/covers/matrix.png"})
+
+    response = client.get('/api/movies/search?q=matirx', json={"user_id": user_id})
+    assert response.status_code == 200
+    assert response.get_json()["data"]["suggestions"] == ["Matrix"]
@@ -0,0 +1,177 @@
+import json                                         # Pour les réponses du faux serveur
+import threading                                    # Pour le faux serveur et les appels simultanés
+import time                                         # Pour la lenteur du faux serveur et les attentes
+from concurrent.futures import ThreadPoolExecutor   # Pour les requêtes simultanées
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.classes import tmdb_cache                  # Module du cache (horloge, cache partagé)
+from src.classes.themoviedb import TheMovieDB       # Client de l'API TheMovieDB
+from src.classes.tmdb_cache import TmdbCache        # Cache des réponses de l'API
+
+"""
+|
+|   Tests du cache des réponses TheMovieDB : durée de validité, stale-while-revalidate et appel
+|   unique pour les requêtes identiques simultanées.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class Clock:
+    """
+    Horloge du cache avancée à la main.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+class Api:
+    """
+    Fausse fonction fetch : compte les appels et renvoie une réponse numérotée.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self) -> dict:
+        self.calls += 1
+        return {"call": self.calls}
+
+class Interrupted(BaseException):
+    pass
+
+class StubApi(BaseHTTPRequestHandler):
+    """
+    Faux serveur de l'API : répond lentement, pour que les requêtes simultanées se chevauchent.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    hits = 0
+
+    def do_GET(self):
+        StubApi.hits += 1
+        time.sleep(0.5)
+        body = json.dumps({"page": 1, "results": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tmdb_cache, "time", clock)
+    return clock
+
+def wait_refreshed(cache: TmdbCache):
+    deadline = time.monotonic() + 5
+    while cache.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_response_is_kept_until_ttl(clock):
+    cache, api = TmdbCache(stale_seconds=0), Api()
+    assert cache.get_or_fetch("k", 60, api) == {"call": 1}
+    clock.now += 59
+    assert cache.get_or_fetch("k", 60, api) == {"call": 1}
+    clock.now += 2
+    assert cache.get_or_fetch("k", 60, api) == {"call": 2}
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+def test_expired_response_is_served_while_revalidating(clock):
+    cache, api = TmdbCache(stale_seconds=600), Api()
+    cache.get_or_fetch("k", 60, api)
+    clock.now += 61
+
+    assert cache.get_or_fetch("k", 60, api) == {"call": 1}      # Réponse expirée renvoyée sans attendre l'API
+    wait_refreshed(cache)
+    assert cache.get_or_fetch("k", 60, api) == {"call": 2}
+    assert (cache.stats()["stale_hits"], cache.stats()["refreshes"], api.calls) == (1, 1, 2)
+
+    clock.now += 60 + 601                                       # Au-delà de stale_seconds : la requête attend l'API
+    assert cache.get_or_fetch("k", 60, api) == {"call": 3}
+
+def test_errors_are_not_cached(clock):
+    cache, api = TmdbCache(), Api()
+
+    def failing():
+        raise ValueError("API indisponible")
+
+    with pytest.raises(ValueError):
+        cache.get_or_fetch("k", 60, failing)
+    assert cache.get_or_fetch("k", 60, api) == {"call": 1}
+
+def test_identical_requests_share_one_api_call(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubApi.hits = 0
+    cache = TmdbCache(store=None)
+    monkeypatch.setattr(tmdb_cache, "_tmdb_cache", cache)
+    client = TheMovieDB("test")
+    client.base_url = f"http://127.0.0.1:{server.server_port}/3"
+    try:
+        with ThreadPoolExecutor(max_workers=100) as executor:
+            responses = list(executor.map(lambda i: client.get_api_response("/search/movie", {"query": "Matrix"}), range(100)))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert all(response == {"page": 1, "results": []} for response in responses)
+    assert StubApi.hits == 1
+    assert cache.stats()["coalesced"] == 99
+    assert cache.inflight == {}
+
+def test_waiting_requests_survive_an_interrupted_call():
+    cache, api = TmdbCache(), Api()
+    started, release = threading.Event(), threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait()
+        raise Interrupted()                         # Comme KeyboardInterrupt ou un délai gevent
+
+    def leader():
+        with pytest.raises(Interrupted):
+            cache.get_or_fetch("k", 60, interrupted)
+
+    results = []
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", 60, api)), daemon=True)
+    follower.start()
+    while cache.coalesced == 0:
+        time.sleep(0.01)
+    release.set()
+    thread.join()
+    follower.join(timeout=5)                        # Sans réponse, la requête en attente resterait bloquée
+    assert results == [{"call": 1}]
+    assert cache.inflight == {}
+
+def test_waiting_is_bounded():
+    cache, api = TmdbCache(wait_seconds=0.1), Api()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+        return {"call": "slow"}
+
+    thread = threading.Thread(target=cache.get_or_fetch, args=("k", 60, slow))
+    thread.start()
+    started.wait()
+    try:
+        assert cache.get_or_fetch("k", 60, api) == {"call": 1}  # Appel direct après wait_seconds
+    finally:
+        release.set()
+        thread.join()
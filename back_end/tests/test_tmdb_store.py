@@ -0,0 +1,123 @@
+import json                                         # Pour la taille des réponses en JSON
+import time                                         # Pour l'attente du nettoyage en arrière-plan
+import pytest
+from src.classes import tmdb_cache, tmdb_store      # Modules du cache et du stockage (horloge)
+from src.classes.tmdb_cache import TmdbCache        # Cache en mémoire préchargé depuis le stockage
+from src.classes.tmdb_store import TmdbStore        # Stockage persistant des réponses de l'API
+
+"""
+|
+|   Tests du stockage persistant des réponses TheMovieDB : expiration, préchargement dans la limite
+|   de max_bytes et nettoyage par fenêtre des réponses qui expirent le plus tôt.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class Clock:
+    """
+    Horloge du stockage avancée à la main.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tmdb_store, "time", clock)
+    return clock
+
+def response(number: int) -> dict:
+    """
+        Réponse de l'API de taille fixe (résumé peu compressible), numérotée.
+    """
+    return {"id": number, "overview": "".join(f"{(number * 7919 + i * 104729) % 99991:05d}" for i in range(40))}
+
+def sizes(store: TmdbStore) -> dict:
+    return dict(store.connection().execute('SELECT key, size FROM responses'))
+
+def test_responses_expire(clock, tmp_path):
+    store = TmdbStore(str(tmp_path / "tmdb_cache.db"))
+    store.put("k", response(1), 1060, 1660)
+    assert store.get("k") == (response(1), 1060, 1660)
+
+    clock.now += 100                                            # Expirée mais encore renvoyable pendant le rafraîchissement
+    assert store.get("k") == (response(1), 1060, 1660)
+    store.put("k", response(2), 1160, 1760)                     # Rafraîchie : la réponse est remplacée
+    assert store.get("k") == (response(2), 1160, 1760)
+
+    clock.now = 1760
+    assert store.get("k") is None
+    assert store.get("absente") is None
+
+def test_responses_survive_a_restart(clock, tmp_path):
+    TmdbStore(str(tmp_path / "tmdb_cache.db")).put("k", response(1), 1060, 1660)
+    assert TmdbStore(str(tmp_path / "tmdb_cache.db")).get("k") == (response(1), 1060, 1660)
+
+def test_recent_yields_latest_expiring_within_max_bytes(clock, tmp_path):
+    store = TmdbStore(str(tmp_path / "tmdb_cache.db"))
+    for number in range(5):
+        store.put(f"k{number}", response(number), 1100 + number * 10, 1200 + number * 10)
+    store.put("perimee", response(9), 900, 999)                 # Plus renvoyable : jamais préchargée
+    size = len(json.dumps(response(0), ensure_ascii=False))
+
+    assert [key for key, *_ in store.recent(3 * size)] == ["k4", "k3", "k2"]
+    assert [key for key, *_ in store.recent(3 * size - 1)] == ["k4", "k3"]
+    assert list(store.recent(size - 1)) == []
+    key, data, expires_at, stale_until = next(store.recent(size))
+    assert (key, data, expires_at, stale_until) == ("k4", response(4), 1140, 1240)
+
+def test_cache_warm_up_respects_max_bytes(clock, monkeypatch, tmp_path):
+    monkeypatch.setattr(tmdb_cache, "time", clock)
+    store = TmdbStore(str(tmp_path / "tmdb_cache.db"))
+    for number in range(5):
+        store.put(f"k{number}", response(number), 1100 + number * 10, 1200 + number * 10)
+    size = len(json.dumps(response(0), ensure_ascii=False))
+
+    cache = TmdbCache(max_bytes=2 * size, store=store)
+    assert cache.warm() == 2
+    assert cache.stats()["bytes"] <= 2 * size
+    assert cache.get_or_fetch("k4", 60, lambda: pytest.fail("k4 doit être préchargée")) == response(4)
+
+def test_sweep_removes_stale_then_earliest_expiring(clock, tmp_path):
+    store = TmdbStore(str(tmp_path / "tmdb_cache.db"), sweep_seconds=3600)
+    for number in range(5):
+        store.put(f"k{number}", response(number), 1100 + number * 10, 1200 + number * 10)
+    store.put("perimee", response(9), 1010, 1050)
+    clock.now = 1060
+    entry_sizes = sizes(store)
+
+    store.max_bytes = sum(entry_sizes.values()) + 1             # Sous la limite : seule la réponse périmée part
+    assert store.sweep() == 1
+    assert "perimee" not in sizes(store)
+
+    store.max_bytes = sum(entry_sizes[key] for key in ("k2", "k3", "k4"))
+    assert store.sweep() == 2                                   # Excédent couvert par les deux premières à expirer
+    assert sorted(sizes(store)) == ["k2", "k3", "k4"]
+    assert store.stats() == {"entries": 3, "bytes": store.max_bytes, "max_bytes": store.max_bytes}
+
+    store.max_bytes = entry_sizes["k4"] + entry_sizes["k3"] - 1 # Une réponse entamée est retirée entière
+    assert store.sweep() == 2
+    assert sorted(sizes(store)) == ["k4"]
+
+def test_put_sweeps_in_background_once_per_window(clock, tmp_path):
+    store = TmdbStore(str(tmp_path / "tmdb_cache.db"), sweep_seconds=300)
+    store.put("perimee", response(9), 1010, 1050)
+    clock.now = 1100
+    store.put("k", response(1), 1200, 1300)
+    assert "perimee" in sizes(store)                            # Fenêtre pas encore écoulée : pas de nettoyage
+
+    clock.now = 1000 + 300
+    store.put("k", response(1), 1400, 1500)
+    deadline = time.monotonic() + 5
+    while "perimee" in sizes(store) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(sizes(store)) == ["k"]
+    assert store.last_sweep == 1300
@@ -0,0 +1,44 @@
+import uuid                                         # Pour des e-mails distincts
+import pytest
+from src.classes.json_repository import JsonRepository      # Dépôt basé sur les fichiers JSON
+from src.classes.repository import get_repository           # Dépôt configuré
+from src.classes.sqlite_repository import SqliteRepository  # Dépôt basé sur SQLite
+from src.classes.user import User                           # Inscription des utilisateurs
+
+"""
+|
+|   Tests des utilisateurs : une inscription ne remplace jamais un utilisateur qui a le même e-mail.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+@pytest.fixture(params=["json", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "json":
+        return JsonRepository(str(tmp_path))
+    return SqliteRepository(str(tmp_path / "videotheque.db"))
+
+def user(first_name: str, email: str = "neo@example.com") -> dict:
+    return {"first_name": first_name, "email": email, "password": "secret"}
+
+def test_add_user_refuses_a_used_email(repository):
+    assert repository.add_user("u1", user("Neo"))
+    assert not repository.add_user("u2", user("Smith"))
+
+    assert repository.find_user_by_email("neo@example.com") == ("u1", user("Neo"))
+    assert repository.get_user("u2") is None
+
+def test_upsert_user_replaces_by_id(tmp_path):
+    repository = SqliteRepository(str(tmp_path / "videotheque.db"))
+    repository.upsert_user("u1", user("Neo"))
+    repository.upsert_user("u1", user("Thomas"))
+    assert repository.get_user("u1") == user("Thomas")
+
+def test_register_race_returns_409(app, monkeypatch):
+    email = f"{uuid.uuid4()}@example.com"
+    first = User.register(email, "secret", "Neo")
+    monkeypatch.setattr(User, "email_exists", classmethod(lambda cls, email: False))   # Vérification passée avant l'autre inscription
+
+    assert User.register(email, "secret", "Smith")["status"] == 409
+    assert get_repository().find_user_by_email(email)[0] == first["id"]
@@ -39,6 +39,11 @@ app.config['SERVER_FRONT_END_URL'] = 'http://127.0.0.1:5000'
 # app.config['SERVER_BACK_END_URL'] = 'http://back_end:5000'
 # app.config['SERVER_FRONT_END_URL'] = 'http://front_end:5000'
 
+# Durée (secondes) pendant laquelle une liste de films ou des statistiques en cache sont renvoyées
+# sans interroger le serveur back-end (voir ProxyCache). 0 : chaque réponse est revalidée par son ETag,
+# les écritures faites hors de ce front-end sont vues immédiatement.
+app.config['PROXY_CACHE_MAX_AGE'] = 0
+
 # Importations des fichier web.py et api.py
 from routes.api import *
 from routes.web import *
@@ -1,9 +1,12 @@
 from app import app
-from flask import request, jsonify
-import requests, base64
+from flask import request, jsonify, Response, abort
+import requests
 from typing import Dict, Any
 
 from flask_login import current_user
+from werkzeug.http import unquote_etag
+
+from src.classes.proxy_cache import ProxyCache
 
 """
 |
@@ -17,6 +20,65 @@ from flask_login import current_user
 # Accède à la variable globale depuis la configuration Flask
 server_back_end_url = app.config['SERVER_BACK_END_URL']
 
+# Réponses du serveur back-end (listes de films, statistiques) conservées avec leur ETag
+proxy_cache = ProxyCache(app.config['PROXY_CACHE_MAX_AGE'])
+
+def get_conditional(api_url: str, user_id: str):
+    """
+        Transmet une requête GET au serveur back-end en s'appuyant sur les ETag, aux deux étapes :
+        - entre le front-end et le back-end : une réponse en cache est revalidée (If-None-Match) et le
+          back-end répond 304 sans corps si elle n'a pas changé ; le corps en cache est alors renvoyé.
+          Si PROXY_CACHE_MAX_AGE est positif, une réponse plus récente est réutilisée sans appeler le
+          back-end (voir ProxyCache) ;
+        - entre le navigateur et le front-end : si l'en-tête If-None-Match du navigateur contient l'ETag
+          de la réponse, le front-end répond 304 sans corps.
+
+    Args:
+        api_url (str): L'URL de la route du serveur back-end (sans chaîne de requête).
+        user_id (str): L'identifiant de l'utilisateur connecté.
+
+    Returns:
+        Response: La réponse (200 ou 304) à renvoyer au navigateur.
+
+    Raises:
+        requests.exceptions.RequestException: Si une erreur de requête se produit lors de la communication avec le back-end.
+    """
+    cache_key = f"{api_url}?{request.query_string.decode('utf-8')}"
+    cached = proxy_cache.get(user_id, cache_key)
+
+    if cached is not None and cached[2]:
+        etag, body = cached[0], cached[1]
+    else:
+        headers = {"If-None-Match": f'"{cached[0]}"'} if cached is not None else {}
+        response = requests.get(api_url, params=request.args, json={"user_id": user_id}, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            proxy_cache.refresh(user_id, cache_key)
+            etag, body = cached[0], cached[1]
+        else:
+            response.raise_for_status()
+            etag, body = unquote_etag(response.headers.get("ETag"))[0], response.content
+            if etag:
+                proxy_cache.put(user_id, cache_key, etag, body)
+
+    if etag and request.if_none_match.contains(etag):
+        result = Response(status=304)
+    else:
+        result = Response(body, status=200, mimetype="application/json")
+    if etag:
+        result.set_etag(etag)
+        result.headers["Cache-Control"] = "private, no-cache"
+    return result
+
+@app.after_request
+def invalidate_proxy_cache(response):
+    """
+        Oublie les réponses en cache de l'utilisateur connecté après toute requête qui peut modifier sa
+        vidéothèque (toute méthode autre que GET).
+    """
+    if request.method not in ("GET", "HEAD", "OPTIONS") and current_user.is_authenticated:
+        proxy_cache.invalidate(current_user.id)
+    return response
+
 #
 #
 #   Authentification
@@ -211,7 +273,10 @@ def deleteUser():
 def getMoviesIndex():
     """
         Summary:
-            Cette route permet de récupérer la liste complète des films depuis une URL d'API sur le serveur back-end.
+            Cette route permet de récupérer la liste des films depuis une URL d'API sur le serveur back-end.
+            Les paramètres de pagination, de tri et de filtre (limit, cursor, sort, order, category,
+            year_min, year_max, min_rating) sont transmis tels quels au serveur back-end.
+            La réponse est validée par son ETag (voir get_conditional).
 
         Returns:
             JSON: Une réponse JSON contenant la liste des films récupérée depuis l'URL distante.
@@ -221,6 +286,7 @@ def getMoviesIndex():
 
         HTTP Status Codes:
             - 200 OK: Si la liste des films est récupérée avec succès depuis l'URL distante.
+            - 304 Not Modified: Si la liste n'a pas changé depuis la réponse d'ETag If-None-Match.
             - Autres codes d'erreur HTTP : Si une erreur de requête se produit lors de la communication avec l'URL distante.
     """
     
@@ -231,9 +297,7 @@ def getMoviesIndex():
         api_url = f"{server_back_end_url}/api/get-movies/index"
         
         try:
-            response = requests.get(api_url, json={"user_id": user_id})
-            response.raise_for_status()
-            return response.json()
+            return get_conditional(api_url, user_id)
         except requests.exceptions.RequestException as e:
             error_message = f"Erreur de requête vers l'URL distante : {str(e)}"
             return jsonify({
@@ -246,12 +310,55 @@ def getMoviesIndex():
         "error": "Method Not Allowed"
     }), 405
  
+@app.route('/api/covers/<user_id>/<image_name>', methods=['GET'])
+def getCover(user_id, image_name):
+    """
+        Transmet au navigateur une image de couverture servie par le serveur back-end.
+
+        Les en-têtes de cache et de requête partielle (If-None-Match, If-Modified-Since, Range) sont
+        transmis au serveur back-end, et ses en-têtes de réponse (ETag, Last-Modified, Cache-Control,
+        Content-Range) au navigateur : les images déjà en cache ne sont pas téléchargées à nouveau.
+        L'image est transmise par morceaux, sans être chargée entièrement en mémoire.
+
+        HTTP Status Codes:
+            - 200 OK / 206 Partial Content / 304 Not Modified : La réponse du serveur back-end.
+            - 404 Not Found: Si l'utilisateur n'est pas connecté ou si l'image ne lui appartient pas.
+    """
+    
+    if not current_user.is_authenticated or str(current_user.id) != user_id:
+        abort(404)
+
+    api_url = f"{server_back_end_url}/api/covers/{user_id}/{image_name}"
+    forwarded_headers = {
+        name: request.headers[name]
+        for name in ('If-None-Match', 'If-Modified-Since', 'Range', 'If-Range')
+        if name in request.headers
+    }
+    
+    try:
+        response = requests.get(api_url, params=request.args, headers=forwarded_headers, stream=True)
+    except requests.exceptions.RequestException as e:
+        return jsonify({
+            "status": "500",
+            "error": f"Erreur de requête vers l'URL distante : {str(e)}"
+        }), 500
+
+    headers = {
+        name: response.headers[name]
+        for name in ('Content-Type', 'Content-Length', 'Content-Range', 'Accept-Ranges',
+                     'ETag', 'Last-Modified', 'Cache-Control', 'Expires')
+        if name in response.headers
+    }
+    return Response(response.iter_content(chunk_size=64 * 1024), status=response.status_code, headers=headers)
+
 @app.route('/api/get-movies/gestions', methods=['GET'])
 def getMoviesGestions():
     """
         Récupère tous les films pour l'affichage dans le modal "gestion des films".
 
-        Cette route permet de récupérer la liste complète des films depuis une URL d'API sur le serveur back-end.
+        Cette route permet de récupérer la liste des films depuis une URL d'API sur le serveur back-end.
+        Les paramètres de pagination, de tri et de filtre sont transmis tels quels au serveur back-end.
+        La réponse est validée par son ETag (voir get_conditional).
         
         Returns:
             JSON: Une réponse JSON contenant la liste des films récupérée depuis l'URL distante.
@@ -261,6 +368,7 @@ def getMoviesGestions():
 
         HTTP Status Codes:
             - 200 OK: Si la liste des films est récupérée avec succès depuis l'URL distante.
+            - 304 Not Modified: Si la liste n'a pas changé depuis la réponse d'ETag If-None-Match.
             - Autres codes d'erreur HTTP : Si une erreur de requête se produit lors de la communication avec l'URL distante.
     """
     
@@ -270,9 +378,7 @@ def getMoviesGestions():
             
         api_url = f"{server_back_end_url}/api/get-movies/gestions"
         try:
-            response = requests.get(api_url, json={"user_id": user_id})
-            response.raise_for_status()
-            return response.json()
+            return get_conditional(api_url, user_id)
         except requests.exceptions.RequestException as e:
             error_message = f"Erreur de requête vers l'URL distante : {str(e)}"
             
@@ -286,6 +392,109 @@ def getMoviesGestions():
         "error": "Method Not Allowed"
     }), 405
     
+@app.route('/api/movies/search', methods=['GET'])
+def searchMovies():
+    """
+        Recherche des films dans la vidéothèque de l'utilisateur connecté (barre de recherche de l'accueil).
+
+        Les paramètres q, limit et category sont transmis tels quels au serveur back-end, qui classe les
+        films par pertinence. Une erreur de paramètre (400) est renvoyée telle quelle au navigateur.
+
+        Returns:
+            JSON: Une réponse JSON contenant les films trouvés, récupérée depuis l'URL distante.
+
+        HTTP Status Codes:
+            - 200 OK: Si la recherche a abouti.
+            - 400 Bad Request: Si un paramètre est invalide.
+            - 401 Unauthorized: Si l'utilisateur n'est pas connecté.
+            - 500 Internal Server Error: Si une erreur de requête se produit lors de la communication avec l'URL distante.
+    """
+
+    if not current_user.is_authenticated:
+        return jsonify({
+            "status": "401",
+            "error": "Utilisateur non connecté."
+        }), 401
+
+    api_url = f"{server_back_end_url}/api/movies/search"
+    try:
+        response = requests.get(api_url, params=request.args, json={"user_id": current_user.id})
+        if response.status_code == 400:
+            return response.json(), 400
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        return jsonify({
+            "status": "500",
+            "error": f"Erreur de requête vers l'URL distante : {str(e)}"
+        }), 500
+
+@app.route('/api/movies/stats', methods=['GET'])
+def getMoviesStats():
+    """
+        Récupère les statistiques de la vidéothèque de l'utilisateur connecté (modal "gestion des films").
+        La réponse est validée par son ETag (voir get_conditional).
+
+        Returns:
+            JSON: Une réponse JSON contenant les statistiques, récupérée depuis l'URL distante.
+
+        HTTP Status Codes:
+            - 200 OK: Si les statistiques sont récupérées avec succès.
+            - 304 Not Modified: Si les statistiques n'ont pas changé depuis la réponse d'ETag If-None-Match.
+            - 401 Unauthorized: Si l'utilisateur n'est pas connecté.
+            - 500 Internal Server Error: Si une erreur de requête se produit lors de la communication avec l'URL distante.
+    """
+
+    if not current_user.is_authenticated:
+        return jsonify({
+            "status": "401",
+            "error": "Utilisateur non connecté."
+        }), 401
+
+    api_url = f"{server_back_end_url}/api/movies/stats"
+    try:
+        return get_conditional(api_url, current_user.id)
+    except requests.exceptions.RequestException as e:
+        return jsonify({
+            "status": "500",
+            "error": f"Erreur de requête vers l'URL distante : {str(e)}"
+        }), 500
+
+@app.route('/api/movies/changes', methods=['GET'])
+def getMoviesChanges():
+    """
+        Récupère les modifications de la vidéothèque de l'utilisateur connecté depuis la version since,
+        pour mettre à jour la copie locale du navigateur. Une erreur de paramètre (400) est renvoyée telle quelle.
+
+        Returns:
+            JSON: Une réponse JSON contenant les modifications, récupérée depuis l'URL distante.
+
+        HTTP Status Codes:
+            - 200 OK: Si les modifications sont récupérées avec succès.
+            - 400 Bad Request: Si since est invalide.
+            - 401 Unauthorized: Si l'utilisateur n'est pas connecté.
+            - 500 Internal Server Error: Si une erreur de requête se produit lors de la communication avec l'URL distante.
+    """
+
+    if not current_user.is_authenticated:
+        return jsonify({
+            "status": "401",
+            "error": "Utilisateur non connecté."
+        }), 401
+
+    api_url = f"{server_back_end_url}/api/movies/changes"
+    try:
+        response = requests.get(api_url, params={"since": request.args.get("since", "0")}, json={"user_id": current_user.id})
+        if response.status_code == 400:
+            return response.json(), 400
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        return jsonify({
+            "status": "500",
+            "error": f"Erreur de requête vers l'URL distante : {str(e)}"
+        }), 500
+
 @app.route('/add-movie', methods=['POST'])
 def add_movie():
     """
@@ -316,8 +525,17 @@ def add_movie():
             # Gestion de la couverture d'image du film
             cover_image = request.files.get('cover_image')
             if cover_image and cover_image.filename:
-                image_data = cover_image.read()
-                cover_image_base64 = base64.b64encode(image_data).decode('utf-8')
+                # L'image est transmise en flux au back-end (sans lecture complète ni encodage base64),
+                # qui renvoie son nom dans le stockage des images
+                upload_response = requests.post(
+                    f"{server_back_end_url}/api/covers/upload",
+                    data=cover_image.stream,
+                    headers={"Content-Type": cover_image.mimetype or "application/octet-stream"}
+                )
+                upload = upload_response.json()
+                if upload_response.status_code != 200:
+                    return jsonify(upload), upload_response.status_code
+                cover_image_base64 = upload['cover_image']
             else:
                 # Indique que le film n'a pas de couverture
                 cover_image_base64 = 'null'
@@ -431,6 +649,34 @@ def edit_movie() -> Dict[str, Any]:
         "error": "Vous devez utiliser une requête POST pour cette route."
     }
     return jsonify(response), 405
+
+@app.route('/movies/batch', methods=['POST'])
+def movies_batch() -> Dict[str, Any]:
+    """
+        Transmet au serveur distant une liste d'ajouts, de modifications et de suppressions de films,
+        appliquée en une seule écriture.
+
+        Requête JSON attendue : {"operations": list} (voir la route /api/movies/batch du back-end).
+
+        Returns:
+            JSON: Le résultat de chaque opération renvoyé par le serveur distant.
+    """
+    
+    data = request.json
+    
+    if current_user.is_authenticated:
+        data['user_id'] = current_user.id
+        
+    api_url = f"{server_back_end_url}/api/movies/batch"
+    
+    try:
+        response = requests.post(api_url, json=data)
+        return jsonify(response.json()), response.status_code
+    except Exception as e:
+        return jsonify({
+            "status": "500",
+            "error": str(e)
+        }), 500
     
 #
 #
@@ -445,6 +691,7 @@ def api_themoviedb_get():
         Soit par le nom d'un film
         Soit par une ou plusieurs catégories de films
         Soit par une année de sortie d'un film
+        Les paramètres facultatifs pages et maxResults sont transmis au serveur back-end (plusieurs pages de résultats).
         
     Returns:
         _type_: JSON, les films retournés ou rien
@@ -455,7 +702,9 @@ def api_themoviedb_get():
         inputContent = request.args.get('searchInputValue')
         data = {
             "operationId": operationId,
-            "inputContent": inputContent
+            "inputContent": inputContent,
+            "pages": request.args.get('pages'),
+            "maxResults": request.args.get('maxResults')
         }
         
         api_url = f"{server_back_end_url}/api/themoviedb/get"
@@ -535,7 +784,9 @@ def api_themoviedb_get_fast_search():
             }), 422
         
         data = {
-            "operationId": operationId
+            "operationId": operationId,
+            "pages": request.args.get('pages'),
+            "maxResults": request.args.get('maxResults')
         }
         
         api_url = f"{server_back_end_url}/api/themoviedb/get/fast-search"
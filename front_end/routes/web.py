@@ -240,8 +240,10 @@ def showMovie():
     """
 
     if request.method == 'POST':
-        # Je dois gérer le cas où je reçois une image vase64 ou un simple nom de fichier d'image externe
-        coverImage = request.form.get('image64')
+        # L'image est reçue sous forme d'URL (cover_url de la liste des films)
+        # Les anciennes pages envoient encore une image base64 ou un nom de fichier d'image externe
+        cover_url = request.form.get('coverUrl')
+        coverImage = request.form.get('image64') or ''
         # Initialiser le booléen à False
         extension_trouvee = False
         # Vérifie si les 50 premiers caractères contiennent une des extensions
@@ -268,6 +270,7 @@ def showMovie():
             'synopsis': synopsis,
             'notation': notation,
             'image64': image64,
+            'cover_url': cover_url,
             'extension_trouvee': extension_trouvee
         }
 
@@ -0,0 +1,108 @@
+import threading                                    # Pour le verrou du cache.
+import time                                         # Pour l'âge des réponses en cache.
+from collections import OrderedDict                 # Pour l'ordre LRU des réponses.
+
+"""
+|
+|   Cache des réponses du serveur back-end validées par leur ETag (listes de films, statistiques).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class ProxyCache:
+    """
+    Conserve, par utilisateur et par URL du serveur back-end, la dernière réponse reçue et son ETag.
+
+    Une réponse en cache est revalidée (If-None-Match) à chaque utilisation : le serveur répond 304
+    sans corps si elle n'a pas changé, et le corps en cache est renvoyé au navigateur. Toute écriture
+    d'un utilisateur passée par le front-end (ajout, modification, suppression) invalide ses réponses.
+
+    Sur option (max_age positif), une réponse de moins de max_age secondes est renvoyée sans appeler le
+    serveur back-end ; elle peut alors ignorer pendant max_age secondes les écritures faites ailleurs
+    (aperçus des images enregistrés par le serveur back-end, autre processus front-end).
+
+    Attributes:
+        max_age (float): La durée (secondes) pendant laquelle une réponse est utilisée sans revalidation (0 : jamais).
+        max_entries (int): Le nombre maximal de réponses conservées (les moins récemment utilisées sont retirées).
+        entries (OrderedDict): Par couple (utilisateur, URL), la réponse (etag, corps, date d'enregistrement).
+        lock (threading.Lock): Le verrou des entrées.
+
+    Methods:
+        get(user_id, url): Retourne la réponse en cache et indique si elle est encore valide.
+        put(user_id, url, etag, body): Enregistre une réponse.
+        refresh(user_id, url): Prolonge la validité d'une réponse revalidée par le serveur back-end.
+        invalidate(user_id): Oublie les réponses d'un utilisateur.
+    """
+
+    def __init__(self, max_age: float = 0, max_entries: int = 1024):
+        """
+            Initialise le cache.
+
+        Args:
+            max_age (float): La durée de validité d'une réponse, en secondes (0, par défaut, pour toujours revalider).
+            max_entries (int): Le nombre maximal de réponses conservées.
+        """
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id: str, url: str) -> tuple:
+        """
+            Retourne la réponse en cache pour un utilisateur et une URL.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            url (str): L'URL du serveur back-end, chaîne de requête comprise.
+
+        Returns:
+            tuple: (etag, corps, valide), ou None si aucune réponse n'est en cache.
+        """
+        with self.lock:
+            entry = self.entries.get((user_id, url))
+            if entry is None:
+                return None
+            self.entries.move_to_end((user_id, url))
+            etag, body, stored_at = entry
+            return etag, body, time.monotonic() - stored_at < self.max_age
+
+    def put(self, user_id: str, url: str, etag: str, body: bytes):
+        """
+            Enregistre une réponse.
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            url (str): L'URL du serveur back-end, chaîne de requête comprise.
+            etag (str): L'ETag de la réponse, sans guillemets.
+            body (bytes): Le corps de la réponse.
+        """
+        with self.lock:
+            self.entries[(user_id, url)] = (etag, body, time.monotonic())
+            self.entries.move_to_end((user_id, url))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def refresh(self, user_id: str, url: str):
+        """
+            Prolonge la validité d'une réponse que le serveur back-end a déclarée inchangée (304).
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+            url (str): L'URL du serveur back-end, chaîne de requête comprise.
+        """
+        with self.lock:
+            entry = self.entries.get((user_id, url))
+            if entry is not None:
+                self.entries[(user_id, url)] = (entry[0], entry[1], time.monotonic())
+
+    def invalidate(self, user_id: str):
+        """
+            Oublie les réponses d'un utilisateur (après une écriture dans sa vidéothèque).
+
+        Args:
+            user_id (str): L'identifiant de l'utilisateur.
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == user_id]:
+                del self.entries[key]
@@ -27,93 +27,260 @@ var modalAddMovie = $('#modalAddMovie');
 
 /*== Body content ==*/
 
+    /*== Pagination des films ==*/
+        var moviesPageSize = 24;                                // Nombre de films demandés par page
+        var moviesNextCursor = null;                            // Curseur de la page suivante (null : plus de page)
+        var moviesLoading = false;                              // Une page est en cours de chargement
+        var moviesRequest = 0;                                  // Numéro de la dernière liste demandée (ignore les réponses périmées)
+        var moviesCategory = "Toutes";                          // Catégorie filtrée
+        var moviesSearch = "";                                  // Recherche en cours (vide : liste paginée)
+        var moviesSearchTimer = null;                           // Délai avant l'envoi de la recherche
+        var moviesSearchDelay = 250;                            // Délai (ms) sans frappe avant l'envoi de la recherche
+
+        /**
+         * Charge la page suivante lorsque le bas de la liste devient visible
+         */
+        function loadNextMoviesIfVisible() {
+            if (moviesNextCursor && !moviesLoading
+                && $(window).scrollTop() + $(window).height() > $(document).height() - 400) {
+                loadMoviesIndex(moviesNextCursor);
+            }
+        }
+
+        $(window).on('scroll', loadNextMoviesIfVisible);
+    /*== END/Pagination des films ==*/
+
+    /*== Copie locale de la vidéothèque ==*/
+        var moviesStorageKey = 'videotheque.library.' + $('body').data('user-id');   // Une copie par utilisateur
+        var moviesLocal = null;                                 // Copie locale {version, movies: {id: film}}
+        var moviesLocalList = null;                             // Films de la copie locale affichés (null : pagination par le serveur)
+        var moviesLocalEnabled = true;                          // false après un échec de synchronisation
+
+        /**
+         * Lit la copie locale de la vidéothèque enregistrée dans le navigateur (localStorage).
+         *
+         * @returns {Object} La copie {version, movies}, vide (version 0) si elle n'existe pas ou est illisible
+         */
+        function readLocalLibrary() {
+            try {
+                let stored = JSON.parse(localStorage.getItem(moviesStorageKey));
+                if (stored && typeof stored.version === 'number' && stored.movies) {
+                    return stored;
+                }
+            } catch (e) {
+                console.log("[fun.js] Copie locale illisible : ", e);
+            }
+            return { version: 0, movies: {} };
+        }
+
+        /**
+         * Met à jour la copie locale : seules les modifications postérieures à sa version sont demandées
+         * au serveur (films ajoutés ou modifiés, films supprimés). Si le serveur renvoie toute la
+         * vidéothèque (reset), la copie est remplacée.
+         *
+         * @param {Function} done Appelée avec true si la copie est à jour, false si la synchronisation a échoué
+         */
+        function syncLibrary(done) {
+            if (moviesLocal === null) {
+                moviesLocal = readLocalLibrary();
+            }
+
+            $.ajax({
+                url: 'api/movies/changes',
+                method: 'GET',
+                data: { since: moviesLocal.version },
+                dataType: 'json',
+                success: function(response) {
+                    if (response.status != "200") {
+                        done(false);
+                        return;
+                    }
+                    let changes = response.data;
+                    if (changes.reset) {
+                        moviesLocal.movies = {};
+                    }
+                    changes.movies.forEach(movie => {
+                        moviesLocal.movies[movie.id] = movie;
+                    });
+                    changes.deleted.forEach(movieId => {
+                        delete moviesLocal.movies[movieId];
+                    });
+                    moviesLocal.version = changes.version;
+
+                    try {
+                        localStorage.setItem(moviesStorageKey, JSON.stringify(moviesLocal));
+                    } catch (e) {
+                        // Stockage plein ou désactivé : la copie reste en mémoire pour cette page
+                        console.log("[fun.js] Copie locale non enregistrée : ", e);
+                    }
+                    done(true);
+                },
+                error: function(jqXHR, textStatus, errorThrown) {
+                    console.log("[fun.js] Statut de l'erreur : ", textStatus);
+                    console.log("[fun.js] Texte de l'erreur : ", errorThrown);
+                    console.log("[fun.js] Code d'état : ", jqXHR.status);
+                    done(false);
+                }
+            });
+        }
+
+        /**
+         * Affiche une page de films de la copie locale. Le curseur est la position du prochain film
+         * dans moviesLocalList.
+         *
+         * @param {number} cursor La position du premier film de la page (0 : la liste est vidée)
+         */
+        function showLocalMovies(cursor) {
+            let moviesContainer = $('.movies');
+            if (!cursor) {
+                moviesContainer.empty();
+            }
+            let page = moviesLocalList.slice(cursor, cursor + moviesPageSize);
+            page.forEach(movie => {
+                moviesContainer.append(movieHtml(movie));
+            });
+            moviesNextCursor = cursor + page.length < moviesLocalList.length ? cursor + page.length : null;
+
+            stopLoadingAnimation();
+            if (!cursor && page.length === 0) {
+                showToastMessage("Vous n'avez aucun film pour l'instant.", "text-danger");
+            }
+            loadNextMoviesIfVisible();
+        }
+    /*== END/Copie locale de la vidéothèque ==*/
+
     /**
      * Ce code permet de filtrer les films affiché sur la page d'accueil de l'application selon la catégorie.
+     * Le filtre est appliqué à la copie locale (ou par le serveur) : la liste est rechargée depuis la première page.
     */
     $('.filter-movies-index').change(function() {
-        var selectedCategory = $(this).val();                   // Obtenir la catégorie sélectionnée
-        $('.movie').each(function() {
-            if ($(this).data('category') === selectedCategory 
-                || selectedCategory === "Toutes") {
-                $(this).show();                                 // Affiche les films si la catégorie correspond
-            } else {
-                $(this).hide();                                 // Cache les films sinon
-            }
-        });
+        moviesCategory = $(this).val();                         // Obtenir la catégorie sélectionnée
+        if (moviesSearch) {
+            searchMovies();                                     // La recherche en cours est relancée dans la catégorie
+        } else {
+            loadMoviesIndex();
+        }
     });    
        
     /**
-     * Cette méthode sert à récupérer les films d'un utilisateur et à les afficher sur la page d'accueil
+     * Retourne le code HTML d'un film de la grille (liste paginée ou résultats de recherche).
+     *
+     * @param {Object} movie Le film renvoyé par le serveur
+     * @returns {string} Le code HTML du film
+     */
+    function movieHtml(movie) {
+        // La vignette est servie par /api/covers (ou TheMovieDB) et mise en cache par le navigateur
+        let imageUrl = movie.cover_url || '';
+        // L'aperçu (quelques centaines d'octets) est affiché en fond en attendant la vignette
+        let placeholderStyle = movie.cover_placeholder ? `style="background: center / cover no-repeat url('${movie.cover_placeholder}')"` : '';
+        
+        // Le code HTML d'un film
+        return `
+            <div class="movie" data-movie-id="${movie.id}" data-category="${movie.category}">
+                <div class="movie-picture mb-1">
+                    <img class="img-movie" src="${imageUrl}" loading="lazy" ${placeholderStyle}>
+                </div>
+                <div class="movie-title">
+                    <h6>${movie.movie_name}</h6>
+                </div>
+                <hr>
+                <div class="d-flex gap-1 mb-1">
+                    <span class="material-icons font-size-XL color_8">category</span>
+                    <h6 class="font-size-M categories color_8">${movie.category}</h6>
+                </div>
+                <div class="d-flex gap-1 mb-1">
+                    <span class="material-icons font-size-XL color_8">calendar_month</span>
+                    <h6 class="font-size-M color_8">${movie.year_of_creation}</h6>
+                </div>
+                <div class="movie-rating d-flex gap-1 mb-1">
+                    <span class="material-icons color_8">stars</span>
+                    <div class="movie-rating-stars ">
+                        ${'<i class="material-icons font-size-L star-gold">star</i>'.repeat(parseInt(movie.notation, 10))}
+                        ${'<i class="material-icons font-size-L star-silver">star</i>'.repeat(5 - parseInt(movie.notation, 10))}
+                    </div>
+                </div>
+                <hr>
+                <div class="movie-action text-center">
+                    <a id="deleteButtonMovie${movie.id}" data-movie-id="${movie.id}" data-movie-name="${movie.movie_name}" class="material-icons color_7">delete</a>
+                    <a id="editButtonMovie${movie.id}" href="/edit-movie/${movie.id}?category=${encodeURIComponent(movie.category)}&name=${encodeURIComponent(movie.movie_name)}&year=${encodeURIComponent(movie.year_of_creation)}&director=${encodeURIComponent(movie.director)}&synopsis=${encodeURIComponent(movie.synopsis)}&rating=${encodeURIComponent(movie.notation)}" class="material-icons color_3">edit</a>
+                    <a id="showMore${movie.id}" data-movie-id="${movie.id}" data-movie-name="${movie.movie_name}" data-movie-category="${movie.category}" data-movie-creation="${movie.year_of_creation}" data-movie-notation="${movie.notation}" data-movie-cover-url="${movie.cover_detail_url || imageUrl}" data-movie-synopsis="${movie.synopsis}" data-movie-director="${movie.director}" href="#" class="material-icons color_2">open_in_new</a>
+                </div>
+            </div>
+        `;
+    }
+
+    /**
+     * Cette méthode sert à récupérer les films d'un utilisateur et à les afficher sur la page d'accueil.
+     * Les films sont récupérés page par page : sans curseur la liste est vidée et la première page est chargée,
+     * avec un curseur la page suivante est ajoutée à la suite.
+     *
+     * Sans curseur, la copie locale est d'abord synchronisée (seules les modifications sont téléchargées) :
+     * les pages sont ensuite lues dans la copie. Si la synchronisation échoue, les pages sont demandées au serveur.
+     * 
+     * @param {string} cursor Le curseur de la page à charger (next_cursor de la page précédente)
      */
-    function loadMoviesIndex() {    
+    function loadMoviesIndex(cursor = null) {    
+        if (moviesLocalList !== null && cursor) {
+            showLocalMovies(cursor);
+            return;
+        }
+
+        if (!cursor && moviesLocalEnabled) {
+            let request = ++moviesRequest;
+            moviesLoading = true;
+            syncLibrary(function(synced) {
+                if (request !== moviesRequest) {
+                    return;                             // Une nouvelle liste a été demandée entre-temps
+                }
+                moviesLoading = false;
+                if (!synced) {
+                    moviesLocalEnabled = false;
+                    loadMoviesIndex();
+                    return;
+                }
+                moviesLocalList = Object.values(moviesLocal.movies)
+                    .filter(movie => moviesCategory === "Toutes" || movie.category === moviesCategory)
+                    .sort((a, b) => a.id - b.id);
+                showLocalMovies(0);
+            });
+            return;
+        }
+
+        moviesLocalList = null;
+        let params = { limit: moviesPageSize };
+        if (cursor) {
+            params.cursor = cursor;
+        }
+        if (moviesCategory !== "Toutes") {
+            params.category = moviesCategory;
+        }
+
+        let request = cursor ? moviesRequest : ++moviesRequest;
+        moviesLoading = true;
+
         $.ajax({
             url: 'api/get-movies/index', 
             method: 'GET',
+            data: params,
             dataType: 'json',                           // Cette option indique le type de données que j'attends de recevoir en réponse du serveur
             success: function(response) {
+                if (request !== moviesRequest) {
+                    return;                             // Une nouvelle liste a été demandée entre-temps (changement de filtre)
+                }
                 if(response.status == "200") {
                     let moviesContainer = $('.movies');
-                    moviesContainer.empty();            // Vide le conteneurs parant avant de charger les nouveaux films
+                    if (!cursor) {
+                        moviesContainer.empty();        // Vide le conteneurs parant avant de charger la première page
+                    }
+                    moviesNextCursor = response.data.next_cursor;
                     
                     if (response.data.movies && response.data.movies.length > 0) {
                         response.data.movies.forEach(movie => {
-                            let imageUrl;
-                            let imageFormat = 'webp';
-                           
-                            // Extrait les 30 premiers caractères pour vérifier la présence d'une extension de fichier
-                            let first30Chars = movie.cover_image_base64.substring(0, 50);
-
-                            // Vérifie si la chaîne contient une extension de fichier commune dans les 30 premiers caractères
-                            if (/\.(jpg|png|webp)/i.test(first30Chars)) {
-                                // Construit l'URL de l'image externe
-                                imageUrl = `https://image.tmdb.org/t/p/w500/${movie.cover_image_base64}`;
-                            } else {
-                                // Je dois déterminer le format de l'image afin de pouvoir la reconstruire ultérieurement
-                                if (movie.cover_image_format) {
-                                    imageFormat = movie.cover_image_format.toLowerCase();
-                                }
-                                imageUrl = `data:image/${imageFormat};base64,${movie.cover_image_base64}`;
-                            }
-                            
-                            // Le code HTML d'un film
-                            let movieHtml = `
-                                <div class="movie" data-movie-id="${movie.id}" data-category="${movie.category}">
-                                    <div class="movie-picture mb-1">
-                                        <img class="img-movie" src="${imageUrl}">
-                                    </div>
-                                    <div class="movie-title">
-                                        <h6>${movie.movie_name}</h6>
-                                    </div>
-                                    <hr>
-                                    <div class="d-flex gap-1 mb-1">
-                                        <span class="material-icons font-size-XL color_8">category</span>
-                                        <h6 class="font-size-M categories color_8">${movie.category}</h6>
-                                    </div>
-                                    <div class="d-flex gap-1 mb-1">
-                                        <span class="material-icons font-size-XL color_8">calendar_month</span>
-                                        <h6 class="font-size-M color_8">${movie.year_of_creation}</h6>
-                                    </div>
-                                    <div class="movie-rating d-flex gap-1 mb-1">
-                                        <span class="material-icons color_8">stars</span>
-                                        <div class="movie-rating-stars ">
-                                            ${'<i class="material-icons font-size-L star-gold">star</i>'.repeat(parseInt(movie.notation, 10))}
-                                            ${'<i class="material-icons font-size-L star-silver">star</i>'.repeat(5 - parseInt(movie.notation, 10))}
-                                        </div>
-                                    </div>
-                                    <hr>
-                                    <div class="movie-action text-center">
-                                        <a id="deleteButtonMovie${movie.id}" data-movie-id="${movie.id}" data-movie-name="${movie.movie_name}" class="material-icons color_7">delete</a>
-                                        <a id="editButtonMovie${movie.id}" href="/edit-movie/${movie.id}?category=${encodeURIComponent(movie.category)}&name=${encodeURIComponent(movie.movie_name)}&year=${encodeURIComponent(movie.year_of_creation)}&director=${encodeURIComponent(movie.director)}&synopsis=${encodeURIComponent(movie.synopsis)}&rating=${encodeURIComponent(movie.notation)}" class="material-icons color_3">edit</a>
-                                        <a id="showMore${movie.id}" data-movie-id="${movie.id}" data-movie-name="${movie.movie_name}" data-movie-category="${movie.category}" data-movie-creation="${movie.year_of_creation}" data-movie-notation="${movie.notation}" data-movie-image64="${movie.cover_image_base64}" data-movie-synopsis="${movie.synopsis}" data-movie-director="${movie.director}" href="#" class="material-icons color_2">open_in_new</a>
-                                    </div>
-                                </div>
-                            `;
-                            
-                            moviesContainer.append(movieHtml);
+                            moviesContainer.append(movieHtml(movie));
                         });
 
                         stopLoadingAnimation();  // Arrête l'animation de chargement
-                    } else {
+                    } else if (!cursor) {
                         stopLoadingAnimation();
                         showToastMessage("Vous n'avez aucun film pour l'instant.", "text-danger");
                     }
@@ -134,27 +301,95 @@ var modalAddMovie = $('#modalAddMovie');
                     let errorMessage = "Erreur : " + responseJson.error;
                     showToastMessage(errorMessage, "text-danger");
                 }
+            },
+            complete: function() {
+                if (request === moviesRequest) {
+                    moviesLoading = false;
+                    loadNextMoviesIfVisible();          // Remplit l'écran si la page ne suffit pas à le remplir
+                }
             }
         });
     }   
 
     /**
-     * Gestionnaire d'événement sur l'input de recherche
+     * Recherche les films correspondant à moviesSearch (titre, réalisateur, catégorie, synopsis) et les affiche
+     * par pertinence à la place de la liste paginée. La recherche est faite par le serveur sur toute la vidéothèque.
      */
-    $('.input-search-movie').on('input', function() {
-        let searchTerm = $(this).val().toLowerCase();
+    function searchMovies() {
+        let params = { q: moviesSearch, limit: 100 };
+        if (moviesCategory !== "Toutes") {
+            params.category = moviesCategory;
+        }
 
-        // Parcoure toutes les divs avec la classe "movie"
-        $('.movie').each(function() {
-            let movieName = $(this).find('.movie-title h6').text().toLowerCase(); 
+        let request = ++moviesRequest;
+        moviesNextCursor = null;                                // Pas de page suivante pendant une recherche
+        moviesLocalList = null;
 
-            // Vérifie si le nom du film contient le terme de recherche
-            if (movieName.includes(searchTerm)) {
-                $(this).show(); // Affiche la div du film s'il correspond à la recherche
-            } else {
-                $(this).hide(); // Masque la div du film s'il ne correspond pas à la recherche
+        $.ajax({
+            url: 'api/movies/search',
+            method: 'GET',
+            data: params,
+            dataType: 'json',
+            success: function(response) {
+                if (request !== moviesRequest || response.status != "200") {
+                    return;                                     // Une nouvelle recherche a été envoyée entre-temps
+                }
+                let moviesContainer = $('.movies');
+                moviesContainer.empty();
+                response.data.movies.forEach(movie => {
+                    moviesContainer.append(movieHtml(movie));
+                });
+                if (response.data.movies.length === 0) {
+                    if (response.data.suggestions && response.data.suggestions.length > 0) {
+                        // « Vouliez-vous dire… » : titres proches de la recherche, malgré les fautes de frappe
+                        let suggestions = $('<p class="search-suggestions color_8"></p>').text("Vouliez-vous dire : ");
+                        response.data.suggestions.forEach((title, index) => {
+                            if (index > 0) {
+                                suggestions.append(", ");
+                            }
+                            suggestions.append($('<a href="#" class="search-suggestion"></a>').text(title));
+                        });
+                        moviesContainer.append(suggestions);
+                    } else {
+                        showToastMessage("Aucun film ne correspond à votre recherche.", "text-danger");
+                    }
+                }
+            },
+            error: function(jqXHR, textStatus, errorThrown) {
+                console.log("[fun.js] Statut de l'erreur : ", textStatus);
+                console.log("[fun.js] Texte de l'erreur : ", errorThrown);
+                console.log("[fun.js] Code d'état : ", jqXHR.status);
             }
         });
+    }
+
+    /**
+     * Gestionnaire d'événement sur l'input de recherche : la recherche est envoyée au serveur lorsque
+     * l'utilisateur arrête de taper, et la liste paginée est rechargée lorsque l'input est vidé.
+     */
+    $('.input-search-movie').on('input', function() {
+        let searchTerm = $(this).val().trim();
+
+        clearTimeout(moviesSearchTimer);
+        moviesSearchTimer = setTimeout(function() {
+            if (searchTerm === moviesSearch) {
+                return;
+            }
+            moviesSearch = searchTerm;
+            if (moviesSearch) {
+                searchMovies();
+            } else {
+                loadMoviesIndex();
+            }
+        }, moviesSearchDelay);
+    });
+
+    /**
+     * Gestionnaire d'événement sur une suggestion de titre : la recherche est relancée avec ce titre
+     */
+    $(document).on('click', '.search-suggestion', function(event) {
+        event.preventDefault();
+        $('.input-search-movie').val($(this).text()).trigger('input');
     });
 
     /*== Envoi la demande POST pour afficher le contenu détaillés d'un film ==*/
@@ -172,7 +407,7 @@ var modalAddMovie = $('#modalAddMovie');
             var movieName = $(this).data('movie-name');
             var year = $(this).data('movie-creation');
             var notation = $(this).data('movie-notation');
-            var image64 = $(this).data('movie-image64');
+            var coverUrl = $(this).data('movie-cover-url');
             var synopsis = $(this).data('movie-synopsis');
             var director = $(this).data('movie-director');
 
@@ -183,7 +418,7 @@ var modalAddMovie = $('#modalAddMovie');
                 movieName: movieName,
                 year: year,
                 notation: notation,
-                image64: image64,
+                coverUrl: coverUrl,
                 synopsis: synopsis,
                 director: director
             };
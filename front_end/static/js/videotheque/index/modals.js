@@ -72,7 +72,12 @@ $(document).on("DOMContentLoaded", function() {
                     contentType: false, // L'objet FormData gère automatiquement ces informations.
                     success: function (response) {
                         if (response.status === "200") {
-                            showToastMessage(response.message, "text-success");
+                            if (response.warning) {
+                                // Film ajouté, mais un titre proche existait déjà (doublon probable)
+                                showToastMessage(response.message + " " + response.warning, "text-warning");
+                            } else {
+                                showToastMessage(response.message, "text-success");
+                            }
         
                             $form[0].reset();       // Réinitialiser le formulaire pour effacer son contenu
                             $('.synopsis').val(''); // Réinitialiser le champ .synopsis à vide
@@ -124,7 +129,9 @@ $(document).on("DOMContentLoaded", function() {
 
     /*== Modal gestionsMovie ==*/
         let nbTotalMovie = $('#nbTotalMovies'); // Le nombre de films dans le modal gestions des films
+        let statsMovies = $('#statsMovies');    // La note moyenne et le nombre de films par catégorie
         let moviesData = [];                    // Tableau pour stocker les données des films
+        let moviesRequestGestions = 0;          // Numéro du dernier chargement demandé (ignore les pages périmées)
 
         // Attache l'événement de clic pour ouvrir le modal et charger les films
         $('[data-bs-target="#modalGestionsMovies"]').click(function() {
@@ -151,18 +158,38 @@ $(document).on("DOMContentLoaded", function() {
          * Cette fonction permet de faire un appel Ajax au serveur Flask back-end pour 
          * récupérer tous les films de l'utilisateur.
          * Ell est utilisé pour afficher la listes des films du modal "Gestions des films".
+         * Les films sont demandés page par page et le tableau est complété à chaque page reçue.
+         * 
+         * @param {string} cursor Le curseur de la page à charger (null pour recommencer à la première page)
          */
-        function loadMovies() {
+        function loadMovies(cursor = null) {
+            let params = { limit: 200 };
+            if (cursor) {
+                params.cursor = cursor;
+            } else {
+                moviesRequestGestions++;
+                loadStats();                            // Les statistiques sont demandées une fois par chargement
+            }
+            let request = moviesRequestGestions;
+
             $.ajax({
                 url: '/api/get-movies/gestions',  
                 method: 'GET',
+                data: params,
                 dataType: 'json',
                 success: function(response) {
+                    if (request !== moviesRequestGestions) {
+                        return;                                 // Un rechargement a été demandé entre-temps
+                    }
                     if(response.status == "200") {
-                        moviesData = response.movies;        // Stockage des films dans le tableau
+                        // Stockage des films dans le tableau (la première page remplace les films déjà chargés)
+                        moviesData = cursor ? moviesData.concat(response.movies) : response.movies;
                         displayMoviesForFullScreen();   
                         displayMoviesForSmartphone();
-                        nbTotalMovie.text('Nombre total de films : ' + response.nb_movies);
+
+                        if (response.next_cursor) {
+                            loadMovies(response.next_cursor);   // Page suivante
+                        }
                     }else {
                         showToastMessage("Une erreur s'est produite pendant le chargement des films.", "text-danger");
                     }
@@ -189,6 +216,39 @@ $(document).on("DOMContentLoaded", function() {
         // Exporte la fonction globalement pour être utilisé dans d'autre fichiers js (pas recommandé, mais plus simple)
         window.loadMovies = loadMovies;
 
+        /**
+         * Récupère les statistiques de la vidéothèque (nombre de films, note moyenne, nombre de films par catégorie)
+         * et les affiche en tête du modal "Gestions des films". Le serveur tient ces statistiques à jour :
+         * elles ne dépendent pas des pages de films déjà chargées.
+         */
+        function loadStats() {
+            $.ajax({
+                url: '/api/movies/stats',
+                method: 'GET',
+                dataType: 'json',
+                success: function(response) {
+                    if (response.status == "200") {
+                        let stats = response.data;
+                        nbTotalMovie.text('Nombre total de films : ' + stats.nb_movies);
+
+                        let details = [];
+                        if (stats.average_rating !== null) {
+                            details.push('Note moyenne : ' + stats.average_rating + ' / 5');
+                        }
+                        for (let category in stats.categories) {
+                            details.push(category + ' : ' + stats.categories[category]);
+                        }
+                        statsMovies.text(details.join(' · '));
+                    }
+                },
+                error: function(jqXHR, textStatus, errorThrown) {
+                    console.log("[modals.js] Statut de l'erreur : ", textStatus);
+                    console.log("[modals.js] Texte de l'erreur : ", errorThrown);
+                    console.log("[modals.js] Code d'état : ", jqXHR.status);
+                }
+            });
+        }
+
         /**
          * Fonction pour afficher les films du modal "gestions des films" sur les ordinateurs de bureau
          * 
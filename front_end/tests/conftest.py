@@ -0,0 +1,22 @@
+import os                                           # Pour les chemins des fichiers
+import sys                                          # Pour l'accès aux modules du front-end
+import pytest
+
+"""
+|
+|   Configuration des tests du front-end (python -m pytest depuis le dossier front_end).
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def app():
+    """
+        Retourne l'application Flask du front-end.
+    """
+    from app import app
+    app.config['TESTING'] = True
+    return app
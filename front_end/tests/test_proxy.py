@@ -0,0 +1,95 @@
+import json                                         # Pour les réponses du faux serveur back-end
+import threading                                    # Pour le faux serveur back-end
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+"""
+|
+|   Tests de get_conditional : revalidation par ETag auprès du serveur back-end et réponse 304 au navigateur.
+|
+|   Author Mahmoud ILLOURMANE
+|
+"""
+
+class BackEnd(BaseHTTPRequestHandler):
+    """
+    Faux serveur back-end : répond 304 si l'en-tête If-None-Match contient l'ETag de la version courante.
+    """
+
+    version = 1
+    requests = []
+
+    def do_GET(self):
+        etag = f'"v{BackEnd.version}"'
+        BackEnd.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps({"status": "200", "data": {"version": BackEnd.version}}).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def back_end():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BackEnd)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    BackEnd.version, BackEnd.requests = 1, []
+    yield f"http://127.0.0.1:{server.server_port}/api/movies/stats"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def get(app, back_end):
+    from routes.api import get_conditional, proxy_cache
+
+    proxy_cache.entries.clear()
+
+    def get(headers: dict = None):
+        with app.test_request_context('/api/movies/stats', headers=headers or {}):
+            return get_conditional(back_end, "u")
+    return get
+
+def test_cached_body_is_revalidated_on_every_request(get):
+    first = get()
+    assert first.status_code == 200 and first.get_json()["data"]["version"] == 1
+
+    second = get()
+    assert BackEnd.requests == [None, '"v1"']       # Revalidation auprès du back-end, qui répond 304
+    assert second.status_code == 200 and second.get_data() == first.get_data()
+
+    BackEnd.version = 2                             # Écriture faite hors de ce front-end
+    third = get()
+    assert third.get_json()["data"]["version"] == 2
+    assert third.headers["ETag"] == '"v2"'
+
+def test_browser_receives_304_when_unchanged(get):
+    etag = get().headers["ETag"]
+    unchanged = get({"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.get_data() == b""
+    assert unchanged.headers["Cache-Control"] == "private, no-cache"
+
+    BackEnd.version = 2
+    changed = get({"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.get_json()["data"]["version"] == 2
+
+def test_max_age_is_opt_in(app, get):
+    from routes.api import proxy_cache
+
+    assert app.config['PROXY_CACHE_MAX_AGE'] == 0 and proxy_cache.max_age == 0
+    proxy_cache.max_age = 60
+    try:
+        get()
+        BackEnd.version = 2
+        assert get().get_json()["data"]["version"] == 1     # Réponse réutilisée sans appeler le back-end
+        assert BackEnd.requests == [None]
+    finally:
+        proxy_cache.max_age = 0